@@ -0,0 +1,641 @@
+"""
+================================================================================
+                    WEB3.AI - AUDIO HELPER MODULE (ElevenLabs upload)
+================================================================================
+YEH FILE AUDIO FILES KO ELEVENLABS SPEECH-TO-TEXT TAK STREAM KARTI HAI
+
+FUNCTIONALITY:
+- MultipartEncoder: multipart/form-data body ko file-like object ki tarah
+  banata hai - disk se fixed-size chunks mein padhta hai, poora body kabhi
+  memory mein nahi aata (peak memory audio length se independent)
+- elevenlabs_transcribe(): dono audio views ka shared S2T call
+- transcribe_audio(): lambi recordings ko silence boundaries pe todke chunks
+  parallel transcribe karta hai (per-chunk retries), phir words ko ek
+  time-ordered list mein stitch karta hai - speakers overlap se map hote hain
+- preflight_audio(): ffprobe se duration/codec/channels - khaali ya unsupported
+  files transcription call se pehle reject; badi / stereo high-bitrate files
+  mono 16 kHz Opus/FLAC mein compact hokar upload hoti hain (ffmpeg ho to)
+- store_audio_upload(): upload ko disk pe stream karte hue sha256 hash karta hai,
+  temp file pe pre-flight, phir content-addressed AudioBlob mein store (same
+  bytes = ek hi file; rejected uploads ka blob banta hi nahi)
+- transcribe_blob(): blob ka cached transcript reuse, warna transcribe_audio()
+
+USED BY:
+- agents/views.py → run_audio_agent, run_audio_x402
+- python manage.py bench_multipart (memory benchmark)
+- python manage.py bench_audio_preflight (transcode size/latency benchmark)
+
+LOCATION: agents/audio_helper.py
+
+WHY:
+┌─────────────────────────────────────────────────────────────────────┐
+│ requests.post(files={'file': f}) poora multipart body bytes mein    │
+│ build karta hai → 100 MB recording = 100+ MB RAM per upload.        │
+│ MultipartEncoder.__len__ se Content-Length milta hai aur            │
+│ http.client body ko read(blocksize) se chunk-by-chunk bhejta hai.   │
+└─────────────────────────────────────────────────────────────────────┘
+================================================================================
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+import uuid
+import concurrent.futures
+from collections import Counter
+
+import requests
+from django.conf import settings
+
+from .models import AudioBlob
+
+
+ELEVENLABS_STT_URL = "https://api.elevenlabs.io/v1/speech-to-text"
+CHUNK_SIZE = 64 * 1024
+
+
+class MultipartEncoder:
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  STREAMING MULTIPART/FORM-DATA ENCODER                                    ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    USAGE:
+    ```python
+    with open(path, 'rb') as f:
+        body = MultipartEncoder(fields={'model_id': 'scribe_v1'},
+                                files={'file': ('meeting.mp3', f, 'audio/mpeg')})
+        requests.post(url, data=body, headers={'Content-Type': body.content_type})
+    ```
+
+    - fields: {name: str value}
+    - files:  {name: (filename, binary file object, content_type)}
+    File objects seekable hone chahiye (size ke liye) - disk files / Django
+    TemporaryUploadedFile dono chalte hain.
+    """
+
+    def __init__(self, fields=None, files=None, boundary=None):
+        self.boundary = boundary or uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._parts = []  # bytes ya file objects, order mein
+        self._length = 0
+
+        for name, value in (fields or {}).items():
+            self._add_bytes(self._part_header(name) + b"\r\n" + str(value).encode('utf-8') + b"\r\n")
+
+        for name, (filename, fileobj, content_type) in (files or {}).items():
+            content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            self._add_bytes(self._part_header(name, filename) +
+                            f"Content-Type: {content_type}\r\n\r\n".encode('utf-8'))
+            start = fileobj.tell()
+            fileobj.seek(0, os.SEEK_END)
+            self._length += fileobj.tell() - start
+            fileobj.seek(start)
+            self._parts.append(fileobj)
+            self._add_bytes(b"\r\n")
+
+        self._add_bytes(f"--{self.boundary}--\r\n".encode('utf-8'))
+        self._index = 0
+        self._offset = 0  # Current bytes part ke andar position
+
+    def _part_header(self, name, filename=None):
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        return f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n".encode('utf-8')
+
+    def _add_bytes(self, data):
+        self._parts.append(data)
+        self._length += len(data)
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        """Agle `size` bytes (size < 0 = baaki sab). Body end pe b'' return hota hai."""
+        if size is None or size < 0:
+            size = self._length
+        out = bytearray()
+        while len(out) < size and self._index < len(self._parts):
+            part = self._parts[self._index]
+            want = size - len(out)
+            if isinstance(part, bytes):
+                chunk = part[self._offset:self._offset + want]
+                self._offset += len(chunk)
+                if self._offset >= len(part):
+                    self._index, self._offset = self._index + 1, 0
+            else:
+                chunk = part.read(min(want, CHUNK_SIZE))
+                if not chunk:
+                    self._index += 1
+                    continue
+            out += chunk
+        return bytes(out)
+
+
+def elevenlabs_transcribe(path, filename=None, model_id='scribe_v1', diarize=True):
+    """
+    Disk pe saved audio ko ElevenLabs S2T pe stream karta hai.
+    RETURNS: requests.Response (caller status check + r.json() karta hai)
+    NOTE: IPv4 patch caller lagata hai.
+    """
+    filename = filename or os.path.basename(path)
+    with open(path, 'rb') as f:
+        body = MultipartEncoder(
+            fields={'model_id': model_id, 'diarize': 'true' if diarize else 'false'},
+            files={'file': (filename, f, None)},
+        )
+        print(f" > Streaming {len(body) / (1024 * 1024):.1f} MB to ElevenLabs...")
+        return requests.post(
+            ELEVENLABS_STT_URL,
+            headers={"xi-api-key": settings.ELEVENLABS_API_KEY, "Content-Type": body.content_type},
+            data=body,
+        )
+
+
+# ============================================================================
+# PRE-FLIGHT - ffprobe checks + compact transcode (mono 16 kHz Opus/FLAC)
+# ============================================================================
+
+MIN_AUDIO_SECONDS = 0.5                 # Isse chhoti = khaali recording
+TRANSCODE_MIN_BYTES = 8 * 1024 * 1024   # Isse badi file hamesha compact hoti hai
+TRANSCODE_STEREO_BITRATE = 96_000       # Stereo + isse zyada bitrate → compact
+COMPACT_FORMATS = {
+    'opus': {'ext': '.ogg', 'args': ['-c:a', 'libopus', '-b:a', '32k', '-application', 'voip']},
+    'flac': {'ext': '.flac', 'args': ['-c:a', 'flac']},
+}
+
+
+def probe_audio(path):
+    """
+    ffprobe se container + pehla audio stream.
+    RETURNS: {'duration', 'codec', 'channels', 'sample_rate', 'bit_rate', 'format', 'size'}
+             'codec' None = koi audio stream nahi; ffprobe na ho to None;
+             file decode hi na ho to {'error': ...}
+    """
+    ffprobe = ffmpeg_binary('ffprobe')
+    if not ffprobe:
+        return None
+    try:
+        proc = subprocess.run(
+            [ffprobe, '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+            capture_output=True, text=True, timeout=30,
+        )
+        data = json.loads(proc.stdout or '{}')
+    except (subprocess.SubprocessError, ValueError, OSError) as e:
+        return {'error': str(e)}
+    if proc.returncode != 0 or 'format' not in data:
+        return {'error': (proc.stderr or 'ffprobe failed').strip()[:200]}
+
+    fmt = data['format']
+    stream = next((st for st in data.get('streams', []) if st.get('codec_type') == 'audio'), {})
+
+    def number(value, cast=float):
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            return None
+
+    return {
+        'duration': number(fmt.get('duration')) or number(stream.get('duration')),
+        'codec': stream.get('codec_name'),
+        'channels': number(stream.get('channels'), int),
+        'sample_rate': number(stream.get('sample_rate'), int),
+        'bit_rate': number(stream.get('bit_rate'), int) or number(fmt.get('bit_rate'), int),
+        'format': fmt.get('format_name'),
+        'size': number(fmt.get('size'), int) or os.path.getsize(path),
+    }
+
+
+def preflight_audio(path):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  PRE-FLIGHT - transcription call se pehle bekaar uploads reject karo      ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+    
+    - 0 bytes → reject
+    - ffprobe decode na kar paaye / audio stream hi nahi → unsupported
+    - duration < MIN_AUDIO_SECONDS → empty recording
+    ffprobe install na ho to sirf size check hota hai (baaki ElevenLabs pe).
+    
+    RETURNS: (probe_or_None, error_message_or_None)
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None, "Audio file is empty"
+
+    info = probe_audio(path)
+    if info is None:
+        return None, None
+    if info.get('error'):
+        return info, "Unsupported or corrupt audio file"
+    if not info['codec']:
+        return info, f"No audio stream found in file ({info['format'] or 'unknown format'})"
+    if info['duration'] is not None and info['duration'] < MIN_AUDIO_SECONDS:
+        return info, "Audio file has no content (duration under 0.5s)"
+
+    print(f" > Pre-flight: {info['codec']} {info['channels']}ch {info['sample_rate']} Hz "
+          f"{(info['bit_rate'] or 0) // 1000} kbps, {(info['duration'] or 0) / 60:.1f} min, "
+          f"{info['size'] / (1024 * 1024):.1f} MB")
+    return info, None
+
+
+def should_transcode(info):
+    """Badi file, ya stereo high-bitrate → compact karna worth it (speech ke liye mono 16 kHz kaafi)"""
+    if not info or info.get('error') or not info.get('codec') or not ffmpeg_binary():
+        return False
+    if info['size'] >= TRANSCODE_MIN_BYTES:
+        return True
+    return (info['channels'] or 1) >= 2 and (info['bit_rate'] or 0) > TRANSCODE_STEREO_BITRATE
+
+
+def transcode_compact(path, out_dir, codec=None):
+    """
+    Mono 16 kHz Opus (default) ya FLAC mein convert - settings.AUDIO_TRANSCODE_CODEC.
+    Opus encoder (libopus) na ho to FLAC try hota hai.
+    RETURNS: output path ya None (fail → caller original upload karta hai)
+    """
+    preferred = codec or getattr(settings, 'AUDIO_TRANSCODE_CODEC', 'opus')
+    for name in dict.fromkeys([preferred, 'flac']):
+        spec = COMPACT_FORMATS.get(name)
+        if not spec:
+            continue
+        out_path = os.path.join(out_dir, f"compact{spec['ext']}")
+        try:
+            subprocess.run(
+                [ffmpeg_binary(), '-hide_banner', '-loglevel', 'error', '-y', '-i', path,
+                 '-vn', '-ac', '1', '-ar', '16000', *spec['args'], out_path],
+                check=True, capture_output=True, timeout=900,
+            )
+            return out_path
+        except (subprocess.SubprocessError, OSError) as e:
+            print(f" ! Transcode to {name} failed: {str(e)[:120]}")
+    return None
+
+
+# ============================================================================
+# LONG RECORDINGS - Silence-aware split + parallel transcription + stitching
+# ============================================================================
+
+LONG_AUDIO_SECONDS = 12 * 60    # Isse lambi recording chunks mein jaati hai
+CHUNK_TARGET_SECONDS = 10 * 60  # Ideal chunk length (nearest silence pe cut)
+CHUNK_MAX_SECONDS = 14 * 60     # Silence na mile to yahan hard cut
+CHUNK_OVERLAP_SECONDS = 15      # Agla chunk itna pehle start - speaker mapping ke liye
+CHUNK_WORKERS = 4               # Ek saath kitne ElevenLabs calls
+CHUNK_ATTEMPTS = 3              # Per-chunk retries (429 / 5xx / network)
+SILENCE_RE = re.compile(r'silence_(start|end): (-?[\d.]+)')
+
+
+def ffmpeg_binary(name='ffmpeg'):
+    """settings.FFMPEG_BINARY / FFPROBE_BINARY ya PATH se - na mile to None"""
+    configured = getattr(settings, f"{name.upper()}_BINARY", '') or name
+    return shutil.which(configured)
+
+
+def probe_duration(path):
+    """Audio duration (seconds) ffprobe se, ya None"""
+    info = probe_audio(path)
+    return info['duration'] if info else None
+
+
+def detect_silences(path, noise_db=-30, min_silence=0.5):
+    """ffmpeg silencedetect → [(start, end), ...]"""
+    ffmpeg = ffmpeg_binary()
+    proc = subprocess.run(
+        [ffmpeg, '-hide_banner', '-nostats', '-i', path,
+         '-af', f'silencedetect=noise={noise_db}dB:d={min_silence}', '-f', 'null', '-'],
+        capture_output=True, text=True, timeout=600,
+    )
+    silences, start = [], None
+    for kind, value in SILENCE_RE.findall(proc.stderr):
+        if kind == 'start':
+            start = float(value)
+        elif start is not None:
+            silences.append((start, float(value)))
+            start = None
+    return silences
+
+
+def plan_chunks(duration, silences, target=CHUNK_TARGET_SECONDS, max_len=CHUNK_MAX_SECONDS):
+    """
+    Cut points choose karta hai: har ~target seconds pe sabse nazdeek silence ka
+    midpoint (target/2 .. max_len window mein), na mile to hard cut.
+    RETURNS: [(keep_start, keep_end), ...] - non-overlapping, poori duration cover
+    """
+    mids = [(start + end) / 2 for start, end in silences]
+    cuts = [0.0]
+    while duration - cuts[-1] > max_len:
+        lo, hi, ideal = cuts[-1] + target / 2, cuts[-1] + max_len, cuts[-1] + target
+        candidates = [m for m in mids if lo <= m <= hi]
+        cuts.append(min(candidates, key=lambda m: abs(m - ideal)) if candidates else ideal)
+    cuts.append(duration)
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def _extract_chunk(path, start, end, out_path):
+    """[start, end] ko mono 16 kHz FLAC mein nikaalta hai (accurate timestamps ke liye re-encode)"""
+    subprocess.run(
+        [ffmpeg_binary(), '-hide_banner', '-loglevel', 'error', '-y',
+         '-ss', f'{start:.3f}', '-t', f'{end - start:.3f}', '-i', path,
+         '-vn', '-ac', '1', '-ar', '16000', '-c:a', 'flac', out_path],
+        check=True, capture_output=True, timeout=600,
+    )
+
+
+def transcribe_with_retries(path, filename=None, attempts=CHUNK_ATTEMPTS):
+    """
+    ElevenLabs call + retries (network errors, 429, 5xx pe backoff).
+    RETURNS: (transcript_json, error)
+    """
+    error = None
+    for attempt in range(1, attempts + 1):
+        try:
+            r = elevenlabs_transcribe(path, filename=filename)
+            if r.status_code == 200:
+                return r.json(), None
+            error = f"HTTP {r.status_code}: {r.text[:200]}"
+            if r.status_code < 500 and r.status_code != 429:
+                break  # Client error - retry se kuch nahi badlega
+        except (requests.RequestException, ValueError) as e:
+            error = str(e)
+        if attempt < attempts:
+            print(f" ! Transcription attempt {attempt} failed ({error[:80]}), retrying...")
+            time.sleep(2 ** attempt)
+    return None, error
+
+
+def _norm_word(text):
+    return re.sub(r'[^\w]', '', (text or '').lower())
+
+
+def _map_speakers(prev_words, next_words, overlap_start, overlap_end, used_labels):
+    """
+    Overlap region ke words time + text se align karke next chunk ke local speaker
+    labels → global labels. Votes ke order mein one-to-one mapping; baaki naye labels.
+    """
+    prev = [w for w in prev_words if overlap_start <= w['start'] < overlap_end and w.get('type', 'word') == 'word']
+    votes = Counter()
+    for word in next_words:
+        if not (overlap_start <= word['start'] < overlap_end) or word.get('type', 'word') != 'word':
+            continue
+        mid = (word['start'] + word['end']) / 2
+        best = min(prev, key=lambda p: abs((p['start'] + p['end']) / 2 - mid), default=None)
+        if best and abs((best['start'] + best['end']) / 2 - mid) <= 0.5 and _norm_word(best['text']) == _norm_word(word['text']):
+            votes[(word.get('speaker_id'), best.get('speaker_id'))] += 1
+
+    mapping, taken = {}, set()
+    for (local, global_label), _count in votes.most_common():
+        if local not in mapping and global_label not in taken:
+            mapping[local] = global_label
+            taken.add(global_label)
+
+    for word in next_words:
+        local = word.get('speaker_id')
+        if local is not None and local not in mapping:
+            n = 0
+            while f"speaker_{n}" in used_labels or f"speaker_{n}" in taken:
+                n += 1
+            mapping[local] = f"speaker_{n}"
+            taken.add(mapping[local])
+    return mapping
+
+
+def stitch_chunks(chunk_results):
+    """
+    chunk_results: [{'keep': (start, end), 'offset': audio_start, 'words': [...]}] (time order)
+    Har chunk ke words global time pe shift, sirf keep range ke words rakhte hain,
+    speakers pichle chunk se overlap ke through map hote hain.
+    RETURNS: words list (ElevenLabs format, global times + global speaker ids)
+    """
+    stitched, prev_words, used_labels = [], [], set()
+    for i, chunk in enumerate(chunk_results):
+        words = []
+        for w in chunk['words']:
+            w = dict(w)
+            w['start'] = float(w.get('start') or 0) + chunk['offset']
+            w['end'] = float(w.get('end') or w['start']) + chunk['offset']
+            words.append(w)
+
+        keep_start, keep_end = chunk['keep']
+        if i > 0:
+            mapping = _map_speakers(prev_words, words, chunk['offset'], keep_start, used_labels)
+            for w in words:
+                if w.get('speaker_id') is not None:
+                    w['speaker_id'] = mapping[w['speaker_id']]
+
+        last = i == len(chunk_results) - 1
+        for w in words:
+            if w['start'] >= keep_start and (w['start'] < keep_end or last):
+                stitched.append(w)
+                if w.get('speaker_id') is not None:
+                    used_labels.add(w['speaker_id'])
+        prev_words = words
+    return stitched
+
+
+def words_to_utterances(words):
+    """Consecutive same-speaker words → utterances [{speaker, text, start, end}]"""
+    utterances = []
+    current = None
+    for w in words:
+        if w.get('type') == 'spacing':
+            continue
+        speaker = w.get('speaker_id', 'unknown')
+        if current is None or speaker != current['speaker']:
+            if current:
+                utterances.append(current)
+            current = {'speaker': speaker, 'text': [], 'start': w.get('start'), 'end': w.get('end')}
+        current['text'].append(w['text'])
+        current['end'] = w.get('end', current['end'])
+    if current:
+        utterances.append(current)
+    for u in utterances:
+        u['text'] = " ".join(u['text'])
+    return utterances
+
+
+def transcribe_audio(path, filename=None, probe=None):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  AUDIO → TRANSCRIPT (chhoti file = 1 call, lambi = parallel chunks)       ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+    
+    1. ffprobe (ya preflight_audio() ka probe); LONG_AUDIO_SECONDS se chhoti
+       (ya ffmpeg nahi) → single call - badi/stereo file pehle mono 16 kHz
+       Opus/FLAC mein compact hoti hai (should_transcode)
+    2. silencedetect → plan_chunks() → har chunk (overlap ke saath) FLAC mein
+    3. CHUNK_WORKERS parallel ElevenLabs calls, har chunk ke apne retries
+    4. stitch_chunks() → ek time-ordered words list, consistent speaker labels
+    
+    RETURNS: (transcript_json, error) - transcript_json ElevenLabs shape mein
+    ({text, words, utterances}), utterances hamesha filled (words se), plus
+    'upload_stats' (original vs uploaded bytes, transcode/transcribe seconds)
+    """
+    probe = probe or probe_audio(path)
+    duration = probe.get('duration') if probe else None
+    stats = {'original_bytes': os.path.getsize(path), 'uploaded_bytes': 0,
+             'transcoded': None, 'transcode_s': 0.0, 'transcribe_s': 0.0}
+
+    if not duration or duration <= LONG_AUDIO_SECONDS or not ffmpeg_binary():
+        with tempfile.TemporaryDirectory(prefix='audio-compact-') as tmp:
+            upload_path, upload_name = path, filename
+            if should_transcode(probe):
+                started = time.perf_counter()
+                compact = transcode_compact(path, tmp)
+                stats['transcode_s'] = round(time.perf_counter() - started, 2)
+                if compact and os.path.getsize(compact) < stats['original_bytes']:
+                    upload_path = compact
+                    upload_name = os.path.splitext(filename or os.path.basename(path))[0] + os.path.splitext(compact)[1]
+                    stats['transcoded'] = os.path.splitext(compact)[1].lstrip('.')
+            stats['uploaded_bytes'] = os.path.getsize(upload_path)
+            if stats['transcoded']:
+                print(f" > Compacted upload: {stats['original_bytes'] / 1048576:.1f} MB → "
+                      f"{stats['uploaded_bytes'] / 1048576:.1f} MB ({stats['transcode_s']}s)")
+
+            started = time.perf_counter()
+            transcript_json, error = transcribe_with_retries(upload_path, upload_name)
+            stats['transcribe_s'] = round(time.perf_counter() - started, 2)
+
+        if transcript_json and not transcript_json.get('utterances') and transcript_json.get('words'):
+            transcript_json['utterances'] = words_to_utterances(transcript_json['words'])
+        if transcript_json:
+            transcript_json['upload_stats'] = stats
+        return transcript_json, error
+
+    plan = plan_chunks(duration, detect_silences(path))
+    print(f" > Long recording ({duration / 60:.1f} min) → {len(plan)} chunks at silence boundaries")
+
+    with tempfile.TemporaryDirectory(prefix='audio-chunks-') as tmp:
+        jobs = []
+        started = time.perf_counter()
+        for i, (keep_start, keep_end) in enumerate(plan):
+            offset = max(0.0, keep_start - CHUNK_OVERLAP_SECONDS) if i else 0.0
+            chunk_path = os.path.join(tmp, f"chunk_{i:03d}.flac")
+            _extract_chunk(path, offset, keep_end, chunk_path)
+            jobs.append({'index': i, 'keep': (keep_start, keep_end), 'offset': offset, 'path': chunk_path})
+            stats['uploaded_bytes'] += os.path.getsize(chunk_path)
+        stats['transcoded'] = 'flac'
+        stats['transcode_s'] = round(time.perf_counter() - started, 2)
+
+        def run(job):
+            transcript_json, error = transcribe_with_retries(job['path'], f"chunk_{job['index']:03d}.flac")
+            print(f" > Chunk {job['index'] + 1}/{len(jobs)} {'done' if transcript_json else 'FAILED'}")
+            return job, transcript_json, error
+
+        started = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=CHUNK_WORKERS) as pool:
+            results = list(pool.map(run, jobs))
+        stats['transcribe_s'] = round(time.perf_counter() - started, 2)
+
+    failed = [(job['index'], error) for job, transcript_json, error in results if transcript_json is None]
+    if failed:
+        return None, f"{len(failed)} of {len(jobs)} chunks failed (chunk {failed[0][0] + 1}: {failed[0][1]})"
+
+    words = stitch_chunks([
+        {'keep': job['keep'], 'offset': job['offset'], 'words': transcript_json.get('words') or []}
+        for job, transcript_json, _error in results
+    ])
+    text = "".join(w['text'] for w in words)
+    return {
+        'text': text,
+        'words': words,
+        'utterances': words_to_utterances(words),
+        'language_code': results[0][1].get('language_code'),
+        'chunks': len(jobs),
+        'duration': duration,
+        'upload_stats': stats,
+    }, None
+
+
+# ============================================================================
+# CONTENT-ADDRESSED STORAGE - sha256 dedup + transcript reuse
+# ============================================================================
+
+def blob_path(digest, ext):
+    """MEDIA_ROOT ke relative path: uploads/audio/sha256/ab/<digest>.mp3"""
+    return f"uploads/audio/sha256/{digest[:2]}/{digest}{ext}"
+
+
+def sha256_file(path, block_size=1024 * 1024):
+    """Disk file ka (sha256 hex, size) - 1 MB blocks mein (memory constant)"""
+    digest, size = hashlib.sha256(), 0
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+            size += len(block)
+    return digest.hexdigest(), size
+
+
+def store_audio_upload(uploaded):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  UPLOAD → PRE-FLIGHT → AUDIOBLOB (hash while streaming, stored once)      ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+    
+    Django UploadedFile ke chunks ek temp file mein likhte hue sha256 update hota
+    hai (ek hi pass). Temp file pe preflight_audio() - reject hua to temp file
+    delete aur koi AudioBlob nahi (orphan files nahi bachti). Pass hua to blob
+    pehle se ho to temp file delete, warna atomic rename content-addressed path pe.
+    
+    RETURNS: (AudioBlob ya None, probe, reject_message ya None)
+    """
+    ext = os.path.splitext(uploaded.name or '')[1].lower()[:10]
+    tmp_dir = os.path.join(settings.MEDIA_ROOT, 'uploads', 'audio', 'sha256', 'tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    digest, size = hashlib.sha256(), 0
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=ext)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in uploaded.chunks():
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        sha = digest.hexdigest()
+
+        probe, reject = preflight_audio(tmp_path)  # Khaali / unsupported file → blob hi nahi
+        if reject:
+            os.remove(tmp_path)
+            return None, probe, reject
+
+        blob, created = AudioBlob.objects.get_or_create(
+            sha256=sha, defaults={'size': size, 'file': blob_path(sha, ext)}
+        )
+        final_path = blob.file.path
+        if os.path.exists(final_path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(tmp_path, final_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    print(f" > Audio sha256 {sha[:12]}… ({size / (1024 * 1024):.1f} MB) - {'new blob' if created else 'duplicate, stored once'}")
+    return blob, probe, None
+
+
+def transcribe_blob(blob, filename=None, probe=None):
+    """
+    Blob ka cached transcript ho to wahi (ElevenLabs call nahi), warna
+    transcribe_audio() aur result blob pe save.
+    RETURNS: (transcript_json, error)
+    """
+    if blob.transcript_json:
+        print(" > Same audio already transcribed (sha256 match) - reusing transcript")
+        return json.loads(blob.transcript_json), None
+
+    transcript_json, error = transcribe_audio(blob.file.path, filename=filename, probe=probe)
+    if transcript_json is not None:
+        blob.transcript_json = json.dumps(transcript_json)
+        blob.save(update_fields=['transcript_json'])
+    return transcript_json, error
@@ -0,0 +1,228 @@
+"""
+================================================================================
+                WEB3.AI - COINGECKO COIN INDEX (symbol / name → coin id)
+================================================================================
+YEH FILE POORI COINGECKO COIN LIST KO LOCAL INDEX MEIN RAKHTI HAI
+
+FUNCTIONALITY:
+- /coins/list (~17k coins) + /coins/markets (top COIN_INDEX_RANKED_PAGES x 250
+  market cap rank) ek baar download → gzip JSON file (sab workers share karte hain)
+- CoinIndex: symbol → ids (market cap rank order), name → id dicts -
+  lookup O(1), per-request koi API call nahi
+- Ambiguous ticker (e.g. 'UNI' - 20+ coins) → sabse bada market cap wala
+- File COIN_INDEX_TTL se purani ho to background thread refresh karta hai
+  (tab tak purana index serve hota hai)
+- File hi nahi (cold start) → download bhi background mein; tab tak sirf
+  overrides (COMMON_SYMBOLS) resolve hote hain - request kabhi block nahi hoti.
+  Download fail → REFRESH_BACKOFF_SECONDS tak dobara try nahi
+
+USED BY:
+- agents/finance_helper.py → get_market_context_for_gemini (resolve_symbols)
+- python manage.py refresh_coin_index
+
+LOCATION: agents/coin_index.py
+
+FILE FORMAT (gzip JSON):
+┌─────────────────────────────────────────────────────────────────────┐
+│ {"fetched_at": 1700000000.0,                                        │
+│  "coins": [[id, symbol, name, market_cap_rank|null], ...]}          │
+└─────────────────────────────────────────────────────────────────────┘
+================================================================================
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+
+COINS_LIST_URL = "https://api.coingecko.com/api/v3/coins/list"
+COINS_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+COIN_INDEX_RANKED_PAGES = 4        # Top 1000 coins ka market cap rank
+MTIME_CHECK_SECONDS = 60           # Dusre worker ne file refresh ki ho to reload
+REFRESH_BACKOFF_SECONDS = 15 * 60  # Download fail ke baad itni der retry nahi
+
+_index = None
+_index_mtime = None
+_last_check = 0.0
+_load_lock = threading.Lock()
+_refreshing = threading.Event()
+_refresh_failed_at = 0.0
+
+
+class CoinIndex:
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  IN-MEMORY COIN INDEX                                                     ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    USAGE:
+    ```python
+    index = CoinIndex([['ethereum', 'eth', 'Ethereum', 2], ...])
+    index.resolve('ETH')          # 'ethereum'
+    index.resolve('Chainlink')    # name se bhi
+    index.candidates('UNI')       # ('uniswap', ...) market cap order mein
+    ```
+    """
+
+    def __init__(self, coins):
+        by_symbol, by_name = {}, {}
+        # Rank wale pehle (chhota rank = bada market cap), phir chhota id (canonical coins)
+        ordered = sorted(coins, key=lambda c: (c[3] is None, c[3] or 0, len(c[0]), c[0]))
+        for cg_id, symbol, name, _rank in ordered:
+            by_symbol.setdefault(symbol.upper(), []).append(cg_id)
+            by_name.setdefault(name.lower(), cg_id)
+        self._by_symbol = {sym: tuple(ids) for sym, ids in by_symbol.items()}
+        self._by_name = by_name
+        self._ids = frozenset(c[0] for c in coins)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def candidates(self, symbol):
+        return self._by_symbol.get(symbol.upper(), ())
+
+    def resolve(self, token):
+        """Symbol (rank order mein pehla) → name → exact id; na mile to None"""
+        ids = self._by_symbol.get(token.upper())
+        if ids:
+            return ids[0]
+        return self._by_name.get(token.lower()) or (token.lower() if token.lower() in self._ids else None)
+
+
+# ============================================================================
+# DOWNLOAD + PERSIST
+# ============================================================================
+
+def index_path():
+    return str(getattr(settings, 'COIN_INDEX_PATH', None) or (settings.MEDIA_ROOT / 'cache' / 'coin_index.json.gz'))
+
+
+def _api_params(extra=None):
+    params = dict(extra or {})
+    api_key = getattr(settings, 'COINGECKO_API_KEY', None)
+    if api_key:
+        params['x_cg_demo_api_key'] = api_key
+    return params
+
+
+def download_coins():
+    """CoinGecko se [[id, symbol, name, rank], ...] - ranks sirf top pages ke liye"""
+    response = requests.get(COINS_LIST_URL, params=_api_params(), timeout=30)
+    response.raise_for_status()
+    coins = response.json()
+
+    ranks = {}
+    for page in range(1, COIN_INDEX_RANKED_PAGES + 1):
+        try:
+            r = requests.get(COINS_MARKETS_URL, timeout=15, params=_api_params({
+                'vs_currency': 'usd', 'order': 'market_cap_desc', 'per_page': 250, 'page': page,
+            }))
+            if r.status_code != 200:
+                print(f"CoinGecko markets page {page}: HTTP {r.status_code}")
+                break
+            for row in r.json():
+                if row.get('market_cap_rank'):
+                    ranks[row['id']] = row['market_cap_rank']
+        except (requests.RequestException, ValueError) as e:
+            print(f"CoinGecko markets page {page} error: {e}")
+            break
+
+    return [[c['id'], c['symbol'], c['name'], ranks.get(c['id'])]
+            for c in coins if c.get('id') and c.get('symbol')]
+
+
+def refresh_index():
+    """Download + atomic write (workers beech mein half file kabhi nahi padhte). RETURNS: coin count"""
+    coins = download_coins()
+    path = index_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                f.write(json.dumps({'fetched_at': time.time(), 'coins': coins}).encode('utf-8'))
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    print(f" > Coin index refreshed: {len(coins)} coins")
+    return len(coins)
+
+
+def _refresh_in_background():
+    if _refreshing.is_set() or time.time() - _refresh_failed_at < REFRESH_BACKOFF_SECONDS:
+        return
+    _refreshing.set()
+
+    def run():
+        global _refresh_failed_at, _last_check
+        try:
+            refresh_index()
+            _last_check = 0.0  # Agla get_coin_index() nayi file turant load kare
+        except Exception as e:
+            _refresh_failed_at = time.time()
+            print(f"Coin index refresh failed (retry in {REFRESH_BACKOFF_SECONDS // 60} min): {e}")
+        finally:
+            _refreshing.clear()
+
+    threading.Thread(target=run, name='coin-index-refresh', daemon=True).start()
+
+
+def get_coin_index():
+    """
+    Process-wide CoinIndex (ya None jab tak file download nahi hui).
+    - File nahi → background download (request path pe kabhi nahi), None return
+    - File purani (COIN_INDEX_TTL) → background refresh, purana index serve
+    - File badli (dusre worker ne refresh ki) → reload
+    """
+    global _index, _index_mtime, _last_check
+    now = time.time()
+    if _index is not None and now - _last_check < MTIME_CHECK_SECONDS:
+        return _index
+
+    with _load_lock:
+        _last_check = now
+        path = index_path()
+        if not os.path.exists(path):
+            _refresh_in_background()
+            return _index
+
+        mtime = os.path.getmtime(path)
+        if _index is None or mtime != _index_mtime:
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    _index = CoinIndex(json.load(f)['coins'])
+                _index_mtime = mtime
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Coin index load failed: {e}")
+
+        if now - mtime > getattr(settings, 'COIN_INDEX_TTL', 86400):
+            _refresh_in_background()
+    return _index
+
+
+def resolve_symbols(symbols, overrides=None):
+    """
+    Symbols list → {symbol: coingecko_id} (unresolved skip).
+    overrides (e.g. COMMON_SYMBOLS) index se pehle - jaise MON → monad.
+    """
+    overrides = overrides or {}
+    index = None
+    resolved = {}
+    for sym in symbols:
+        if sym in overrides:
+            resolved[sym] = overrides[sym]
+            continue
+        if index is None:
+            index = get_coin_index() or False  # False = index abhi nahi, sirf overrides
+        cg_id = index.resolve(sym) if index else None
+        if cg_id:
+            resolved[sym] = cg_id
+    return resolved
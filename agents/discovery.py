@@ -0,0 +1,342 @@
+"""
+================================================================================
+                    WEB3.AI - PAGE DISCOVERY MODULE (robots.txt + sitemap)
+================================================================================
+YEH FILE COMPETITOR SITE KE HIGH-VALUE PAGES DHUNDHTI HAI
+
+FUNCTIONALITY:
+- robots.txt padhta hai (Sitemap: entries + Disallow rules)
+- sitemap.xml / sitemap index / .xml.gz ko STREAMING parse karta hai
+  (XMLPullParser + elem.clear() - bade sitemaps bhi bounded memory mein)
+- Har candidate URL ko path tokens se score karta hai (pricing > plans > ...)
+- Locale prefix sirf asli ISO language codes (/de/, /pt-br/) - /ai/, /go/ jaise
+  pages nahi; en / en-us / en-gb English maane jaate hain
+- robots.txt + sitemap ka result (har section ka best URL) DiskCache mein
+  SITEMAP_CACHE_TTL tak - har scrape pe sitemap dobara download nahi
+- Homepage ke <a> links (HTML) ya markdown links (Jina output) fallback hain
+
+USED BY:
+- agents/scraper.py → scrape_site()
+
+LOCATION: agents/discovery.py
+
+WORKFLOW:
+┌─────────────────────────────────────────────────────────────────────┐
+│ 1. /robots.txt fetch → Sitemap URLs + can_fetch() rules             │
+│ 2. Sitemaps stream karo (index → child sitemaps, max limits ke saath)│
+│    (1 + 2 cache mein - hit pe koi network call nahi)                │
+│ 3. Homepage links bhi candidates mein add karo                      │
+│ 4. Score karo, har section ka best URL chuno, top N return karo     │
+└─────────────────────────────────────────────────────────────────────┘
+================================================================================
+"""
+
+import re
+import time
+import zlib
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+from xml.etree.ElementTree import XMLPullParser, ParseError
+
+import requests
+from django.conf import settings
+
+from .disk_cache import is_expired
+from .ipv4 import http
+
+
+# ============================================================================
+# CONSTANTS - Scoring weights aur limits
+# ============================================================================
+
+# Path token → weight. Sabse bada matched token section decide karta hai
+SECTION_WEIGHTS = {
+    'pricing': 10,
+    'plans': 9,
+    'features': 7,
+    'product': 6,
+    'products': 6,
+    'solutions': 5,
+    'about': 4,
+    'customers': 3,
+    'enterprise': 3,
+    'contact': 2,
+}
+
+# Section labels jo same cheez ke synonyms hain
+SECTION_ALIASES = {'products': 'PRODUCT', 'plans': 'PLANS'}
+
+# Yeh tokens wale URLs competitor analysis ke liye low-value hain
+NEGATIVE_TOKENS = {
+    'blog', 'news', 'press', 'careers', 'jobs', 'legal', 'privacy', 'terms',
+    'cookie', 'cookies', 'login', 'signin', 'signup', 'register', 'docs',
+    'help', 'support', 'tag', 'tags', 'category', 'author', 'search', 'feed',
+    'wp-content', 'wp-json', 'cdn', 'assets', 'static',
+}
+
+# Locale path prefix: language[-_region] (e.g. de, pt-br, zh_tw, zh-hans).
+# Sirf in ISO 639-1 languages pe - warna /ai/, /go/, /my/ jaise asli pages bhi skip ho jaate
+LOCALE_RE = re.compile(r'^([a-z]{2})(?:[-_]([a-z]{2}|hans|hant|latn))?$')
+LOCALE_LANGUAGES = frozenset({
+    'ar', 'bg', 'bn', 'ca', 'cs', 'cy', 'da', 'de', 'el', 'en', 'es', 'et', 'eu', 'fa',
+    'fi', 'fr', 'ga', 'gl', 'he', 'hi', 'hr', 'hu', 'hy', 'id', 'is', 'it', 'ja', 'ka',
+    'kk', 'km', 'ko', 'lt', 'lv', 'mk', 'mn', 'ms', 'mt', 'nb', 'ne', 'nl', 'nn', 'no',
+    'pl', 'pt', 'ro', 'ru', 'sk', 'sl', 'sq', 'sr', 'sv', 'sw', 'ta', 'te', 'th', 'tl',
+    'tr', 'uk', 'ur', 'uz', 'vi', 'zh',
+})
+MARKDOWN_LINK_RE = re.compile(r'\]\((https?://[^)\s]+|/[^)\s]*)\)')
+BINARY_EXT_RE = re.compile(r'\.(?:png|jpe?g|gif|svg|webp|pdf|zip|mp4|mp3|css|js|xml|gz)$', re.I)
+
+MAX_SITEMAPS = 6            # Index se kitne child sitemaps follow karein
+MAX_SITEMAP_URLS = 50000    # Total <loc> entries jo scan honge
+SITEMAP_TIMEOUT = 8
+ROBOTS_TIMEOUT = 5
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+def _same_site(netloc, base_netloc):
+    strip = lambda n: n.lower().removeprefix('www.')
+    return strip(netloc) == strip(base_netloc)
+
+
+def locale_language(segment):
+    """Path segment locale hai to uski language ('de', 'en', ...), warna None"""
+    match = LOCALE_RE.match(segment)
+    if match and match.group(1) in LOCALE_LANGUAGES:
+        return match.group(1)
+    return None
+
+
+def score_url(url, base_netloc):
+    """
+    URL ko path tokens se score karta hai.
+    RETURNS: (score, section) ya (None, None) agar URL useless hai
+    """
+    parts = urlparse(url)
+    if parts.scheme not in ('http', 'https') or not _same_site(parts.netloc, base_netloc):
+        return None, None
+    if BINARY_EXT_RE.search(parts.path):
+        return None, None
+
+    segments = [seg for seg in parts.path.lower().split('/') if seg]
+    if not segments:
+        return None, None  # Homepage already fetched hai
+    language = locale_language(segments[0])
+    if language not in (None, 'en'):
+        return None, None  # Non-English locale copies skip (en, en-us, en-gb rakhte hain)
+
+    tokens = set()
+    for seg in segments:
+        tokens.update(t for t in re.split(r'[-_.]+', seg) if t)
+    if tokens & NEGATIVE_TOKENS:
+        return None, None
+
+    best_token = max((t for t in tokens if t in SECTION_WEIGHTS), key=SECTION_WEIGHTS.get, default=None)
+    if not best_token:
+        return None, None
+
+    depth = len(segments) - (1 if language else 0)
+    score = SECTION_WEIGHTS[best_token] - 1.5 * (depth - 1)
+    if parts.query:
+        score -= 2
+    section = SECTION_ALIASES.get(best_token, best_token.upper())
+    return score, section
+
+
+# ============================================================================
+# ROBOTS.TXT
+# ============================================================================
+
+def fetch_robots_lines(base_url, force_ipv4=False):
+    """robots.txt ki lines ([] = file nahi, sab allowed); network error pe None"""
+    robots_url = urljoin(base_url, '/robots.txt')
+    try:
+        resp = http(force_ipv4).get(robots_url, headers={'User-Agent': USER_AGENT}, timeout=ROBOTS_TIMEOUT)
+    except Exception as e:
+        print(f"    ⚠️ robots.txt unavailable: {str(e)[:50]}")
+        return None
+    return resp.text.splitlines() if resp.status_code == 200 else []
+
+
+def parse_robots(base_url, lines):
+    robots = RobotFileParser()
+    robots.set_url(urljoin(base_url, '/robots.txt'))
+    robots.parse(lines or [])
+    return robots
+
+
+# ============================================================================
+# SITEMAP STREAMING PARSER
+# ============================================================================
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def iter_sitemap(sitemap_url, max_urls=MAX_SITEMAP_URLS, force_ipv4=False):
+    """
+    Ek sitemap ko stream karke ('url' | 'sitemap', loc) tuples yield karta hai.
+    Chunks XMLPullParser mein feed hote hain; gzip (.gz magic bytes) transparently
+    decompress hota hai. Processed elements clear ho jaate hain - memory bounded.
+    """
+    resp = http(force_ipv4).get(sitemap_url, headers={'User-Agent': USER_AGENT}, timeout=SITEMAP_TIMEOUT, stream=True)
+    try:
+        if resp.status_code != 200:
+            return
+        parser = XMLPullParser(events=('end',))
+        inflater = None
+        first = True
+        count = 0
+        for chunk in resp.iter_content(chunk_size=64 * 1024):
+            if first:
+                first = False
+                if chunk[:2] == b'\x1f\x8b':  # .xml.gz file
+                    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            parser.feed(inflater.decompress(chunk) if inflater else chunk)
+            for _event, elem in parser.read_events():
+                kind = _local_name(elem.tag)
+                if kind not in ('url', 'sitemap'):
+                    continue
+                loc = next((child.text for child in elem if _local_name(child.tag) == 'loc'), None)
+                elem.clear()
+                if loc:
+                    yield kind, loc.strip()
+                    count += 1
+                    if count >= max_urls:
+                        return
+    except (ParseError, zlib.error) as e:
+        print(f"    ⚠️ Sitemap parse stopped ({sitemap_url[:50]}): {str(e)[:50]}")
+    finally:
+        resp.close()
+
+
+def _sitemap_priority(url):
+    """Child sitemaps ka order: page/product sitemaps pehle, blog/post baad mein"""
+    name = urlparse(url).path.lower()
+    if any(t in name for t in ('post', 'blog', 'news', 'tag', 'author', 'category')):
+        return 2
+    if any(t in name for t in ('page', 'product', 'main', 'pricing')):
+        return 0
+    return 1
+
+
+def sitemap_candidates(base_url, robots, force_ipv4=False):
+    """Robots + default locations ke sitemaps stream karke page URLs yield karta hai"""
+    queue = list(robots.site_maps() or []) or [urljoin(base_url, '/sitemap.xml')]
+    seen = set()
+    budget = MAX_SITEMAP_URLS
+
+    while queue and len(seen) < MAX_SITEMAPS and budget > 0:
+        sitemap_url = queue.pop(0)
+        if sitemap_url in seen:
+            continue
+        seen.add(sitemap_url)
+        print(f"    🗺️ Reading sitemap: {sitemap_url[:60]}")
+        children = []
+        try:
+            for kind, loc in iter_sitemap(sitemap_url, max_urls=budget, force_ipv4=force_ipv4):
+                budget -= 1
+                if kind == 'sitemap':
+                    children.append(loc)
+                else:
+                    yield loc
+        except requests.RequestException as e:
+            print(f"    ⚠️ Sitemap fetch failed: {str(e)[:50]}")
+        queue.extend(sorted(children, key=_sitemap_priority))
+
+
+# ============================================================================
+# HOMEPAGE LINK EXTRACTION (fallback / supplement)
+# ============================================================================
+
+def homepage_links(base_url, home_soup=None, home_text=''):
+    if home_soup is not None:
+        for a in home_soup.find_all('a', href=True):
+            yield urljoin(base_url, a['href'])
+    elif home_text:
+        # Jina Reader markdown: [text](url)
+        for match in MARKDOWN_LINK_RE.finditer(home_text):
+            yield urljoin(base_url, match.group(1))
+
+
+# ============================================================================
+# MAIN DISCOVERY FUNCTION
+# ============================================================================
+
+def _best_pick(best, section, score, url):
+    """section → (score, url) mein sirf best rakho (tie pe chhota URL)"""
+    current = best.get(section)
+    if current is None or score > current[0] or (score == current[0] and len(url) < len(current[1])):
+        best[section] = (score, url)
+
+
+def site_map_candidates(base_url, force_ipv4=False, cache=None):
+    """
+    robots.txt lines + sitemap se har section ka best (score, url).
+    cache (DiskCache) mein origin ke key pe SITEMAP_CACHE_TTL tak - robots.txt
+    network error pe cache nahi (agli scrape dobara try kare).
+    RETURNS: (robots lines, {section: (score, url)})
+    """
+    parts = urlparse(base_url)
+    key = f"discovery:{parts.scheme.lower()}://{parts.netloc.lower()}"
+    entry = cache.get(key) if cache is not None else None
+    if entry and not is_expired(entry):
+        print(f"    ♻️ Discovery cache hit: {len(entry['best'])} sitemap sections")
+        return entry['robots'], {section: (score, url) for section, score, url in entry['best']}
+
+    lines = fetch_robots_lines(base_url, force_ipv4)
+    robots = parse_robots(base_url, lines)
+    best = {}
+    for url in sitemap_candidates(base_url, robots, force_ipv4):
+        url = url.split('#', 1)[0]
+        score, section = score_url(url, parts.netloc)
+        if score is not None:
+            _best_pick(best, section, score, url)
+
+    if cache is not None and lines is not None:
+        ttl = getattr(settings, 'SITEMAP_CACHE_TTL', 86400)
+        try:
+            cache.set(key, {'robots': lines, 'best': [[sec, sc, u] for sec, (sc, u) in best.items()],
+                            'expires_at': time.time() + ttl})
+        except OSError as e:
+            print(f"    ⚠️ Discovery cache write failed: {str(e)[:50]}")
+    return lines or [], best
+
+
+def discover_pages(base_url, home_soup=None, home_text='', limit=4, force_ipv4=False, cache=None):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  HIGH-VALUE PAGES DHUNDHO (sitemap-first, homepage links fallback)        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    cache: DiskCache (scraper ka HTTP cache) - robots + sitemap result reuse
+    RETURNS: [(section, url), ...] - score ke order mein, har section ka ek URL
+    """
+    base_netloc = urlparse(base_url).netloc
+    lines, best = site_map_candidates(base_url, force_ipv4, cache)
+    robots = parse_robots(base_url, lines)
+    from_sitemap = len(best)
+
+    # Homepage pe link hona = site owner ke liye important (chhota bonus)
+    for url in homepage_links(base_url, home_soup, home_text):
+        url = url.split('#', 1)[0]
+        score, section = score_url(url, base_netloc)
+        if score is not None:
+            _best_pick(best, section, score + 0.5, url)
+
+    ranked = sorted(best.items(), key=lambda item: -item[1][0])
+    pages = []
+    for section, (_score, url) in ranked:
+        if not robots.can_fetch(USER_AGENT, url):
+            print(f"    🚫 Disallowed by robots.txt: {url}")
+            continue
+        pages.append((section, url))
+        if len(pages) >= limit:
+            break
+
+    print(f"    🔗 Discovery: {from_sitemap} sections via sitemap, {len(best)} total → fetching {len(pages)}")
+    return pages
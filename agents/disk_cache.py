@@ -0,0 +1,176 @@
+"""
+================================================================================
+                    WEB3.AI - COMPRESSED DISK CACHE MODULE
+================================================================================
+YEH FILE EK CHHOTA SA ON-DISK KEY/VALUE CACHE DETI HAI
+
+FUNCTIONALITY:
+- JSON-serializable values ko gzip karke disk pe store karta hai
+- Atomic writes (temp file + os.replace) - multiple gunicorn workers safe
+- Size-bounded: limit cross hone pe sabse purani (least recently used)
+  entries delete hoti hain
+- Har entry ek alag file hai, isliye workers ke beech cache share hota hai
+
+USED BY:
+- agents/scraper.py (HTTP revalidation cache - ETag / Last-Modified)
+
+LOCATION: agents/disk_cache.py
+
+LAYOUT ON DISK:
+┌─────────────────────────────────────────────────────────────────────┐
+│ <directory>/ab/ab12cd...ef.json.gz   ← sha256(key) se file name      │
+│ File ka mtime = last access time (LRU eviction ke liye)             │
+└─────────────────────────────────────────────────────────────────────┘
+================================================================================
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class DiskCache:
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  SIZE-BOUNDED COMPRESSED DISK CACHE                                       ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    USAGE:
+    ```python
+    cache = DiskCache('/tmp/my-cache', max_bytes=50 * 1024 * 1024)
+    cache.set('page:https://example.com', {'text': '...', 'etag': '"abc"'})
+    entry = cache.get('page:https://example.com')   # dict ya None
+    ```
+    """
+
+    SUFFIX = '.json.gz'
+
+    def __init__(self, directory, max_bytes=100 * 1024 * 1024):
+        self.directory = str(directory)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._approx_bytes = None  # Pehli write pe disk walk karke calculate hota hai
+
+    # ┌──────────────────────────────────────────────────────────────────────┐
+    # │ PATH HELPERS                                                         │
+    # └──────────────────────────────────────────────────────────────────────┘
+    def _path(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + self.SUFFIX)
+
+    def _iter_files(self):
+        if not os.path.isdir(self.directory):
+            return
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(self.SUFFIX):
+                    yield os.path.join(root, name)
+
+    # ┌──────────────────────────────────────────────────────────────────────┐
+    # │ READ / WRITE                                                         │
+    # └──────────────────────────────────────────────────────────────────────┘
+    def get(self, key):
+        """Entry return karta hai (dict/list/etc.) ya None agar missing/corrupt ho"""
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError, EOFError):
+            return None
+        try:
+            os.utime(path, None)  # LRU: access pe mtime refresh
+        except OSError:
+            pass
+        return value
+
+    def set(self, key, value):
+        """Value ko atomically likhta hai, phir zarurat ho to eviction chalata hai"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) as f:
+                    f.write(json.dumps(value).encode('utf-8'))
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._disk_usage()
+            else:
+                self._approx_bytes += size
+            over_limit = self._approx_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def values(self):
+        """Sab entries iterate karta hai (benchmarks / maintenance ke liye; LRU touch nahi hota)"""
+        for path in self._iter_files():
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    yield json.load(f)
+            except (OSError, ValueError, EOFError):
+                continue
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    # ┌──────────────────────────────────────────────────────────────────────┐
+    # │ EVICTION - LRU by mtime, target = 90% of max_bytes                   │
+    # └──────────────────────────────────────────────────────────────────────┘
+    def _disk_usage(self):
+        total = 0
+        for path in self._iter_files():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                continue
+        return total
+
+    def evict(self):
+        entries = []
+        for path in self._iter_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _mtime, size, _path in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        if total > self.max_bytes:
+            entries.sort()  # Oldest access pehle
+            for _mtime, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+                except OSError:
+                    continue
+
+        with self._lock:
+            self._approx_bytes = total
+        return removed
+
+
+def is_expired(entry, now=None):
+    """Entry mein 'expires_at' (epoch seconds) ho aur woh guzar chuka ho to True"""
+    expires_at = (entry or {}).get('expires_at')
+    return expires_at is not None and (now or time.time()) >= expires_at
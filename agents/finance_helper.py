@@ -1,32 +1,296 @@
 import requests
+import hashlib
 import json
+import os
 import re
+import threading
+import time
 from django.conf import settings
 
+from .coin_index import resolve_symbols
+from .disk_cache import DiskCache
+
+
+# ============================================================================
+# PRICE CACHE - CoinGecko prices shared across workers (DiskCache + TTL)
+# ============================================================================
+
+COINGECKO_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
+PRICE_STALE_SECONDS = 15 * 60   # Fetch fail ho to itni purani price bhi chalegi
+BATCH_WINDOW_SECONDS = 0.05     # Itni der mein aaye lookups ek ids= request mein
+FETCH_LOCK_WAIT = 3.0           # Dusra worker unhi ids ko fetch kar raha ho to max itna wait
+FETCH_LOCK_MARGIN = 10          # Lock expiry = is margin + har CoinGecko call ka timeout
+MAX_IDS_PER_CALL = 200          # URL length limit
+REQUEST_TIMEOUT = 5
+
+_price_cache = None
+_batch_lock = threading.Lock()
+_open_batch = None
+_refresher_started = False
+
+
+def get_price_cache():
+    """Process-wide DiskCache instance (lazily banta hai, settings se config)"""
+    global _price_cache
+    if _price_cache is None:
+        cache_dir = getattr(settings, 'PRICE_CACHE_DIR', None) or (settings.MEDIA_ROOT / 'cache' / 'prices')
+        _price_cache = DiskCache(cache_dir, max_bytes=10 * 1024 * 1024)
+    return _price_cache
+
+
+def _price_ttl():
+    return getattr(settings, 'COINGECKO_PRICE_TTL', 60)
+
+
+def _read_cached(ids, min_ttl=0, allow_stale=False):
+    """Cache se {id: data} - sirf woh entries jo abhi min_ttl seconds aur fresh hain (ya stale allowed)"""
+    now, found = time.time(), {}
+    for cg_id in ids:
+        entry = get_price_cache().get(f"price:{cg_id}")
+        if not entry:
+            continue
+        if entry['expires_at'] - now > min_ttl or (allow_stale and now - entry['fetched_at'] < PRICE_STALE_SECONDS):
+            found[cg_id] = entry['data']
+    return found
+
+
+def _request_prices(ids):
+    """CoinGecko simple/price - MAX_IDS_PER_CALL ke batches, fail hone pe partial result"""
+    api_key = getattr(settings, 'COINGECKO_API_KEY', None)
+    result = {}
+    for i in range(0, len(ids), MAX_IDS_PER_CALL):
+        params = {
+            "ids": ",".join(ids[i:i + MAX_IDS_PER_CALL]),
+            "vs_currencies": "usd",
+            "include_24hr_change": "true"
+        }
+        if api_key:
+            params['x_cg_demo_api_key'] = api_key
+        try:
+            response = requests.get(COINGECKO_PRICE_URL, params=params, timeout=REQUEST_TIMEOUT)
+            if response.status_code == 200:
+                result.update(response.json())
+            else:
+                print(f"CoinGecko Error: HTTP {response.status_code}")
+        except Exception as e:
+            print(f"CoinGecko Error: {e}")
+    return result
+
+
+def _lock_path(cg_id):
+    digest = hashlib.blake2b(cg_id.encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(get_price_cache().directory, 'locks', f"{digest}.lock")
+
+
+def _lock_expired(path, now):
+    """Lock file mein holder ki expiry likhi hoti hai; khaali (abhi bana) ho to mtime se"""
+    try:
+        with open(path) as f:
+            expires = f.read().strip()
+        if expires:
+            return now > float(expires)
+        return now - os.path.getmtime(path) > FETCH_LOCK_MARGIN + REQUEST_TIMEOUT
+    except (OSError, ValueError):
+        return False
+
+
+def _acquire_fetch_locks(ids):
+    """
+    Cross-worker per-id lock files (O_EXCL) - ek id ko ek hi worker fetch kare,
+    alag ids wale workers ek doosre ka wait nahi karte. Expiry holder ke batch
+    size se (har MAX_IDS_PER_CALL pe ek REQUEST_TIMEOUT) - lambe imports ka live
+    lock stale maan ke nahi hatta. RETURNS: (claimed_ids, held_by_others)
+    """
+    os.makedirs(os.path.dirname(_lock_path('x')), exist_ok=True)
+    now = time.time()
+    calls = -(-len(ids) // MAX_IDS_PER_CALL)
+    expires = f"{now + FETCH_LOCK_MARGIN + calls * REQUEST_TIMEOUT:.0f}".encode()
+    claimed, held = [], []
+    for cg_id in ids:
+        path = _lock_path(cg_id)
+        for _attempt in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if _attempt == 0 and _lock_expired(path, now):
+                    try:
+                        os.remove(path)  # Crashed worker ki lock
+                    except OSError:
+                        pass
+                    continue
+                held.append(cg_id)
+                break
+            try:
+                os.write(fd, expires)
+            finally:
+                os.close(fd)
+            claimed.append(cg_id)
+            break
+    return claimed, held
+
+
+def _release_fetch_locks(ids):
+    for cg_id in ids:
+        try:
+            os.remove(_lock_path(cg_id))
+        except OSError:
+            pass
+
+
+def _store_prices(fetched):
+    now, ttl = time.time(), _price_ttl()
+    for cg_id, data in fetched.items():
+        get_price_cache().set(f"price:{cg_id}", {'data': data, 'fetched_at': now, 'expires_at': now + ttl})
+
+
+def _fetch_shared(ids, min_ttl=0):
+    """
+    Stampede protection (per id): jo ids lock ho gayi woh turant fetch + cache.
+    Jo ids doosra worker fetch kar raha hai unka wait sirf tab tak jab tak uski
+    lock release na ho (max FETCH_LOCK_WAIT) - release ke baad bhi missing =
+    CoinGecko ne nahi di, dobara call nahi. Wait timeout pe khud fetch.
+    """
+    found = _read_cached(ids, min_ttl)
+    pending = [cg_id for cg_id in ids if cg_id not in found]
+    if not pending:
+        return found
+
+    claimed, held = _acquire_fetch_locks(pending)
+    try:
+        found.update(_read_cached(claimed, min_ttl))  # Lock se pehle kisi ne bhar diya ho
+        to_fetch = [cg_id for cg_id in claimed if cg_id not in found]
+        if to_fetch:
+            fetched = _request_prices(to_fetch)
+            _store_prices(fetched)
+            found.update(fetched)
+    finally:
+        _release_fetch_locks(claimed)
+
+    deadline = time.time() + FETCH_LOCK_WAIT
+    while held:
+        # Pehle lock check, phir cache - release se pehle likhi price miss na ho
+        still_locked = {cg_id for cg_id in held if os.path.exists(_lock_path(cg_id))}
+        found.update(_read_cached(held, min_ttl))
+        held = [cg_id for cg_id in held if cg_id in still_locked and cg_id not in found]
+        if not held or time.time() >= deadline:
+            break
+        time.sleep(0.1)
+    if held:
+        fetched = _request_prices(held)
+        _store_prices(fetched)
+        found.update(fetched)
+    return found
+
+
+class _PriceBatch:
+    """Ek in-flight CoinGecko request - concurrent lookups iske ids mein jud jaate hain"""
+
+    def __init__(self):
+        self.ids = set()
+        self.done = threading.Event()
+        self.result = {}
+
+
+def _fetch_coalesced(ids, min_ttl=0):
+    """
+    Same process ke concurrent lookups ek ids= request mein: pehla thread leader
+    banta hai, BATCH_WINDOW_SECONDS tak baaki threads ke ids collect karta hai.
+    """
+    global _open_batch
+    with _batch_lock:
+        batch = _open_batch
+        leader = batch is None
+        if leader:
+            batch = _open_batch = _PriceBatch()
+        batch.ids.update(ids)
+
+    if leader:
+        time.sleep(BATCH_WINDOW_SECONDS)
+        with _batch_lock:
+            _open_batch = None  # Batch band - naye lookups naya batch banayenge
+        try:
+            batch.result = _fetch_shared(sorted(batch.ids), min_ttl)
+        finally:
+            batch.done.set()
+    else:
+        batch.done.wait(timeout=FETCH_LOCK_WAIT + FETCH_LOCK_MARGIN + 15)
+    return {cg_id: batch.result[cg_id] for cg_id in ids if cg_id in batch.result}
+
+
 def get_coingecko_price(token_ids):
     """
     Fetches simple price and 24h change for a list of token IDs.
     Returns a dictionary keyed by token_id.
-    """
-    url = "https://api.coingecko.com/api/v3/simple/price"
-    params = {
-        "ids": ",".join(token_ids),
-        "vs_currencies": "usd",
-        "include_24hr_change": "true"
-    }
     
-    # Check for API Key in settings
-    api_key = getattr(settings, 'COINGECKO_API_KEY', None)
-    if api_key:
-        params['x_cg_demo_api_key'] = api_key
-        
-    try:
-        response = requests.get(url, params=params, timeout=5)
-        if response.status_code == 200:
-            return response.json()
-    except Exception as e:
-        print(f"CoinGecko Error: {e}")
-    return {}
+    Shared disk cache (COINGECKO_PRICE_TTL) pehle; missing ids concurrent lookups
+    ke saath ek batch mein fetch hote hain. CoinGecko fail ho to stale price.
+    """
+    ids = list(dict.fromkeys(token_ids))
+    start_price_refresher()
+    prices = _read_cached(ids)
+    missing = [cg_id for cg_id in ids if cg_id not in prices]
+    if missing:
+        prices.update(_fetch_coalesced(missing))
+        still_missing = [cg_id for cg_id in missing if cg_id not in prices]
+        if still_missing:
+            prices.update(_read_cached(still_missing, allow_stale=True))
+    return prices
+
+
+def get_fresh_prices(token_ids, max_age):
+    """
+    get_coingecko_price jaisa, par cache entry max_age seconds se purani ho to
+    refetch (TTL se pehle bhi) - live price stream poller ke liye. Cross-worker
+    lock ki wajah se har max_age mein upstream call ek hi hoti hai.
+    """
+    ids = list(dict.fromkeys(token_ids))
+    min_ttl = max(0, _price_ttl() - max_age)
+    prices = _read_cached(ids, min_ttl)
+    missing = [cg_id for cg_id in ids if cg_id not in prices]
+    if missing:
+        prices.update(_fetch_coalesced(missing, min_ttl))
+        still_missing = [cg_id for cg_id in missing if cg_id not in prices]
+        if still_missing:
+            prices.update(_read_cached(still_missing, allow_stale=True))
+    return prices
+
+
+def start_price_refresher():
+    """
+    COINGECKO_REFRESHER on ho to daemon thread COINGECKO_WARM_IDS ko expire hone
+    se pehle refresh karta rehta hai (har worker mein chalta hai, lock + fresh check
+    ki wajah se CoinGecko call phir bhi ek hi hoti hai).
+    """
+    global _refresher_started
+    if _refresher_started or not getattr(settings, 'COINGECKO_REFRESHER', False):
+        return
+    _refresher_started = True
+    interval = max(5, int(_price_ttl() * 0.8))
+
+    def loop():
+        while True:
+            warm_ids = list(getattr(settings, 'COINGECKO_WARM_IDS', None) or COMMON_SYMBOLS.values())
+            try:
+                _fetch_coalesced(warm_ids, min_ttl=interval + 5)
+            except Exception as e:
+                print(f"CoinGecko refresher error: {e}")
+            time.sleep(interval)
+
+    threading.Thread(target=loop, name='coingecko-refresher', daemon=True).start()
+    print(f" > CoinGecko price refresher started (every {interval}s)")
+
+
+CONTEXT_MAX_ASSETS = 25          # Prompt mein itne assets individually, baaki ek "Other" line
+ANALYSIS_MAX_ASSETS = 100        # Risk analytics / optimizer sirf itne top assets (history fetch bounded)
+
+
+# Map common symbols to CoinGecko IDs (Simple mapping) - refresher inhe warm rakhta hai
+COMMON_SYMBOLS = {
+    "BTC": "bitcoin", "ETH": "ethereum", "MON": "monad", "SOL": "solana",
+    "DOGE": "dogecoin", "MATIC": "matic-network", "USDC": "usd-coin",
+    "USDT": "tether", "ADA": "cardano", "XRP": "ripple", "DOT": "polkadot"
+}
+
 
 def extract_holdings(user_input):
     """
@@ -53,52 +317,79 @@ def extract_holdings(user_input):
 
     return holdings
 
-def get_market_context_for_gemini(holdings):
+def get_portfolio_snapshot(holdings):
     """
-    Prepares a context string with live prices to feed into Gemini.
+    Holdings ko live (cached) prices ke saath structured rows mein badalta hai.
+    Returns: [{'symbol', 'amount', 'cg_id', 'price', 'change_24h', 'value'}, ...]
+    price/value None = symbol resolve nahi hua ya live data nahi mila. USD = cash ($1).
     """
-    # Map common symbols to CoinGecko IDs (Simple mapping)
-    symbol_map = {
-        "BTC": "bitcoin", "ETH": "ethereum", "MON": "monad", "SOL": "solana",
-        "DOGE": "dogecoin", "MATIC": "matic-network", "USDC": "usd-coin",
-        "USDT": "tether", "ADA": "cardano", "XRP": "ripple", "DOT": "polkadot"
-    }
-    
-    ids_to_fetch = []
-    info_list = []
+    # Common symbols pehle, baaki poore CoinGecko index se (ambiguous ticker → top market cap)
+    symbol_map = resolve_symbols([h['symbol'] for h in holdings if h['symbol'] != 'USD'], overrides=COMMON_SYMBOLS)
+
+    market_data = {}
+    if symbol_map:
+        market_data = get_coingecko_price(list(symbol_map.values()))
 
+    rows = []
     for h in holdings:
         sym = h['symbol']
-        if sym in symbol_map:
-            ids_to_fetch.append(symbol_map[sym])
-        
-        info_list.append(f"{h['amount']} {sym}")
+        cg_id = symbol_map.get(sym)
+        row = {'symbol': sym, 'amount': h['amount'], 'cg_id': cg_id, 'price': None, 'change_24h': None, 'value': None}
+        if cg_id and cg_id in market_data:
+            data = market_data[cg_id]
+            price = data.get('usd', 0)
+            row.update(price=price, change_24h=data.get('usd_24h_change') or 0, value=h['amount'] * price)
+        elif sym == "USD":
+            row.update(price=1.0, change_24h=0.0, value=h['amount'])
+        rows.append(row)
+    return rows
+
+
+def split_top_rows(rows, limit):
+    """
+    Rows ko value ke hisaab se (top `limit`, baaki) mein baant-ta hai - badi books
+    (exchange exports, hazaron symbols) pe analytics / prompt sirf top assets pe.
+    Unpriced rows hamesha 'baaki' mein.
+    """
+    if len(rows) <= limit:
+        return rows, []
+    ordered = sorted(rows, key=lambda r: -(r['value'] or 0) if r['value'] is not None else float('inf'))
+    return ordered[:limit], ordered[limit:]
+
+
+def get_market_context_for_gemini(holdings, rows=None, max_assets=CONTEXT_MAX_ASSETS):
+    """
+    Prepares a context string with live prices to feed into Gemini.
+    rows: get_portfolio_snapshot() ka result (pehle se ho to dobara fetch nahi)
+    max_assets se zyada holdings → top assets by value + ek "Other" line (prompt chhota rahe)
+    """
+    rows = rows if rows is not None else get_portfolio_snapshot(holdings)
+    top, rest = split_top_rows(rows, max_assets)
+    info_list = [f"{r['amount']} {r['symbol']}" for r in top]
+    if rest:
+        info_list.append(f"... and {len(rest)} more assets")
 
-    market_data = {}
-    if ids_to_fetch:
-        market_data = get_coingecko_price(ids_to_fetch)
-    
     # Construct Context String
     context = "User Holdings:\n" + ", ".join(info_list) + "\n\nLive Market Data (CoinGecko):\n"
     
     total_value = 0.0
     
-    for h in holdings:
-        sym = h['symbol']
-        if sym in symbol_map:
-            cg_id = symbol_map[sym]
-            if cg_id in market_data:
-                data = market_data[cg_id]
-                price = data.get('usd', 0)
-                change = data.get('usd_24h_change', 0)
-                value = h['amount'] * price
-                total_value += value
-                
-                context += f"- {sym}: ${price} (24h: {change:.2f}%) | Val: ${value:.2f}\n"
+    for r in top:
+        sym = r['symbol']
+        if r['cg_id']:
+            if r['price'] is not None:
+                total_value += r['value']
+                context += f"- {sym}: ${r['price']} (24h: {r['change_24h']:.2f}%) | Val: ${r['value']:.2f}\n"
             else:
                 context += f"- {sym}: No live data found.\n"
         else:
             context += f"- {sym}: Unknown symbol (assume $1 placeholder for analysis).\n"
-            if sym == "USD": total_value += h['amount']
+            if sym == "USD": total_value += r['amount']
+
+    if rest:
+        rest_value = sum(r['value'] for r in rest if r['value'] is not None)
+        unpriced = sum(1 for r in rest if r['value'] is None)
+        total_value += rest_value
+        context += f"- Other {len(rest)} assets: ${rest_value:,.2f} combined ({unpriced} without live price)\n"
 
     return context, total_value
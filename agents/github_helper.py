@@ -0,0 +1,368 @@
+"""
+================================================================================
+                WEB3.AI - GITHUB REPO INGESTION (single tarball, in-memory)
+================================================================================
+YEH FILE GITHUB AGENT KE LIYE POORI REPOSITORY EK REQUEST MEIN PADHTI HAI
+
+FUNCTIONALITY:
+- codeload.github.com se repo ka tar.gz ek streamed request mein
+  (per-file API calls nahi, disk pe extract nahi)
+- tarfile 'r|gz' stream mode: members ek ek karke, sirf text files memory mein
+- Skip: binaries (extension / NUL byte), vendored + build dirs (node_modules,
+  vendor, dist ...), lockfiles, minified bundles, MAX_FILE_BYTES se badi files
+- File table: path → {size, language, text}; total text GITHUB_INGEST_BUDGET_KB
+  tak - budget bhar jaaye to sabse kam zaroori files (priority) nikal di jaati hain
+- repo_prompt_context(): agent_type (summary / architecture / issues /
+  pr_review) ke hisaab se files chun ke Gemini context
+
+USED BY:
+- agents/views.py → run_github_agent, run_github_x402
+
+LOCATION: agents/github_helper.py
+
+WORKFLOW:
+┌─────────────────────────────────────────────────────────────────────┐
+│ 1. GET codeload .../tar.gz/HEAD (stream=True) → _LimitedReader       │
+│ 2. tarfile.open(mode='r|gz') → har regular file member              │
+│ 3. Path / size / extension filter → read → NUL check → decode       │
+│ 4. Priority score (README, manifests > source > tests) → heap       │
+│ 5. Budget se upar → lowest priority evict                           │
+│ 6. RETURNS snapshot dict (files, tree, languages, stats)            │
+└─────────────────────────────────────────────────────────────────────┘
+================================================================================
+"""
+
+import heapq
+import os
+import re
+import tarfile
+import time
+
+import requests
+from django.conf import settings
+
+
+ARCHIVE_URL = "https://codeload.github.com/{owner}/{repo}/tar.gz/{ref}"
+API_ARCHIVE_URL = "https://api.github.com/repos/{owner}/{repo}/tarball/{ref}"  # Token ho to (private repos)
+MAX_FILE_BYTES = 256 * 1024      # Isse badi file sirf tree mein (text nahi)
+MAX_TREE_PATHS = 5000
+BINARY_SNIFF_BYTES = 8192
+PER_FILE_CONTEXT_CHARS = 20000
+
+SKIP_DIRS = {
+    'node_modules', 'vendor', 'vendors', 'third_party', 'third-party', 'external', 'bower_components',
+    'dist', 'build', 'out', 'target', '.next', '.nuxt', 'coverage', '.git', '__pycache__', '.venv',
+    'venv', 'env', 'site-packages', 'Pods', '.gradle', '.idea', '.vscode', '.mypy_cache', '.pytest_cache',
+    '.tox', 'staticfiles', '.terraform',
+}
+SKIP_FILES = {
+    'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml', 'poetry.lock', 'Cargo.lock', 'Gemfile.lock',
+    'composer.lock', 'go.sum', 'Pipfile.lock', 'uv.lock', '.DS_Store',
+}
+BINARY_EXTS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.webp', '.svgz', '.pdf', '.zip', '.gz', '.tgz',
+    '.bz2', '.xz', '.7z', '.rar', '.jar', '.war', '.class', '.so', '.dll', '.dylib', '.exe', '.bin',
+    '.o', '.a', '.pyc', '.pyo', '.whl', '.woff', '.woff2', '.ttf', '.otf', '.eot', '.mp3', '.mp4',
+    '.wav', '.ogg', '.webm', '.mov', '.avi', '.psd', '.sqlite3', '.db', '.pkl', '.npy', '.npz',
+    '.parquet', '.onnx', '.pt', '.h5', '.ckpt', '.safetensors', '.wasm',
+}
+LANGUAGES = {
+    '.py': 'Python', '.js': 'JavaScript', '.mjs': 'JavaScript', '.cjs': 'JavaScript', '.jsx': 'JavaScript',
+    '.ts': 'TypeScript', '.tsx': 'TypeScript', '.go': 'Go', '.rs': 'Rust', '.java': 'Java', '.kt': 'Kotlin',
+    '.scala': 'Scala', '.rb': 'Ruby', '.php': 'PHP', '.cs': 'C#', '.c': 'C', '.h': 'C', '.cc': 'C++',
+    '.cpp': 'C++', '.hpp': 'C++', '.swift': 'Swift', '.m': 'Objective-C', '.sol': 'Solidity',
+    '.move': 'Move', '.vy': 'Vyper', '.sh': 'Shell', '.bash': 'Shell', '.ps1': 'PowerShell',
+    '.html': 'HTML', '.css': 'CSS', '.scss': 'SCSS', '.vue': 'Vue', '.svelte': 'Svelte', '.sql': 'SQL',
+    '.md': 'Markdown', '.rst': 'reStructuredText', '.txt': 'Text', '.json': 'JSON', '.yml': 'YAML',
+    '.yaml': 'YAML', '.toml': 'TOML', '.ini': 'INI', '.cfg': 'INI', '.xml': 'XML', '.proto': 'Protobuf',
+    '.graphql': 'GraphQL', '.dart': 'Dart', '.ex': 'Elixir', '.exs': 'Elixir', '.hs': 'Haskell',
+    '.lua': 'Lua', '.r': 'R', '.jl': 'Julia', '.zig': 'Zig', '.tf': 'Terraform', '.svg': 'SVG',
+}
+MANIFESTS = {
+    'package.json', 'pyproject.toml', 'setup.py', 'setup.cfg', 'requirements.txt', 'Cargo.toml', 'go.mod',
+    'pom.xml', 'build.gradle', 'build.gradle.kts', 'Gemfile', 'composer.json', 'Dockerfile',
+    'docker-compose.yml', 'docker-compose.yaml', 'Makefile', 'foundry.toml', 'hardhat.config.js',
+    'hardhat.config.ts', 'manage.py', 'tsconfig.json', 'Procfile', 'render.yaml', 'vercel.json',
+}
+ENTRY_POINTS = re.compile(r'(^|/)(main|app|index|server|cli|__main__|urls|settings|routes|wsgi|asgi)\.[a-z]+$')
+CODE_MARKERS = re.compile(r'\b(TODO|FIXME|HACK|XXX|BUG)\b[:\s]*(.{0,120})')
+_TEST_PATH = re.compile(r'(^|/)(tests?|__tests__|spec)(/|$)|(_test|\.test|\.spec|_spec)\.[a-z]+$|(^|/)test_[^/]+$')
+
+
+class RepoTooLarge(Exception):
+    pass
+
+
+class _LimitedReader:
+    """Response stream wrapper - limit se zyada bytes → RepoTooLarge (download yahin rukta hai)"""
+
+    def __init__(self, raw, limit):
+        self.raw = raw
+        self.limit = limit
+        self.count = 0
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.count += len(data)
+        if self.count > self.limit:
+            raise RepoTooLarge(self.count)
+        return data
+
+
+# ============================================================================
+# CLASSIFICATION
+# ============================================================================
+
+def language_for(path):
+    name = os.path.basename(path)
+    if name == 'Dockerfile' or name.startswith('Dockerfile.'):
+        return 'Dockerfile'
+    if name == 'Makefile':
+        return 'Makefile'
+    return LANGUAGES.get(os.path.splitext(name)[1].lower())
+
+
+def is_test_path(path):
+    return bool(_TEST_PATH.search(path))
+
+
+def skip_reason(path, size):
+    """Text table ke liye skip kyun (None = padho)"""
+    parts = path.split('/')
+    if any(p in SKIP_DIRS for p in parts[:-1]):
+        return 'vendored'
+    name = parts[-1]
+    ext = os.path.splitext(name)[1].lower()
+    if name in SKIP_FILES or name.endswith(('.min.js', '.min.css', '.map', '.bundle.js')):
+        return 'generated'
+    if ext in BINARY_EXTS:
+        return 'binary'
+    if size > MAX_FILE_BYTES:
+        return 'too_large'
+    return None
+
+
+def file_priority(path, size):
+    """Budget bharne pe kaun pehle nikle - bada score = zyada zaroori"""
+    name = os.path.basename(path)
+    depth = path.count('/')
+    if depth == 0 and name.lower().startswith('readme'):
+        score = 100
+    elif name in MANIFESTS:
+        score = 90
+    elif ENTRY_POINTS.search(path):
+        score = 70
+    elif is_test_path(path):
+        score = 30
+    elif name.lower().endswith(('.md', '.rst')):
+        score = 55
+    elif language_for(path) in ('JSON', 'YAML', 'TOML', 'INI', 'XML', 'Text', 'SVG', None):
+        score = 35
+    else:
+        score = 50
+    return score - 4 * depth - min(size / 16384, 10)
+
+
+# ============================================================================
+# INGESTION
+# ============================================================================
+
+def ingest_repo(owner, repo, ref='HEAD', byte_budget=None):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  REPO TARBALL → IN-MEMORY FILE TABLE                                      ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    Ek streamed request; archive kabhi disk pe nahi aata. Archive limit /
+    deadline pe jo mila woh (truncated=True) return hota hai.
+
+    RETURNS: (snapshot, error) - snapshot = {
+        'repo', 'commit', 'files': {path: {'size', 'language', 'text'}},
+        'tree': [paths...], 'languages': {lang: bytes}, 'stats': {...}
+    }
+    """
+    budget = byte_budget or getattr(settings, 'GITHUB_INGEST_BUDGET_KB', 1024) * 1024
+    archive_limit = getattr(settings, 'GITHUB_ARCHIVE_MAX_MB', 200) * 1024 * 1024
+    deadline = time.monotonic() + getattr(settings, 'GITHUB_INGEST_TIMEOUT', 60)
+    token = getattr(settings, 'GITHUB_TOKEN', '')
+
+    headers = {'User-Agent': 'web3-ai-github-agent'}
+    if token:
+        url = API_ARCHIVE_URL.format(owner=owner, repo=repo, ref=ref)
+        headers['Authorization'] = f"Bearer {token}"
+    else:
+        url = ARCHIVE_URL.format(owner=owner, repo=repo, ref=ref)
+
+    started = time.perf_counter()
+    try:
+        response = requests.get(url, headers=headers, stream=True, timeout=(10, 30))
+    except requests.RequestException as e:
+        return None, f"Archive download failed: {e}"
+    if response.status_code != 200:
+        response.close()
+        return None, f"Archive download failed: HTTP {response.status_code}"
+
+    files, tree, heap = {}, [], []
+    stats = {'members': 0, 'text_files': 0, 'evicted': 0, 'skipped': {}, 'truncated': False}
+    total_text = 0
+    commit = None
+    reader = _LimitedReader(response.raw, archive_limit)
+
+    try:
+        with tarfile.open(fileobj=reader, mode='r|gz') as tar:
+            for member in tar:
+                tar.members = []  # Stream mode TarInfo list na badhe (bade repos)
+                # Har member pe deadline — skipped members bhi download/decompress hote hain
+                if time.monotonic() > deadline:
+                    stats['truncated'] = True
+                    break
+                if commit is None:
+                    commit = tar.pax_headers.get('comment') or None  # GitHub archive = commit sha
+                if not member.isfile():
+                    continue
+                stats['members'] += 1
+                # "<owner>-<repo>-<sha>/path" → "path"
+                path = member.name.split('/', 1)[1] if '/' in member.name else member.name
+                if len(tree) < MAX_TREE_PATHS:
+                    tree.append(path)
+
+                reason = skip_reason(path, member.size)
+                if reason is None:
+                    priority = file_priority(path, member.size)
+                    if total_text + member.size > budget and heap and heap[0][0] >= priority:
+                        reason = 'budget'  # Isse zyada zaroori files pehle se bhari hain
+                if reason:
+                    stats['skipped'][reason] = stats['skipped'].get(reason, 0) + 1
+                    continue
+
+                raw = tar.extractfile(member).read()
+                if b'\x00' in raw[:BINARY_SNIFF_BYTES]:
+                    stats['skipped']['binary'] = stats['skipped'].get('binary', 0) + 1
+                    continue
+                text = raw.decode('utf-8', errors='replace')
+                files[path] = {'size': member.size, 'language': language_for(path), 'text': text}
+                heapq.heappush(heap, (priority, path))
+                total_text += len(raw)
+                stats['text_files'] += 1
+
+                # Budget se upar → sabse kam priority wali files nikalo
+                while total_text > budget and len(heap) > 1:
+                    _p, victim = heapq.heappop(heap)
+                    total_text -= files.pop(victim)['size']
+                    stats['evicted'] += 1
+    except RepoTooLarge:
+        if not files:
+            return None, "Repository archive too large"
+        stats['truncated'] = True
+    except (tarfile.TarError, EOFError, OSError, requests.RequestException) as e:
+        if not files:
+            return None, f"Archive read failed: {e}"
+        stats['truncated'] = True
+    finally:
+        response.close()
+
+    languages = {}
+    for info in files.values():
+        if info['language']:
+            languages[info['language']] = languages.get(info['language'], 0) + info['size']
+
+    stats.update({
+        'text_bytes': total_text,
+        'archive_bytes': reader.count,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000),
+    })
+    return {
+        'repo': f"{owner}/{repo}",
+        'commit': commit,
+        'files': dict(sorted(files.items())),
+        'tree': tree,
+        'languages': dict(sorted(languages.items(), key=lambda kv: -kv[1])),
+        'stats': stats,
+    }, None
+
+
+# ============================================================================
+# PROMPT CONTEXT
+# ============================================================================
+
+def _tree_summary(tree, max_lines=60):
+    """Top-level dirs + file counts, phir root files"""
+    dirs, root_files = {}, []
+    for path in tree:
+        if '/' in path:
+            top = path.split('/', 1)[0]
+            dirs[top] = dirs.get(top, 0) + 1
+        else:
+            root_files.append(path)
+    lines = [f"{d}/ ({n} files)" for d, n in sorted(dirs.items(), key=lambda kv: -kv[1])]
+    lines += root_files
+    return "\n".join(lines[:max_lines])
+
+
+def _code_markers(files, limit=150):
+    found = []
+    for path, info in files.items():
+        if is_test_path(path):
+            continue
+        for lineno, line in enumerate(info['text'].splitlines(), 1):
+            m = CODE_MARKERS.search(line)
+            if m:
+                found.append(f"{path}:{lineno}: {m.group(1)} {m.group(2).strip()}")
+                if len(found) >= limit:
+                    return found
+    return found
+
+
+def _ordered_paths(files, agent_type):
+    """agent_type ke hisaab se file order"""
+    def key(path):
+        info = files[path]
+        base = file_priority(path, info['size'])
+        if agent_type == 'architecture' and (ENTRY_POINTS.search(path) or os.path.basename(path) in MANIFESTS):
+            base += 30
+        elif agent_type == 'pr_review' and is_test_path(path):
+            base += 25  # Review ke liye tests bhi dekhne hain
+        elif agent_type == 'summary' and path.lower().endswith(('.md', '.rst')):
+            base += 20
+        return -base, path
+    return sorted(files, key=key)
+
+
+def repo_prompt_context(snapshot, agent_type='summary', max_chars=None):
+    """
+    File table → Gemini context (max_chars tak): repo stats, tree summary,
+    (issues ke liye TODO/FIXME markers), phir agent_type order mein file contents.
+    """
+    max_chars = max_chars or getattr(settings, 'GITHUB_CONTEXT_CHARS', 200000)
+    files = snapshot['files']
+    stats = snapshot['stats']
+    langs = ", ".join(f"{lang} {size // 1024} KB" for lang, size in list(snapshot['languages'].items())[:8])
+    parts = [
+        f"Repository: {snapshot['repo']} (commit {(snapshot['commit'] or 'HEAD')[:12]})",
+        f"Files: {stats['members']} in archive, {len(files)} text files indexed"
+        + (" (archive truncated)" if stats['truncated'] else ""),
+        f"Languages: {langs or 'unknown'}",
+        "",
+        "DIRECTORY LAYOUT:",
+        _tree_summary(snapshot['tree']),
+        "",
+    ]
+    if agent_type == 'issues':
+        markers = _code_markers(files)
+        if markers:
+            parts += ["CODE MARKERS (TODO / FIXME / HACK):", *markers, ""]
+
+    used = sum(len(p) + 1 for p in parts)
+    included = 0
+    for path in _ordered_paths(files, agent_type):
+        info = files[path]
+        text = info['text'][:PER_FILE_CONTEXT_CHARS]
+        block = f"### {path} ({info['language'] or 'text'}, {info['size']} bytes)\n```\n{text}\n```\n"
+        if used + len(block) > max_chars:
+            if included:
+                continue  # Chhoti files abhi bhi fit ho sakti hain
+            block = block[:max_chars - used]
+        parts.append(block)
+        used += len(block)
+        included += 1
+    return "\n".join(parts)
@@ -0,0 +1,82 @@
+"""
+================================================================================
+                WEB3.AI - IPv4-ONLY HTTP CLIENTS (per call, bina global patch)
+================================================================================
+YEH FILE LONG-RUNNING KAAM KE LIYE IPv4 CONNECTIONS DETI HAI
+
+FUNCTIONALITY:
+- views.py ka IPv4 patch (socket.getaddrinfo = new_getaddrinfo) process-global
+  hai - chhoti request ke liye theek, lekin minutes lambe NDJSON stream /
+  background thread mein lagane se us dauraan process ki HAR request IPv4 pe
+  chalti hai, aur restore dusri request ke patch se race karta hai
+- Yahan IPv4 sirf un clients pe jo maange: sockets 0.0.0.0 pe bind hote hain,
+  isliye IPv6 address connect hi nahi hota aur agla (IPv4) address try hota hai
+- http(force_ipv4): requests module ya shared IPv4 requests.Session
+  (dono pe .get() same) - scraper / discovery
+- ipv4_session(): naya IPv4 Session - YouTubeTranscriptApi(http_client=...)
+- gemini_client(force_ipv4): genai.Client, IPv4 ho to httpx transport
+  local_address='0.0.0.0' ke saath
+
+USED BY:
+- agents/scraper.py, agents/discovery.py (force_ipv4 parameter)
+- agents/youtube_helper.py → get_transcript
+- agents/views.py → batch endpoints (CompeteScan, YT Docs)
+
+LOCATION: agents/ipv4.py
+================================================================================
+"""
+
+import threading
+
+import httpx
+import requests
+from django.conf import settings
+from google import genai
+from google.genai import types
+from requests.adapters import HTTPAdapter
+
+
+IPV4_ANY = '0.0.0.0'
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class IPv4Adapter(HTTPAdapter):
+    """Har connection ka source address 0.0.0.0 - IPv6 sockets bind fail, IPv4 pe fallback"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['source_address'] = (IPV4_ANY, 0)
+        super().init_poolmanager(*args, **kwargs)
+
+
+def ipv4_session():
+    """Naya IPv4 requests.Session (e.g. YouTubeTranscriptApi apne headers / cookies isme set karta hai)"""
+    session = requests.Session()
+    adapter = IPv4Adapter(pool_maxsize=32)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def http(force_ipv4=False):
+    """
+    requests.get() jaisa client - force_ipv4 pe process-wide shared IPv4 session
+    (connection pool threads ke beech share), warna requests module
+    """
+    global _session
+    if not force_ipv4:
+        return requests
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = ipv4_session()
+    return _session
+
+
+def gemini_client(force_ipv4=False):
+    """genai.Client - force_ipv4 pe sirf is client ke connections IPv4"""
+    if not force_ipv4:
+        return genai.Client(api_key=settings.GEMINI_API_KEY)
+    return genai.Client(api_key=settings.GEMINI_API_KEY, http_options=types.HttpOptions(
+        client_args={'transport': httpx.HTTPTransport(local_address=IPV4_ANY)}))
@@ -0,0 +1,147 @@
+"""
+================================================================================
+                WEB3.AI - BACKGROUND JOBS (long-running agent pipelines)
+================================================================================
+YEH FILE LAMBE AGENT PIPELINES KO REQUEST SE ALAG WORKER THREADS MEIN CHALATI HAI
+
+FUNCTIONALITY:
+- submit_job(): AnalysisTransaction row = job; pipeline process ke worker pool
+  (JOB_WORKERS threads) mein chalta hai, request turant job id return karti hai
+- report(stage, progress): pipeline har stage pe row update karta hai
+  (status / stage / progress + job_events mein transition with timestamp)
+- job_snapshot(): polling JSON - state DB mein hai, isliye koi bhi gunicorn
+  worker status serve kar sakta hai. Har poll ek chhota request hai; SSE jaisi
+  lambi response sync gunicorn worker ko block karke 30s timeout pe kill
+  karwa deti (saath mein running job threads bhi)
+
+USED BY:
+- agents/views.py → run_audio_x402 (mode=async), get_job_status
+
+LOCATION: agents/jobs.py
+
+WORKFLOW:
+┌─────────────────────────────────────────────────────────────────────┐
+│ 1. View upload store karta hai, txn row banata hai                  │
+│ 2. submit_job(txn, pipeline, ...) → status=queued, 202 + job id     │
+│ 3. Worker: status=running → pipeline(txn, report, ...)              │
+│ 4. Pipeline report('transcribe', 20) ... report('save', 95)         │
+│ 5. (result, None) → done 100 | (None, err) / exception → failed     │
+│ 6. Client: GET /api/jobs/<id>/ har POLL_AFTER_MS pe (done / failed) │
+└─────────────────────────────────────────────────────────────────────┘
+
+NOTE: Jobs process ke andar chalte hain - process restart pe running jobs
+'failed' nahi hote, woh 'running' reh jaate hain (JOB_STALE_SECONDS ke baad
+snapshot unhe failed report karta hai).
+================================================================================
+"""
+
+import json
+import threading
+import concurrent.futures
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import AnalysisTransaction
+
+
+JOB_WORKERS = getattr(settings, 'AGENT_JOB_WORKERS', 2)
+JOB_STALE_SECONDS = 30 * 60       # Itni der koi transition nahi = worker mar gaya
+POLL_AFTER_MS = 2000              # Client ko suggested polling interval
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Process-wide worker pool (pehle job pe bana)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=JOB_WORKERS, thread_name_prefix='agent-job'
+            )
+        return _executor
+
+
+def record_transition(txn, status, stage, progress, error=None):
+    """Row pe state likho + job_events mein append (same txn object pipeline bhi save karta hai)"""
+    events = json.loads(txn.job_events or '[]')
+    event = {'status': status, 'stage': stage, 'progress': progress, 'at': timezone.now().isoformat()}
+    if error:
+        event['error'] = error
+    events.append(event)
+    txn.status, txn.stage, txn.progress = status, stage, progress
+    txn.job_events = json.dumps(events)
+    if error:
+        txn.error_message = error
+    txn.save(update_fields=['status', 'stage', 'progress', 'job_events', 'error_message'])
+    print(f" > Job {txn.id}: {status} / {stage} ({progress}%)")
+
+
+def submit_job(txn, pipeline, *args, **kwargs):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  JOB SUBMIT - pipeline(txn, report, *args, **kwargs) → (result, error)    ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    Pipeline ka return (result, error) - repo ke helpers jaisa. error ho ya
+    exception aaye to job 'failed'. Pipeline khud txn.output_data save karta hai.
+    """
+    record_transition(txn, 'queued', 'queued', 0)
+    txn_id = txn.id
+
+    def run():
+        close_old_connections()
+        try:
+            job_txn = AnalysisTransaction.objects.get(id=txn_id)
+            record_transition(job_txn, 'running', 'started', 1)
+
+            def report(stage, progress):
+                record_transition(job_txn, 'running', stage, progress)
+
+            try:
+                _result, error = pipeline(job_txn, report, *args, **kwargs)
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+            if error:
+                print(f" ! Job {txn_id} failed: {error}")
+                record_transition(job_txn, 'failed', job_txn.stage, job_txn.progress, error=error)
+            else:
+                record_transition(job_txn, 'done', 'done', 100)
+        finally:
+            close_old_connections()
+
+    get_executor().submit(run)
+    return txn_id
+
+
+def _is_stale(txn):
+    if txn.status not in ('queued', 'running'):
+        return False
+    events = json.loads(txn.job_events or '[]')
+    last = events[-1]['at'] if events else None
+    last_at = datetime.fromisoformat(last) if last else txn.created_at
+    return timezone.now() - last_at > timedelta(seconds=JOB_STALE_SECONDS)
+
+
+def job_snapshot(txn):
+    """Polling response: state + transitions (+ result jab done)"""
+    status, error = txn.status, txn.error_message
+    if _is_stale(txn):
+        status, error = 'failed', 'Job worker stopped (no progress) - please resubmit'
+    data = {
+        'job_id': txn.id,
+        'status': status,
+        'stage': txn.stage,
+        'progress': txn.progress,
+        'events': json.loads(txn.job_events or '[]'),
+        'error': error,
+    }
+    if status in ('queued', 'running'):
+        data['poll_after_ms'] = POLL_AFTER_MS
+    if status == 'done':
+        data['result'] = json.loads(txn.output_data) if txn.output_data else {}
+    return data
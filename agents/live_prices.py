@@ -0,0 +1,67 @@
+"""
+================================================================================
+                WEB3.AI - LIVE PRICES (finance dashboard short polling)
+================================================================================
+YEH FILE FINANCE DASHBOARD KE LIVE PRICE STRIP KO DATA DETI HAI (bina paid analysis ke)
+
+FUNCTIONALITY:
+- Symbols → CoinGecko ids (coin index + COMMON_SYMBOLS overrides)
+- latest_prices(): finance_helper.get_fresh_prices() se - shared disk cache +
+  per-id cross-worker lock, isliye N browsers (aur M gunicorn workers) ka har
+  PRICE_STREAM_INTERVAL mein ek hi upstream call hota hai
+- Browser har interval pe ek chhota GET karta hai (tab hidden ho to ruk jaata hai)
+
+WHY POLLING (SSE nahi):
+Deploy plain `gunicorn web3_ai.wsgi:application` hai - ek sync worker, 30s
+timeout. Minutes lambi SSE response wahi ek worker pakad leti thi (baaki sab
+requests queue mein) aur arbiter use 30s pe kill kar deta tha. Har poll yahan
+milliseconds ka request hai, cache se serve.
+
+USED BY:
+- agents/views.py → live_prices (GET /api/prices/)
+- templates/agents/finance.html (setTimeout polling)
+
+LOCATION: agents/live_prices.py
+
+RESPONSE:
+┌─────────────────────────────────────────────────────────────────────┐
+│ {"symbols": {"BTC": "bitcoin"}, "unresolved": [], "interval": 15,   │
+│  "prices": {"BTC": {"price": 67000.1, "change_24h": 1.2}}}          │
+└─────────────────────────────────────────────────────────────────────┘
+================================================================================
+"""
+
+from django.conf import settings
+
+from .coin_index import resolve_symbols
+from .finance_helper import COMMON_SYMBOLS, get_fresh_prices
+
+
+MAX_PRICE_SYMBOLS = 50
+
+
+def poll_interval():
+    return max(5, getattr(settings, 'PRICE_STREAM_INTERVAL', 15))
+
+
+def resolve_price_symbols(symbols):
+    """Symbols → ({symbol: cg_id}, unresolved) - USD / duplicates skip, MAX_PRICE_SYMBOLS tak"""
+    wanted = []
+    for sym in symbols:
+        sym = sym.strip().upper()
+        if sym and sym != 'USD' and sym not in wanted:
+            wanted.append(sym)
+    wanted = wanted[:MAX_PRICE_SYMBOLS]
+    resolved = resolve_symbols(wanted, overrides=COMMON_SYMBOLS)
+    return resolved, [sym for sym in wanted if sym not in resolved]
+
+
+def latest_prices(symbol_map):
+    """{symbol: {'price', 'change_24h'}} - cache entry poll_interval() se purani ho tabhi refetch"""
+    prices = get_fresh_prices(sorted(set(symbol_map.values())), max_age=poll_interval())
+    payload = {}
+    for sym, cg_id in symbol_map.items():
+        data = prices.get(cg_id)
+        if data:
+            payload[sym] = {'price': data.get('usd'), 'change_24h': round(data.get('usd_24h_change') or 0, 2)}
+    return payload
@@ -0,0 +1,111 @@
+"""
+================================================================================
+            BENCHMARK: audio pre-flight transcode (upload size + latency)
+================================================================================
+Har file pe: ffprobe → mono 16 kHz Opus/FLAC transcode → size reduction.
+Upload time given uplink (--uplink-mbps) pe estimate hota hai; --live dene pe
+original aur compact dono ElevenLabs pe bheje jaate hain (real end-to-end
+latency, 2 transcription calls per file - API credits lagte hain).
+
+USAGE:
+    python manage.py bench_audio_preflight                        # media/uploads/audio/*
+    python manage.py bench_audio_preflight --files a.mp3,b.wav --uplink-mbps 5
+    python manage.py bench_audio_preflight --codec flac --live
+================================================================================
+"""
+
+import glob
+import os
+import socket
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from agents.audio_helper import (
+    ffmpeg_binary, preflight_audio, sha256_file, transcode_compact, transcribe_with_retries,
+)
+
+
+class Command(BaseCommand):
+    help = "Measure upload-size reduction and latency of the mono 16 kHz pre-flight transcode"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', default='', help="Comma separated audio paths (default: unique media/uploads/audio files)")
+        parser.add_argument('--codec', default=None, choices=['opus', 'flac'])
+        parser.add_argument('--uplink-mbps', type=float, default=10.0, help="Uplink used for the upload-time estimate")
+        parser.add_argument('--live', action='store_true', help="Also time real ElevenLabs calls (original vs compact)")
+
+    def _default_files(self):
+        unique = {}
+        for path in sorted(glob.glob(os.path.join(settings.MEDIA_ROOT, 'uploads', 'audio', '**', '*.*'), recursive=True)):
+            if os.path.isfile(path):
+                unique.setdefault(sha256_file(path)[0], path)  # Duplicate uploads ek hi baar
+        return list(unique.values())
+
+    def _timed_transcribe(self, path):
+        started = time.perf_counter()
+        result, error = transcribe_with_retries(path, attempts=1)
+        if error:
+            raise CommandError(f"ElevenLabs failed for {path}: {error}")
+        return time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        if not ffmpeg_binary() or not ffmpeg_binary('ffprobe'):
+            raise CommandError("ffmpeg/ffprobe not found (set FFMPEG_BINARY / FFPROBE_BINARY)")
+        files = [f.strip() for f in options['files'].split(',') if f.strip()] or self._default_files()
+        if not files:
+            raise CommandError("No audio files to benchmark")
+
+        bytes_per_s = options['uplink_mbps'] * 1_000_000 / 8
+        self.stdout.write(f"{'file':<28} {'in':>9} {'out':>9} {'saved':>6} {'probe s':>8} {'xcode s':>8} "
+                          f"{'upload s (in→out)':>18} {'e2e s (in→out)':>16}")
+        total_in = total_out = 0
+        with tempfile.TemporaryDirectory(prefix='bench-preflight-') as tmp:
+            for path in files:
+                started = time.perf_counter()
+                info, reject = preflight_audio(path)
+                probe_s = time.perf_counter() - started
+                if reject:
+                    self.stdout.write(self.style.WARNING(f"{os.path.basename(path)[:28]:<28} rejected: {reject}"))
+                    continue
+
+                started = time.perf_counter()
+                compact = transcode_compact(path, tmp, codec=options['codec'])
+                xcode_s = time.perf_counter() - started
+                if not compact:
+                    self.stdout.write(self.style.WARNING(f"{os.path.basename(path)[:28]:<28} transcode failed"))
+                    continue
+
+                size_in, size_out = info['size'], os.path.getsize(compact)
+                total_in, total_out = total_in + size_in, total_out + size_out
+                up_in, up_out = size_in / bytes_per_s, size_out / bytes_per_s
+                e2e_in, e2e_out = up_in, xcode_s + up_out
+
+                if options['live']:
+                    original_getaddrinfo = socket.getaddrinfo
+
+                    def new_getaddrinfo(*args, **kwargs):
+                        return [r for r in original_getaddrinfo(*args, **kwargs) if r[0] == socket.AF_INET]
+
+                    socket.getaddrinfo = new_getaddrinfo
+                    try:
+                        e2e_in = self._timed_transcribe(path)
+                        e2e_out = xcode_s + self._timed_transcribe(compact)
+                    finally:
+                        socket.getaddrinfo = original_getaddrinfo
+
+                self.stdout.write(
+                    f"{os.path.basename(path)[:28]:<28} {size_in / 1048576:>7.2f}MB {size_out / 1048576:>7.2f}MB "
+                    f"{100 * (1 - size_out / size_in):>5.0f}% {probe_s:>8.2f} {xcode_s:>8.2f} "
+                    f"{up_in:>8.2f} → {up_out:<7.2f} {e2e_in:>7.2f} → {e2e_out:<7.2f}"
+                )
+                os.remove(compact)
+
+        if total_in:
+            mode = "live ElevenLabs" if options['live'] else f"estimated at {options['uplink_mbps']} Mbps uplink"
+            self.stdout.write(self.style.SUCCESS(
+                f"Total {total_in / 1048576:.1f} MB → {total_out / 1048576:.1f} MB "
+                f"({100 * (1 - total_out / total_in):.0f}% smaller upload); e2e {mode}"
+            ))
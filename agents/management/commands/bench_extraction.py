@@ -0,0 +1,88 @@
+"""
+================================================================================
+            BENCHMARK: 'full' vs 'main' page text extraction (scraper)
+================================================================================
+Saved HTML pages ke corpus pe dono extraction modes chalata hai aur report karta hai:
+- Extraction speed (ms per page, HTML parse time alag)
+- Character reduction (main vs full)
+
+USAGE:
+    python manage.py bench_extraction                  # Scraper HTTP cache ke stored pages
+    python manage.py bench_extraction ./pages/         # Directory ke *.html / *.htm files
+    python manage.py bench_extraction ./pages/ --repeat 5
+================================================================================
+"""
+
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from django.core.management.base import BaseCommand, CommandError
+
+from agents.scraper import clean_text, extract_text, get_http_cache
+
+
+class Command(BaseCommand):
+    help = "Benchmark full vs main-content extraction on a saved HTML corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument('corpus', nargs='?', help="Directory of .html files (default: scraper HTTP cache)")
+        parser.add_argument('--repeat', type=int, default=3, help="Timing repetitions per page (best time is kept)")
+
+    def _load_corpus(self, corpus):
+        if corpus:
+            root = Path(corpus)
+            if not root.is_dir():
+                raise CommandError(f"Corpus directory not found: {corpus}")
+            for path in sorted(root.rglob('*')):
+                if path.suffix.lower() in ('.html', '.htm'):
+                    yield str(path.relative_to(root)), path.read_text(encoding='utf-8', errors='replace')
+            return
+        for entry in get_http_cache().values():
+            if isinstance(entry, dict) and entry.get('html'):
+                yield entry.get('url', '?'), entry['html']
+
+    def _best_time(self, html, fn, repeat):
+        best, result = None, ''
+        for _ in range(repeat):
+            soup = BeautifulSoup(html, 'html.parser')  # Har run fresh soup (extraction soup modify karta hai)
+            start = time.perf_counter()
+            result = fn(soup)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        repeat = max(1, options['repeat'])
+        rows = []
+
+        for name, html in self._load_corpus(options['corpus']):
+            start = time.perf_counter()
+            BeautifulSoup(html, 'html.parser')
+            parse_s = time.perf_counter() - start
+
+            full_s, full_text = self._best_time(html, clean_text, repeat)
+            main_s, main_text = self._best_time(html, lambda soup: extract_text(soup, 'main'), repeat)
+            rows.append((name, len(html), parse_s, full_s, main_s, len(full_text), len(main_text)))
+
+        if not rows:
+            raise CommandError("No HTML pages found in corpus.")
+
+        self.stdout.write(f"{'page':<48} {'html':>8} {'parse ms':>9} {'full ms':>8} {'main ms':>8} "
+                          f"{'full ch':>8} {'main ch':>8} {'reduct':>7}")
+        for name, html_len, parse_s, full_s, main_s, full_len, main_len in rows:
+            reduction = 100.0 * (full_len - main_len) / full_len if full_len else 0.0
+            self.stdout.write(f"{name[-48:]:<48} {html_len:>8} {parse_s * 1000:>9.2f} {full_s * 1000:>8.2f} "
+                              f"{main_s * 1000:>8.2f} {full_len:>8} {main_len:>8} {reduction:>6.1f}%")
+
+        total_full = sum(r[5] for r in rows)
+        total_main = sum(r[6] for r in rows)
+        n = len(rows)
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(
+            f"{n} pages | mean parse {sum(r[2] for r in rows) / n * 1000:.2f} ms | "
+            f"mean full {sum(r[3] for r in rows) / n * 1000:.2f} ms | "
+            f"mean main {sum(r[4] for r in rows) / n * 1000:.2f} ms | "
+            f"chars {total_full} → {total_main} "
+            f"({100.0 * (total_full - total_main) / total_full if total_full else 0.0:.1f}% reduction)"
+        ))
@@ -0,0 +1,108 @@
+"""
+================================================================================
+            BENCHMARK: requests files= vs streaming MultipartEncoder (audio upload)
+================================================================================
+Generated audio-size files ko local sink server pe POST karta hai aur
+tracemalloc se peak Python memory report karta hai:
+- 'files='   → requests ka built-in multipart (poora body memory mein)
+- 'stream'   → agents.audio_helper.MultipartEncoder (disk se 64 KB chunks)
+
+USAGE:
+    python manage.py bench_multipart                  # 5, 25, 100 MB
+    python manage.py bench_multipart --sizes 10,200
+================================================================================
+"""
+
+import http.server
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from agents.audio_helper import MultipartEncoder
+
+
+class _SinkHandler(http.server.BaseHTTPRequestHandler):
+    """Body padh ke discard karta hai (chunks mein - server ki memory constant)"""
+
+    def do_POST(self):
+        remaining = int(self.headers.get('Content-Length', 0))
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 64 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark peak memory of multipart audio uploads (requests files= vs streaming encoder)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='5,25,100', help="Comma separated file sizes in MB")
+
+    def _make_file(self, directory, size_mb):
+        path = os.path.join(directory, f"audio_{size_mb}mb.bin")
+        block = os.urandom(1024 * 1024)
+        with open(path, 'wb') as f:
+            for _ in range(size_mb):
+                f.write(block)
+        return path
+
+    def _measure(self, fn):
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            resp = fn()
+        finally:
+            elapsed = time.perf_counter() - start
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        if resp.status_code != 200:
+            raise CommandError(f"Sink server returned HTTP {resp.status_code}")
+        return peak, elapsed
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(s) for s in options['sizes'].split(',') if s.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be comma separated integers (MB)")
+
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _SinkHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/upload"
+        fields = {'model_id': 'scribe_v1', 'diarize': 'true'}
+
+        def builtin(path):
+            with open(path, 'rb') as f:
+                return requests.post(url, data=fields, files={'file': f})
+
+        def streaming(path):
+            with open(path, 'rb') as f:
+                body = MultipartEncoder(fields=fields, files={'file': (os.path.basename(path), f, 'audio/mpeg')})
+                return requests.post(url, data=body, headers={'Content-Type': body.content_type})
+
+        self.stdout.write(f"{'size':>8} {'files= peak':>14} {'stream peak':>14} {'files= s':>9} {'stream s':>9}")
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                for size_mb in sizes:
+                    path = self._make_file(tmp, size_mb)
+                    builtin_peak, builtin_s = self._measure(lambda: builtin(path))
+                    stream_peak, stream_s = self._measure(lambda: streaming(path))
+                    self.stdout.write(f"{size_mb:>6} MB {builtin_peak / 1048576:>11.1f} MB {stream_peak / 1048576:>11.2f} MB "
+                                      f"{builtin_s:>9.2f} {stream_s:>9.2f}")
+                    os.remove(path)
+        finally:
+            server.shutdown()
+
+        self.stdout.write(self.style.SUCCESS("Streaming peak should stay flat as size grows; files= grows ~2x file size."))
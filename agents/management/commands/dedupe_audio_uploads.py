@@ -0,0 +1,82 @@
+"""
+================================================================================
+            MAINTENANCE: purane audio uploads ko content-addressed AudioBlobs mein fold karo
+================================================================================
+AnalysisTransaction rows jinka input_file uploads/audio/ mein hai (aur audio_blob
+nahi) - unki file hash hoti hai, AudioBlob bana/mila, row repoint hoti hai.
+Same bytes wali saari rows ek hi blob (aur ek hi file) share karti hain.
+
+Purani files default mein delete NAHI hoti - --delete-originals dene pe hi
+(sirf tab jab koi aur row us path ko reference na kare).
+
+USAGE:
+    python manage.py dedupe_audio_uploads --dry-run
+    python manage.py dedupe_audio_uploads
+    python manage.py dedupe_audio_uploads --delete-originals
+================================================================================
+"""
+
+import os
+import shutil
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from agents.audio_helper import blob_path, sha256_file
+from agents.models import AnalysisTransaction, AudioBlob
+
+
+class Command(BaseCommand):
+    help = "Hash existing audio uploads, fold duplicates into AudioBlobs and repoint transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report duplicates, change nothing")
+        parser.add_argument('--delete-originals', action='store_true',
+                            help="Delete old upload files once no transaction references them")
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        rows = (AnalysisTransaction.objects
+                .filter(category='AUDIO', audio_blob__isnull=True)
+                .exclude(input_file='').exclude(input_file__isnull=True))
+
+        seen, moved, saved_bytes, originals = {}, 0, 0, set()
+        for txn in rows.iterator():
+            name = txn.input_file.name
+            if not default_storage.exists(name):
+                self.stdout.write(self.style.WARNING(f"  missing file for tx {txn.id}: {name}"))
+                continue
+            path = default_storage.path(name)
+            sha, size = sha256_file(path)
+            if sha in seen:
+                saved_bytes += size
+            seen.setdefault(sha, path)
+            self.stdout.write(f"  tx {txn.id:<6} {sha[:12]}  {name}")
+            if dry_run:
+                continue
+
+            ext = os.path.splitext(name)[1].lower()[:10]
+            blob, created = AudioBlob.objects.get_or_create(
+                sha256=sha, defaults={'size': size, 'file': blob_path(sha, ext)}
+            )
+            if not os.path.exists(blob.file.path):
+                os.makedirs(os.path.dirname(blob.file.path), exist_ok=True)
+                shutil.copyfile(path, blob.file.path)
+
+            txn.audio_blob = blob
+            txn.input_file.name = blob.file.name
+            txn.save(update_fields=['audio_blob', 'input_file'])
+            originals.add(name)
+            moved += 1
+
+        if options['delete_originals'] and not dry_run:
+            for name in sorted(originals):
+                if not AnalysisTransaction.objects.filter(input_file=name).exists():
+                    default_storage.delete(name)
+                    self.stdout.write(f"  deleted {name}")
+
+        verb = "would repoint" if dry_run else "repointed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(seen)} unique audio files; {verb} {moved if not dry_run else rows.count()} transactions; "
+            f"duplicates account for {saved_bytes / (1024 * 1024):.1f} MB"
+        ))
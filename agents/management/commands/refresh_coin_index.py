@@ -0,0 +1,40 @@
+"""
+================================================================================
+            MAINTENANCE: CoinGecko coin index download / refresh
+================================================================================
+Poori coin list + top market cap ranks download karke COIN_INDEX_PATH pe likhta
+hai (cron / deploy step ke liye - warna pehli finance request pe download hota hai).
+
+USAGE:
+    python manage.py refresh_coin_index
+    python manage.py refresh_coin_index --lookup ETH,UNI,chainlink
+================================================================================
+"""
+
+import time
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from agents import coin_index
+
+
+class Command(BaseCommand):
+    help = "Download the CoinGecko coin list and market cap ranks into the local coin index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lookup', default='', help="Comma separated symbols/names to resolve after refresh")
+
+    def handle(self, *args, **options):
+        try:
+            count = coin_index.refresh_index()
+        except (requests.RequestException, ValueError) as e:
+            raise CommandError(f"Coin index download failed: {e}")
+        self.stdout.write(self.style.SUCCESS(f"{count} coins written to {coin_index.index_path()}"))
+
+        index = coin_index.get_coin_index()
+        for token in [t.strip() for t in options['lookup'].split(',') if t.strip()]:
+            started = time.perf_counter()
+            cg_id = index.resolve(token)
+            elapsed_us = (time.perf_counter() - started) * 1e6
+            self.stdout.write(f"  {token:<12} → {cg_id} ({elapsed_us:.1f} µs; candidates: {', '.join(index.candidates(token)[:5])})")
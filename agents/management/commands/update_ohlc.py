@@ -0,0 +1,45 @@
+"""
+================================================================================
+            MAINTENANCE: OHLC time-series store incremental update
+================================================================================
+Coins ki daily / hourly OHLC files update karta hai - sirf missing range fetch
+hoti hai. Cron se chalao taaki finance requests ko kabhi wait na karna pade.
+
+USAGE:
+    python manage.py update_ohlc                              # common coins, 1d
+    python manage.py update_ohlc --ids bitcoin,ethereum --resolution 1h
+    python manage.py update_ohlc --force
+================================================================================
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from agents import ohlc_store
+from agents.finance_helper import COMMON_SYMBOLS
+
+
+class Command(BaseCommand):
+    help = "Incrementally update the local OHLC store (only missing ranges are fetched)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', default='', help="Comma separated CoinGecko ids (default: common symbols)")
+        parser.add_argument('--resolution', default='1d', choices=sorted(ohlc_store.RESOLUTIONS))
+        parser.add_argument('--force', action='store_true', help="Ignore the refresh interval")
+
+    def handle(self, *args, **options):
+        ids = [i.strip() for i in options['ids'].split(',') if i.strip()] or list(COMMON_SYMBOLS.values())
+        started = time.perf_counter()
+        results = ohlc_store.update_many(ids, options['resolution'], force=options['force'])
+        failed = 0
+        for cg_id, outcome in results.items():
+            records = len(ohlc_store.open_series(cg_id, options['resolution']))
+            if isinstance(outcome, str):
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"  {cg_id:<20} failed: {outcome}"))
+            else:
+                self.stdout.write(f"  {cg_id:<20} +{outcome:<5} ({records} records)")
+        self.stdout.write(self.style.SUCCESS(f"Updated {len(results) - failed}/{len(results)} series in {time.perf_counter() - started:.1f}s"))
+        if failed == len(results):
+            raise CommandError("All updates failed")
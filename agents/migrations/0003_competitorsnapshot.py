@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0002_alter_analysistransaction_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompetitorSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(db_index=True, max_length=255)),
+                ('url', models.URLField(max_length=500)),
+                ('pages_blob', models.BinaryField()),
+                ('result_data', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Competitor Snapshot',
+                'verbose_name_plural': 'Competitor Snapshots',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
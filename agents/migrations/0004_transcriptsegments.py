@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0003_competitorsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptSegments',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('duration', models.FloatField(default=0)),
+                ('blob', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='segment_store', to='agents.analysistransaction')),
+            ],
+            options={
+                'verbose_name': 'Transcript Segments',
+                'verbose_name_plural': 'Transcript Segments',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0005_audioblob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysistransaction',
+            name='error_message',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='analysistransaction',
+            name='job_events',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='analysistransaction',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=100),
+        ),
+        migrations.AddField(
+            model_name='analysistransaction',
+            name='stage',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='analysistransaction',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='done', max_length=10),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0006_job_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competitorsnapshot',
+            name='schema',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
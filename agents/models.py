@@ -131,7 +131,15 @@ class AnalysisTransaction(models.Model):
         upload_to='uploads/audio/',         # Files yahan save hongi: media/uploads/audio/
         blank=True, 
         null=True
-    )  # File input - Audio files ke liye
+    )  # File input - Audio files ke liye (naye rows: AudioBlob ka content-addressed path)
+    
+    audio_blob = models.ForeignKey(
+        'AudioBlob',                        # Deduplicated audio (sha256) - neeche defined
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='transactions'         # blob.transactions.all() se access karo
+    )  # Same bytes dobara upload hon to same blob (aur same transcript)
     
     # ┌──────────────────────────────────────────────────────────────────────────┐
     # │ OUTPUT FIELD - AI ne kya response diya                                   │
@@ -167,6 +175,43 @@ class AnalysisTransaction(models.Model):
         auto_now_add=True                   # Automatically set on creation
     )
 
+    # ┌──────────────────────────────────────────────────────────────────────────┐
+    # │ JOB STATE - Background job mode (agents/jobs.py)                         │
+    # │ Sync requests seedha 'done' rehte hain; async jobs queued → running →    │
+    # │ done/failed, har transition job_events (JSON list) mein record hota hai  │
+    # └──────────────────────────────────────────────────────────────────────────┘
+    JOB_STATUSES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    status = models.CharField(
+        max_length=10,
+        choices=JOB_STATUSES,
+        default='done'
+    )  # Job state
+    
+    stage = models.CharField(
+        max_length=20,
+        blank=True,
+        default=''
+    )  # e.g., 'preflight', 'transcribe', 'analyze', 'save'
+    
+    progress = models.PositiveSmallIntegerField(
+        default=100
+    )  # 0-100
+    
+    job_events = models.TextField(
+        blank=True,
+        null=True
+    )  # [{"status", "stage", "progress", "at"}, ...] as JSON string
+    
+    error_message = models.TextField(
+        blank=True,
+        null=True
+    )  # Failed job ka reason
+
     # ┌──────────────────────────────────────────────────────────────────────────┐
     # │ META OPTIONS - Model behavior settings                                   │
     # └──────────────────────────────────────────────────────────────────────────┘
@@ -273,3 +318,118 @@ class ModelEvaluation(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.winner} - {self.created_at}"
+
+
+# ============================================================================
+# COMPETITOR SNAPSHOT - CompeteScan incremental (change-only) reanalysis ke liye
+# ============================================================================
+
+class CompetitorSnapshot(models.Model):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  COMPETITOR SNAPSHOT                                                      ║
+    ║  Har CompeteScan run ke scraped pages + structured result store karta hai║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+    
+    YEH MODEL KYA STORE KARTA HAI:
+    - Domain: Tracked competitor (www. ke bina, lowercase)
+    - Schema: Kis endpoint ka result ('full' = CompeteScan page, 'compact' = x402 / batch)
+    - Pages: zlib-compressed JSON [{section, url, text}, ...]
+    - Result: Gemini ka structured JSON analysis
+    - Timestamp: Kab snapshot liya
+    
+    Agli run pe latest snapshot se section-level diff nikalta hai
+    (agents/snapshots.py) aur sirf changed sections Gemini ko jaate hain.
+    
+    DATABASE TABLE: agents_competitorsnapshot
+    """
+    
+    domain = models.CharField(max_length=255, db_index=True)  # e.g. "stripe.com"
+    schema = models.CharField(max_length=20, blank=True, default='')  # 'full' / 'compact' (purane rows: '')
+    url = models.URLField(max_length=500)                      # Scanned URL
+    pages_blob = models.BinaryField()                          # zlib(JSON pages list)
+    result_data = models.TextField(blank=True, null=True)      # Structured analysis JSON
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Competitor Snapshot'
+        verbose_name_plural = 'Competitor Snapshots'
+
+    def __str__(self):
+        return f"{self.domain} ({self.schema}) - {self.created_at}"
+
+
+# ============================================================================
+# TRANSCRIPT SEGMENTS - Utterances / YouTube segments ka compact side table
+# ============================================================================
+
+class TranscriptSegments(models.Model):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  TRANSCRIPT SEGMENTS                                                      ║
+    ║  Ek transaction ke segments columnar binary blob mein (segment_store.py)  ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+    
+    YEH MODEL KYA STORE KARTA HAI:
+    - Transaction: Kis analysis ke segments hain (one-to-one)
+    - Kind: 'utterances' (Audio agent) ya 'segments' (YT Docs)
+    - Count / Duration: List views ke liye blob khole bina
+    - Blob: SegmentStore.build() output (starts, durations, speakers, text)
+    
+    output_data JSON mein ab segments nahi jaate - history page halka rehta hai,
+    aur /api/tx/<id>/segments/ sirf requested time range decode karta hai.
+    
+    DATABASE TABLE: agents_transcriptsegments
+    """
+    
+    transaction = models.OneToOneField(
+        AnalysisTransaction,
+        on_delete=models.CASCADE,           # Transaction delete = segments bhi delete
+        related_name='segment_store'        # txn.segment_store se access karo
+    )
+    kind = models.CharField(max_length=20)                     # 'utterances' / 'segments'
+    count = models.PositiveIntegerField(default=0)             # Segments ki ginti
+    duration = models.FloatField(default=0)                    # Seconds (last segment end)
+    blob = models.BinaryField()                                # SegmentStore bytes
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Transcript Segments'
+        verbose_name_plural = 'Transcript Segments'
+
+    def __str__(self):
+        return f"{self.transaction_id} - {self.kind} ({self.count})"
+
+
+# ============================================================================
+# AUDIO BLOB - Content-addressed (sha256) audio uploads + cached transcript
+# ============================================================================
+
+class AudioBlob(models.Model):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  AUDIO BLOB                                                               ║
+    ║  Ek unique audio content (sha256) - disk pe sirf ek copy                  ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+    
+    YEH MODEL KYA STORE KARTA HAI:
+    - SHA256: Upload stream karte waqt hi hash hota hai
+    - File: media/uploads/audio/sha256/ab/<sha256>.<ext> (content-addressed)
+    - Transcript: ElevenLabs ka JSON - same audio dobara aaye to reuse
+    
+    DATABASE TABLE: agents_audioblob
+    """
+    
+    sha256 = models.CharField(max_length=64, unique=True)      # Content hash (hex)
+    file = models.FileField(upload_to='uploads/audio/sha256/', max_length=255)
+    size = models.PositiveBigIntegerField(default=0)           # Bytes
+    transcript_json = models.TextField(blank=True, null=True)  # Cached ElevenLabs result
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Audio Blob'
+        verbose_name_plural = 'Audio Blobs'
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.size} bytes)"
@@ -0,0 +1,330 @@
+"""
+================================================================================
+                WEB3.AI - OHLC TIME-SERIES STORE (memory-mapped, incremental)
+================================================================================
+YEH FILE HAR COIN KI DAILY / HOURLY OHLC HISTORY LOCAL DISK PE RAKHTI HAI
+
+FUNCTIONALITY:
+- Har coin + resolution ki ek binary file: fixed 40-byte records
+  (t int64, o/h/l/c float64), time order mein, append-only
+- np.memmap se read - sirf requested window ke pages disk se aate hain
+  (window start/end bisect se, poori history memory mein load nahi hoti)
+- update(): sirf missing range fetch (last stored bucket se ab tak) -
+  CoinGecko market_chart/range points → OHLC buckets (NumPy reduceat)
+- load_closes() / load_field(): kisi bhi coins set + window ke liye aligned
+  NumPy matrix (regular time grid, T x N)
+- update_in_background(): request path ke liye - stale / missing series ek
+  daemon thread update karta hai, request sirf memmap padhti hai. Fail hua
+  coin UPDATE_BACKOFF_SECONDS tak dobara try nahi (mtime nahi badalta)
+
+USED BY:
+- agents/portfolio_analytics.py → load_history (read + background update)
+- python manage.py update_ohlc (cron / build.sh warm-up)
+
+LOCATION: agents/ohlc_store.py
+
+LAYOUT ON DISK:
+┌─────────────────────────────────────────────────────────────────────┐
+│ <OHLC_STORE_DIR>/1d/bitcoin.bin   ← records: <i8 t | <f8 o h l c    │
+│ <OHLC_STORE_DIR>/1h/bitcoin.bin      t = bucket start (unix seconds) │
+│ Aakhri bucket (aaj ka din / abhi ka ghanta) update pe replace hota hai│
+└─────────────────────────────────────────────────────────────────────┘
+
+NOTE: CoinGecko range > 90 din pe daily points deta hai - purane daily
+buckets mein o = h = l = c hota hai; 90 din ke andar hourly points se
+asli OHLC banta hai.
+================================================================================
+"""
+
+import os
+import re
+import threading
+import time
+import concurrent.futures
+from bisect import bisect_left
+
+import numpy as np
+import requests
+from django.conf import settings
+
+
+RECORD = np.dtype([('t', '<i8'), ('o', '<f8'), ('h', '<f8'), ('l', '<f8'), ('c', '<f8')])
+RESOLUTIONS = {
+    # step seconds, first backfill, max range per API call, refresh after
+    '1d': {'step': 86400, 'backfill_days': 365, 'window_days': 365, 'refresh': 3600},
+    '1h': {'step': 3600, 'backfill_days': 30, 'window_days': 90, 'refresh': 600},
+}
+RANGE_URL = "https://api.coingecko.com/api/v3/coins/{id}/market_chart/range"
+UPDATE_WORKERS = 4
+LOCK_STALE_SECONDS = 120
+UPDATE_BACKOFF_SECONDS = 15 * 60   # Background update fail ke baad itni der retry nahi
+_SAFE_ID = re.compile(r'[^a-z0-9._-]')
+
+_queued = {}                       # (cg_id, resolution) → None (order wala set) - queued ya in-flight
+_failed_at = {}                    # (cg_id, resolution) → aakhri fail time
+_queue_lock = threading.Lock()
+_worker_running = False
+
+
+# ============================================================================
+# FILE HELPERS
+# ============================================================================
+
+def store_dir():
+    return str(getattr(settings, 'OHLC_STORE_DIR', None) or (settings.MEDIA_ROOT / 'cache' / 'ohlc'))
+
+
+def series_path(cg_id, resolution):
+    return os.path.join(store_dir(), resolution, _SAFE_ID.sub('_', cg_id.lower()) + '.bin')
+
+
+def open_series(cg_id, resolution='1d'):
+    """Read-only memmap (records) ya empty array - file pe koi copy nahi"""
+    path = series_path(cg_id, resolution)
+    try:
+        if os.path.getsize(path) >= RECORD.itemsize:
+            return np.memmap(path, dtype=RECORD, mode='r')
+    except OSError:
+        pass
+    return np.empty(0, dtype=RECORD)
+
+
+class _Times:
+    """bisect ke liye 't' column ka lazy view - sirf touched records padhe jaate hain"""
+
+    def __init__(self, records):
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, i):
+        return int(self.records[i]['t'])
+
+
+def read_window(cg_id, start, end, resolution='1d'):
+    """[start, end) ke records (structured array copy - sirf itna hissa)"""
+    records = open_series(cg_id, resolution)
+    times = _Times(records)
+    lo, hi = bisect_left(times, int(start)), bisect_left(times, int(end))
+    return np.array(records[lo:hi])
+
+
+def has_series(cg_id, resolution='1d'):
+    """Disk pe kam se kam ek record hai?"""
+    try:
+        return os.path.getsize(series_path(cg_id, resolution)) >= RECORD.itemsize
+    except OSError:
+        return False
+
+
+def is_fresh(cg_id, resolution='1d', now=None):
+    """Refresh window ke andar update hua (file mtime)?"""
+    try:
+        return (now or time.time()) - os.path.getmtime(series_path(cg_id, resolution)) < RESOLUTIONS[resolution]['refresh']
+    except OSError:
+        return False
+
+
+def _acquire_lock(path):
+    lock = path + '.lock'
+    try:
+        if time.time() - os.path.getmtime(lock) > LOCK_STALE_SECONDS:
+            os.remove(lock)
+    except OSError:
+        pass
+    try:
+        os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return lock
+    except FileExistsError:
+        return None
+
+
+# ============================================================================
+# FETCH + INCREMENTAL APPEND
+# ============================================================================
+
+def bucket_points(points, step):
+    """[[ts_ms, price], ...] (time order) → OHLC records, bucket = floor(ts / step)"""
+    arr = np.asarray(points, dtype=np.float64)
+    if arr.size == 0:
+        return np.empty(0, dtype=RECORD)
+    arr = arr[np.argsort(arr[:, 0], kind='stable')]
+    buckets = (arr[:, 0] // 1000).astype(np.int64) // step * step
+    prices = arr[:, 1]
+    cuts = np.flatnonzero(np.diff(buckets)) + 1
+    starts = np.concatenate([[0], cuts])
+    ends = np.concatenate([cuts - 1, [len(prices) - 1]])
+
+    out = np.empty(len(starts), dtype=RECORD)
+    out['t'] = buckets[starts]
+    out['o'] = prices[starts]
+    out['h'] = np.maximum.reduceat(prices, starts)
+    out['l'] = np.minimum.reduceat(prices, starts)
+    out['c'] = prices[ends]
+    return out
+
+
+def _fetch_range(cg_id, start, end, window_days):
+    """market_chart/range ke points, window_days ke tukdon mein (granularity bani rahe)"""
+    api_key = getattr(settings, 'COINGECKO_API_KEY', None)
+    points, cursor = [], int(start)
+    while cursor < end:
+        chunk_end = min(int(end), cursor + window_days * 86400)
+        params = {'vs_currency': 'usd', 'from': cursor, 'to': chunk_end}
+        if api_key:
+            params['x_cg_demo_api_key'] = api_key
+        r = requests.get(RANGE_URL.format(id=cg_id), params=params, timeout=15)
+        if r.status_code != 200:
+            raise requests.HTTPError(f"HTTP {r.status_code} for {cg_id}")
+        points.extend(r.json().get('prices') or [])
+        cursor = chunk_end
+    return points
+
+
+def update_series(cg_id, resolution='1d', now=None, force=False):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  INCREMENTAL UPDATE - sirf missing range fetch + append                   ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    - File nahi → backfill_days ka history
+    - File hai → aakhri bucket ke start se ab tak (aakhri bucket replace, naye append)
+    - Refresh window ke andar update hua ho (file mtime) → kuch nahi (force se skip)
+    Ek waqt pe ek hi worker ek series update karta hai (lock file).
+
+    RETURNS: naye/updated records ki sankhya (0 = fresh tha ya lock busy)
+    """
+    spec = RESOLUTIONS[resolution]
+    now = int(now or time.time())
+    path = series_path(cg_id, resolution)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    if not force and is_fresh(cg_id, resolution, now):
+        return 0
+
+    lock = _acquire_lock(path)
+    if lock is None:
+        return 0  # Dusra worker update kar raha hai
+    try:
+        existing = open_series(cg_id, resolution)
+        count = len(existing)
+        last_t = int(existing[-1]['t']) if count else None
+        del existing  # memmap band - ab file likhenge
+
+        start = last_t if last_t is not None else now - spec['backfill_days'] * 86400
+        fresh = bucket_points(_fetch_range(cg_id, start, now, spec['window_days']), spec['step'])
+        if last_t is not None:
+            fresh = fresh[fresh['t'] >= last_t]
+        if not len(fresh):
+            if os.path.exists(path):
+                os.utime(path, None)  # Checked - refresh window tak dobara fetch nahi
+            return 0
+
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            if last_t is not None and fresh[0]['t'] == last_t:
+                f.seek((count - 1) * RECORD.itemsize)  # Aakhri (adhoora) bucket replace
+            else:
+                f.seek(count * RECORD.itemsize)
+            f.write(fresh.tobytes())
+        return len(fresh)
+    finally:
+        try:
+            os.remove(lock)
+        except OSError:
+            pass
+
+
+def update_many(cg_ids, resolution='1d', force=False):
+    """Parallel incremental updates. RETURNS: {cg_id: records written ya error string}"""
+    results = {}
+
+    def run(cg_id):
+        try:
+            return cg_id, update_series(cg_id, resolution, force=force)
+        except (requests.RequestException, ValueError, OSError) as e:
+            print(f"OHLC update {cg_id} ({resolution}) failed: {e}")
+            return cg_id, str(e)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=UPDATE_WORKERS) as pool:
+        for cg_id, outcome in pool.map(run, list(dict.fromkeys(cg_ids))):
+            results[cg_id] = outcome
+    return results
+
+
+def _drain_queue():
+    """Background worker: queue khaali hone tak batches update karta hai"""
+    global _worker_running
+    while True:
+        with _queue_lock:
+            batch = list(_queued)
+            if not batch:
+                _worker_running = False
+                return
+        by_resolution = {}
+        for cg_id, resolution in batch:
+            by_resolution.setdefault(resolution, []).append(cg_id)
+        for resolution, ids in by_resolution.items():
+            try:
+                results = update_many(ids, resolution)
+            except Exception as e:  # Thread kabhi na mare - warna queue atak jaaye
+                print(f"OHLC background update ({resolution}) failed: {e}")
+                results = {cg_id: str(e) for cg_id in ids}
+            now = time.time()
+            with _queue_lock:
+                for cg_id in ids:
+                    if isinstance(results.get(cg_id), str):
+                        _failed_at[(cg_id, resolution)] = now
+                    else:
+                        _failed_at.pop((cg_id, resolution), None)
+                    _queued.pop((cg_id, resolution), None)
+
+
+def update_in_background(cg_ids, resolution='1d'):
+    """
+    Stale / missing series ko background update ke liye queue karo - caller
+    kabhi fetch ka wait nahi karta (ek process mein ek hi worker thread).
+    Backoff mein pade coins skip. RETURNS: ids jo abhi queued / in-flight hain
+    """
+    global _worker_running
+    now = time.time()
+    with _queue_lock:
+        for cg_id in dict.fromkeys(cg_ids):
+            key = (cg_id, resolution)
+            if key in _queued or now - _failed_at.get(key, 0) < UPDATE_BACKOFF_SECONDS:
+                continue
+            if not is_fresh(cg_id, resolution, now):
+                _queued[key] = None
+        pending = [cg_id for cg_id in cg_ids if (cg_id, resolution) in _queued]
+        if _queued and not _worker_running:
+            _worker_running = True
+            threading.Thread(target=_drain_queue, name='ohlc-update', daemon=True).start()
+    return pending
+
+
+# ============================================================================
+# ALIGNED READS
+# ============================================================================
+
+def load_field(cg_ids, start, end, resolution='1d', field='c'):
+    """
+    Coins ki aligned matrix: regular grid [start, end) step = resolution.
+    RETURNS: (times int64 array T, values float64 T x N) - missing bucket = NaN
+    """
+    step = RESOLUTIONS[resolution]['step']
+    grid = np.arange(int(start) // step * step, int(end), step, dtype=np.int64)
+    values = np.full((len(grid), len(cg_ids)), np.nan)
+    for j, cg_id in enumerate(cg_ids):
+        window = read_window(cg_id, grid[0] if len(grid) else start, end, resolution)
+        if len(window):
+            rows = (window['t'] - grid[0]) // step
+            ok = (rows >= 0) & (rows < len(grid))
+            values[rows[ok], j] = window[field][ok]
+    return grid, values
+
+
+def load_closes(cg_ids, days, resolution='1d', now=None):
+    """Pichle `days` din ke closes (aaj ka adhoora bucket shamil) - T x N"""
+    now = int(now or time.time())
+    step = RESOLUTIONS[resolution]['step']
+    return load_field(cg_ids, now - days * 86400, now // step * step + step, resolution, 'c')
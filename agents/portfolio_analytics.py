@@ -0,0 +1,274 @@
+"""
+================================================================================
+                WEB3.AI - PORTFOLIO ANALYTICS ENGINE (NumPy, deterministic)
+================================================================================
+YEH FILE FINANCE AGENT KE RISK NUMBERS LOCALLY CALCULATE KARTI HAI
+
+FUNCTIONALITY:
+- Daily closes (agents/ohlc_store.py - incremental, memmap) → aligned
+  price matrix (T x N)
+- Saare holdings pe ek saath (vectorized): weights, annualized volatility,
+  covariance / correlation matrix, max drawdown, historical + parametric VaR,
+  CVaR, concentration (HHI, effective N), risk contributions
+- Deterministic risk_score (0-100) - LLM ab sirf narrate karta hai
+- Jis coin ki history hi nahi aayi (fetch / OHLC update fail) woh 0-vol cash
+  nahi maana jaata: vol / VaR / drawdown sirf history wale assets pe, woh coins
+  'no_history' mein list, aur coverage poori na ho to risk_score None
+- Request path pe koi CoinGecko call nahi: closes sirf memmap store se;
+  stale / missing coins ka update background mein (ohlc_store.update_in_background).
+  Jin coins ka abhi tak koi data nahi woh 'history_pending' mein
+- analytics_prompt_block(): Gemini ke liye chhota numeric summary
+
+USED BY:
+- agents/views.py → run_finance_x402
+
+LOCATION: agents/portfolio_analytics.py
+
+WORKFLOW:
+┌─────────────────────────────────────────────────────────────────────┐
+│ 1. finance_helper.get_portfolio_snapshot() → priced rows            │
+│ 2. load_history(ids) → memmap closes + background update queue      │
+│ 3. forward_fill() → listing se pehle NaN, baaki gaps bhare          │
+│ 4. compute_analytics(values, closes) → metrics dict                 │
+│ 5. analytics_prompt_block() → prompt context (N assets, ~20 lines)  │
+└─────────────────────────────────────────────────────────────────────┘
+================================================================================
+"""
+
+import time
+
+import numpy as np
+
+from . import ohlc_store
+
+
+HISTORY_DAYS = 90
+PERIODS_PER_YEAR = 365          # Crypto 24/7 trade hota hai
+VAR_CONFIDENCE = 0.95
+Z_95 = 1.6449
+TOP_PAIRS = 5
+MIN_HISTORY_COVERAGE = 0.99     # Portfolio value ka itna hissa history wala ho tabhi risk_score
+
+
+# ============================================================================
+# PRICE HISTORY - aligned daily closes (local OHLC store)
+# ============================================================================
+
+def forward_fill(matrix):
+    """NaN ko column ke pichle valid value se bharo (vectorized); shuruaati NaN rehte hain"""
+    t = np.arange(matrix.shape[0])[:, None]
+    idx = np.where(np.isnan(matrix), 0, t)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return matrix[idx, np.arange(matrix.shape[1])]
+
+
+# ============================================================================
+# ANALYTICS
+# ============================================================================
+
+def compute_analytics(symbols, values, closes):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  PORTFOLIO METRICS - saare assets ek saath (NumPy)                        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    symbols: N labels, values: N USD values, closes: T x N daily closes
+    (cash column = constant 1.0). Listing se pehle ke returns 0 maane jaate hain.
+    Poora NaN column (history nahi mili) risk metrics se bahar - baaki assets ke
+    sleeve pe re-weighted; concentration poore portfolio pe.
+
+    RETURNS: dict (JSON-serializable) - portfolio level + per-asset metrics
+    """
+    values = np.asarray(values, dtype=np.float64)
+    total = float(values.sum())
+    weights = values / total if total > 0 else np.zeros_like(values)
+    n = len(values)
+
+    # Concentration (history ke bina bhi)
+    hhi = float(np.dot(weights, weights))
+    sorted_w = np.sort(weights)[::-1]
+    result = {
+        'total_value': round(total, 2),
+        'assets': n,
+        'concentration': {
+            'hhi': round(hhi, 4),
+            'effective_assets': round(1 / hhi, 2) if hhi > 0 else 0,
+            'top_weight': round(float(sorted_w[0]), 4) if n else 0,
+            'top3_weight': round(float(sorted_w[:3].sum()), 4),
+        },
+        'history_days': 0,
+    }
+
+    covered = ~np.all(np.isnan(closes), axis=0) if closes.shape[0] else np.zeros(n, dtype=bool)
+    covered_value = float(values[covered].sum())
+    coverage = covered_value / total if total > 0 else 0.0
+    result['history_coverage'] = round(coverage, 4)
+    result['no_history'] = [s for s, c in zip(symbols, covered) if not c]
+
+    if closes.shape[0] < 3 or n == 0 or covered_value <= 0:
+        result['risk_score'] = None
+        result['per_asset'] = [{'symbol': s, 'weight': round(float(w), 4)} for s, w in zip(symbols, weights)]
+        return result
+
+    # Risk metrics sirf history wale sleeve pe (weights us sleeve ke andar normalize)
+    all_symbols, all_weights = symbols, weights
+    symbols = [s for s, c in zip(symbols, covered) if c]
+    closes = closes[:, covered]
+    weights = values[covered] / covered_value
+    n = len(symbols)
+    total = covered_value
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.nan_to_num(np.diff(np.log(closes), axis=0), nan=0.0, posinf=0.0, neginf=0.0)
+        cov = np.atleast_2d(np.cov(returns, rowvar=False, ddof=1))
+        sd = np.sqrt(np.diag(cov))
+        corr = np.where(np.outer(sd, sd) > 0, cov / np.outer(sd, sd), 0.0)
+        np.fill_diagonal(corr, 1.0)
+
+        port_returns = returns @ weights
+        port_var = float(weights @ cov @ weights)
+        port_sd = np.sqrt(max(port_var, 0.0))
+        risk_contrib = weights * (cov @ weights) / port_var if port_var > 0 else np.zeros(n)
+
+        # Drawdowns: asset closes aur portfolio path (constant weights)
+        asset_dd = np.nanmin(closes / np.fmax.accumulate(closes, axis=0) - 1, axis=0)
+        path = np.exp(np.concatenate([[0.0], np.cumsum(port_returns)]))
+        max_dd = float(np.min(path / np.maximum.accumulate(path) - 1))
+
+    cutoff = np.percentile(port_returns, (1 - VAR_CONFIDENCE) * 100)
+    tail = port_returns[port_returns <= cutoff]
+    vol_annual = port_sd * np.sqrt(PERIODS_PER_YEAR)
+
+    # Sabse zyada correlated pairs (hundreds of assets pe bhi argpartition fast hai)
+    pairs = []
+    if n > 1:
+        iu, ju = np.triu_indices(n, 1)
+        pair_corr = corr[iu, ju]
+        k = min(TOP_PAIRS, len(pair_corr))
+        top = np.argpartition(-np.abs(pair_corr), k - 1)[:k]
+        top = top[np.argsort(-np.abs(pair_corr[top]))]
+        pairs = [{'pair': [symbols[iu[i]], symbols[ju[i]]], 'corr': round(float(pair_corr[i]), 3)} for i in top]
+
+    # Risk score: 50% annual vol (100% vol = max), 25% drawdown (80% = max), 25% concentration
+    risk_score = int(round(100 * (
+        0.5 * min(vol_annual / 1.0, 1.0) + 0.25 * min(-max_dd / 0.8, 1.0) + 0.25 * hhi
+    )))
+
+    asset_vol = sd * np.sqrt(PERIODS_PER_YEAR)
+    position = {int(j): i for i, j in enumerate(np.flatnonzero(covered))}  # Original column → sleeve column
+    per_asset = []
+    for j, (sym, w) in enumerate(zip(all_symbols, all_weights)):
+        i = position.get(j)
+        if i is None:
+            per_asset.append({'symbol': sym, 'weight': round(float(w), 4), 'volatility_annual': None,
+                              'max_drawdown': None, 'risk_contribution': None})
+            continue
+        per_asset.append({
+            'symbol': sym,
+            'weight': round(float(w), 4),
+            'volatility_annual': round(float(asset_vol[i]), 4),
+            'max_drawdown': round(float(asset_dd[i]), 4) if np.isfinite(asset_dd[i]) else None,
+            'risk_contribution': round(float(risk_contrib[i]), 4),
+        })
+
+    result.update({
+        'history_days': int(closes.shape[0]),
+        # Bina history wala bada hissa = numbers understated, isliye score nahi
+        'risk_score': max(0, min(100, risk_score)) if coverage >= MIN_HISTORY_COVERAGE else None,
+        'volatility_annual': round(float(vol_annual), 4),
+        'max_drawdown': round(max_dd, 4),
+        'var_95_1d': round(float(-cutoff * total), 2),
+        'var_95_1d_parametric': round(float(Z_95 * port_sd * total), 2),
+        'cvar_95_1d': round(float(-tail.mean() * total), 2) if len(tail) else None,
+        'diversification_ratio': round(float(weights @ sd / port_sd), 3) if port_sd > 0 else None,
+        'top_correlations': pairs,
+        'per_asset': per_asset,
+    })
+    return result
+
+
+def load_history(cg_ids, days=HISTORY_DAYS):
+    """
+    Daily closes T x N (forward-filled) - sirf memmap se window read. Stale /
+    missing series background mein update hoti hain (agli request pe milengi).
+    """
+    coin_ids = [cg_id for cg_id in cg_ids if cg_id]
+    if coin_ids:
+        ohlc_store.update_in_background(coin_ids, '1d')
+    _times, closes = ohlc_store.load_closes([cg_id or '' for cg_id in cg_ids], days)
+    # Bilkul khaali shuruaati din (kisi coin ka data nahi) hata do
+    has_data = ~np.all(np.isnan(closes), axis=1) if closes.size else np.zeros(0, dtype=bool)
+    if has_data.any():
+        closes = closes[np.argmax(has_data):]
+    else:
+        closes = closes[:0]
+    return forward_fill(closes)
+
+
+def analyze_portfolio(rows, days=HISTORY_DAYS):
+    """
+    get_portfolio_snapshot() rows → analytics. Sirf priced rows (value ho) count
+    hoti hain; USD cash = constant 1.0 column. RETURNS: (analytics, closes matrix, ids)
+    """
+    priced = [r for r in rows if r['value'] is not None and r['value'] > 0]
+    symbols = [r['symbol'] for r in priced]
+    ids = [r['cg_id'] for r in priced]
+
+    closes = load_history(ids, days)
+    if closes.shape[0]:
+        for j, r in enumerate(priced):
+            if not r['cg_id']:
+                closes[:, j] = 1.0  # Cash
+    ids = [r['cg_id'] or r['symbol'] for r in priced]
+
+    started = time.perf_counter()
+    analytics = compute_analytics(symbols, [r['value'] for r in priced], closes)
+    analytics['compute_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    analytics['unpriced'] = [r['symbol'] for r in rows if r['value'] is None]
+    # Store mein abhi koi record nahi - download background mein (ya fail ke baad backoff)
+    analytics['history_pending'] = [r['symbol'] for r in priced
+                                    if r['cg_id'] and not ohlc_store.has_series(r['cg_id'], '1d')]
+    return analytics, closes, ids
+
+
+def analytics_prompt_block(analytics, max_assets=15):
+    """LLM ke liye compact numeric summary (top assets by weight)"""
+    if not analytics:
+        return "No analytics available."
+    c = analytics['concentration']
+    lines = [
+        f"Total value: ${analytics['total_value']:,.2f} across {analytics['assets']} priced assets",
+        f"Concentration: top asset {c['top_weight']:.0%}, top 3 {c['top3_weight']:.0%}, "
+        f"effective assets {c['effective_assets']} (HHI {c['hhi']})",
+    ]
+    if 'volatility_annual' in analytics:
+        scope = ''
+        if analytics['no_history']:
+            scope = f" (only the {analytics['history_coverage']:.0%} of value with price history)"
+        if analytics['risk_score'] is not None:
+            lines.append(f"Risk score (computed): {analytics['risk_score']}/100")
+        lines += [
+            f"Annualized volatility{scope}: {analytics['volatility_annual']:.0%} | Max drawdown "
+            f"({analytics['history_days']}d): {analytics['max_drawdown']:.0%}",
+            f"1-day VaR 95%{scope}: ${analytics['var_95_1d']:,.2f} (CVaR ${analytics['cvar_95_1d'] or 0:,.2f})",
+        ]
+        if analytics['top_correlations']:
+            lines.append("Most correlated: " + ", ".join(
+                f"{p['pair'][0]}/{p['pair'][1]} {p['corr']}" for p in analytics['top_correlations']))
+    top_assets = sorted(analytics['per_asset'], key=lambda a: -a['weight'])[:max_assets]
+    for a in top_assets:
+        extra = ''
+        if a.get('volatility_annual') is not None:
+            extra = f", vol {a['volatility_annual']:.0%}, risk share {a['risk_contribution']:.0%}"
+        lines.append(f"- {a['symbol']}: weight {a['weight']:.1%}{extra}")
+    pending = set(analytics.get('history_pending') or [])
+    if pending:
+        lines.append("Price history pending (not downloaded yet, risk unknown): "
+                     + ", ".join(sorted(pending)[:20]))
+    no_history = [s for s in analytics.get('no_history') or [] if s not in pending]
+    if no_history:
+        lines.append("No price history (risk unknown, excluded from volatility/VaR): "
+                     + ", ".join(no_history[:20]))
+    if analytics.get('unpriced'):
+        lines.append("Unpriced (ignored): " + ", ".join(analytics['unpriced'][:20]))
+    return "\n".join(lines)
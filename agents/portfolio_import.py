@@ -0,0 +1,448 @@
+"""
+================================================================================
+                WEB3.AI - PORTFOLIO IMPORT (CSV / JSON exports, streaming)
+================================================================================
+YEH FILE EXCHANGE / WALLET EXPORTS SE HOLDINGS AGGREGATE KARTI HAI
+
+FUNCTIONALITY:
+- Upload chunks mein padha jaata hai (poori file memory mein nahi) -
+  incremental UTF-8 decode → lines / JSON objects
+- CSV: header row se symbol + amount columns pehchane jaate hain
+  (Asset / Coin / Currency ..., Amount / Balance / Quantity ...)
+- JSON: top-level array, {"balances": [...]} wrapper ya JSON Lines -
+  array elements ek ek karke decode (raw_decode); wrapper mein pehli
+  list-of-objects (metadata lists / nested "meta" objects skip)
+- Ek pass mein per-symbol running total; memory = distinct symbols
+  (MAX_SYMBOLS tak), rows ki sankhya se nahi
+- Wallet / exchange column ho to distinct sources gine jaate hain
+
+USED BY:
+- agents/views.py → run_finance_x402 (portfolio_file upload)
+
+LOCATION: agents/portfolio_import.py
+
+SUPPORTED SHAPES:
+┌─────────────────────────────────────────────────────────────────────┐
+│ CSV   : Exchange,Asset,Balance\nBinance,BTC,0.5\nKraken,BTC,0.25     │
+│ JSON  : [{"symbol": "ETH", "amount": "2.5"}, ...]                   │
+│         {"balances": [{"coin": "SOL", "free": 10}, ...]}            │
+│ JSONL : {"asset": "BTC", "quantity": 1}\n{"asset": ...}\n           │
+└─────────────────────────────────────────────────────────────────────┘
+================================================================================
+"""
+
+import codecs
+import csv
+import json
+import re
+
+from django.conf import settings
+
+
+SYMBOL_KEYS = ('symbol', 'asset', 'coin', 'currency', 'ticker', 'token', 'ccy')
+AMOUNT_KEYS = ('amount', 'quantity', 'qty', 'balance', 'total', 'holdings', 'units', 'free', 'size')
+SOURCE_KEYS = ('exchange', 'wallet', 'account', 'source', 'platform', 'address')
+MAX_SYMBOLS = 5000           # Isse zyada distinct symbols → baaki rows skip
+MAX_SOURCES = 1000
+MAX_LINE_CHARS = 64 * 1024   # Ek CSV line / JSON element isse bada = kharab file
+_SYMBOL_RE = re.compile(r"^[A-Z0-9.]{1,15}$")
+_AMOUNT_JUNK = re.compile(r'[,\s$_]')
+
+
+class PortfolioImportError(ValueError):
+    """File format samajh nahi aaya (user ko 400 ke saath dikhaya jaata hai)"""
+
+
+# ============================================================================
+# STREAM HELPERS
+# ============================================================================
+
+def _text_chunks(uploaded, max_bytes):
+    """Upload ke binary chunks → text chunks (BOM hata ke); max_bytes se upar → error"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    seen = 0
+    for chunk in uploaded.chunks():
+        seen += len(chunk)
+        if seen > max_bytes:
+            raise PortfolioImportError(f"File too large (max {max_bytes // (1024 * 1024)} MB)")
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def _iter_lines(chunks):
+    """Text chunks → lines (newline ke saath, csv module ke liye)"""
+    buf = ''
+    for chunk in chunks:
+        buf += chunk
+        start = 0
+        while True:
+            nl = buf.find('\n', start)
+            if nl < 0:
+                break
+            yield buf[start:nl + 1]
+            start = nl + 1
+        buf = buf[start:]
+        if len(buf) > MAX_LINE_CHARS:
+            raise PortfolioImportError("Line too long - is this a CSV file?")
+    if buf:
+        yield buf
+
+
+class _JsonReader:
+    """Text chunks pe streaming JSON cursor - ek value ek baar mein decode (raw_decode)"""
+
+    WS = ' \t\r\n'
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buf, self.pos, self.eof = '', 0, False
+        self.decoder = json.JSONDecoder()
+
+    def more(self):
+        if self.pos:
+            self.buf, self.pos = self.buf[self.pos:], 0
+        try:
+            self.buf += next(self.chunks)
+        except StopIteration:
+            self.eof = True
+
+    def peek(self, skip=WS):
+        """Agla non-skip character ('' = file khatam); pos usi pe rehta hai"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in skip:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ''
+            self.more()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise PortfolioImportError(f"Invalid JSON: expected '{char}'")
+        self.pos += 1
+
+    def value(self):
+        while True:
+            self.peek()
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                obj, end = None, None
+            # Buffer ke end pe khatam = number / literal adhoora ho sakta hai
+            if end is not None and (end < len(self.buf) or self.eof):
+                self.pos = end
+                return obj
+            if self.eof:
+                raise PortfolioImportError("Invalid JSON element")
+            if len(self.buf) - self.pos > MAX_LINE_CHARS:
+                raise PortfolioImportError("JSON element too large")
+            self.more()
+
+    def array_items(self):
+        """'[' consume ho chuka - elements ek ek karke, ']' pe band"""
+        while True:
+            char = self.peek(self.WS + ',')
+            if char == ']':
+                self.pos += 1
+                return
+            if not char:
+                raise PortfolioImportError("Unexpected end of JSON array")
+            yield self.value()
+
+
+def _find_records(reader):
+    """
+    Wrapper ke andar pehli list-of-objects stream karo (depth-first, key order mein).
+    {"meta": {"tags": ["x"]}, "balances": [...]} → balances; metadata lists / scalars
+    skip. Generator return value: True agar records mili.
+    """
+    char = reader.peek()
+    if char == '[':
+        reader.pos += 1
+        if reader.peek(reader.WS + ',') == '{':
+            yield from reader.array_items()
+            return True
+        for _item in reader.array_items():
+            pass  # Records nahi (tags / numbers) - skip
+        return False
+    if char == '{':
+        reader.pos += 1
+        while True:
+            char = reader.peek(reader.WS + ',')
+            if char == '}':
+                reader.pos += 1
+                return False
+            if char != '"':
+                raise PortfolioImportError("Invalid JSON object")
+            reader.value()  # Key
+            reader.expect(':')
+            if (yield from _find_records(reader)):
+                return True  # Wrapper ka baaki hissa (trailing metadata) nahi padhte
+    reader.value()
+    return False
+
+
+def _iter_json_objects(chunks):
+    """
+    JSON array ke elements / JSON Lines ke objects ek ek karke.
+    '{' se shuru + pehli line (newline ya file end tak, MAX_LINE_CHARS ke andar)
+    poora object → JSON Lines; '[' → top-level array; warna (e.g. minified
+    {"balances": [...]} ek hi lambi line mein) wrapper ke andar pehli
+    list-of-objects streaming reader se.
+    """
+    buf = ''
+    chunks = iter(chunks)
+    for chunk in chunks:
+        buf += chunk
+        if buf.strip():
+            break
+    head = buf.lstrip()
+    if not head:
+        return
+    if head[0] == '{':
+        complete = True  # Pehli line poori buffer mein hai (newline mili ya file khatam)
+        while '\n' not in buf and len(buf) <= MAX_LINE_CHARS:
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            buf += chunk
+        else:
+            complete = '\n' in buf
+        first_line = buf.split('\n', 1)[0].strip()
+        first = None
+        if complete and len(first_line) <= MAX_LINE_CHARS:
+            try:
+                first = json.loads(first_line)
+            except ValueError:
+                pass
+        if isinstance(first, dict):
+            for line in _iter_lines(_prepend(buf, chunks)):
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        yield None  # Kharab line - skipped count mein
+            return
+        reader = _JsonReader(_prepend(buf, chunks))
+        if not (yield from _find_records(reader)):
+            raise PortfolioImportError("No list of balance records found in JSON")
+        return
+    if head[0] != '[':
+        raise PortfolioImportError("JSON must be an array, a {\"...\": [...]} wrapper or JSON Lines")
+
+    reader = _JsonReader(_prepend(buf, chunks))
+    reader.expect('[')
+    yield from reader.array_items()
+
+
+def _prepend(text, chunks):
+    yield text
+    yield from chunks
+
+
+# ============================================================================
+# ROW PARSING
+# ============================================================================
+
+def _normalize_key(key):
+    return re.sub(r'[^a-z0-9]+', '_', str(key).strip().lower()).strip('_')
+
+
+def _pick_column(keys, candidates):
+    """Exact naam pehle (candidate order mein), phir 'total_balance' jaise contains match"""
+    for cand in candidates:
+        if cand in keys:
+            return cand
+    for cand in candidates:
+        for key in keys:
+            if cand in key.split('_'):
+                return key
+    return None
+
+
+def _parse_amount(value):
+    if isinstance(value, bool) or value is None:
+        raise ValueError(value)
+    try:
+        return float(value)  # Fast path - zyada tar rows saaf numbers hoti hain
+    except ValueError:
+        pass
+    text = _AMOUNT_JUNK.sub('', str(value))
+    if text.startswith('(') and text.endswith(')'):
+        text = '-' + text[1:-1]  # Accounting style negative
+    return float(text)
+
+
+class _Aggregator:
+    """Per-symbol running totals - memory distinct symbols ke barabar"""
+
+    def __init__(self):
+        self.totals = {}
+        self.sources = set()
+        self.rows = 0
+        self.skipped = 0
+        self._symbols = {}  # Raw cell → clean symbol (ya None) - regex har row pe nahi
+
+    def _clean_symbol(self, raw):
+        symbol = str(raw or '').strip().upper()
+        symbol = symbol if _SYMBOL_RE.match(symbol) else None
+        if len(self._symbols) < MAX_SYMBOLS * 4:
+            self._symbols[raw] = symbol
+        return symbol
+
+    def add(self, symbol, amount, source=None):
+        self.rows += 1
+        try:
+            symbol = self._symbols[symbol] if symbol in self._symbols else self._clean_symbol(symbol)
+            amount = _parse_amount(amount)
+        except (TypeError, ValueError):
+            self.skipped += 1
+            return
+        if symbol is None or amount != amount or abs(amount) == float('inf'):
+            self.skipped += 1
+            return
+        total = self.totals.get(symbol)
+        if total is None:
+            if len(self.totals) >= MAX_SYMBOLS:
+                self.skipped += 1
+                return
+            total = 0.0
+        self.totals[symbol] = total + amount
+        if source and len(self.sources) < MAX_SOURCES:
+            self.sources.add(str(source).strip()[:100])
+
+    def result(self, fmt):
+        holdings = [{'symbol': sym, 'amount': round(amt, 12)} for sym, amt in self.totals.items() if amt > 0]
+        holdings.sort(key=lambda h: h['symbol'])
+        return {
+            'format': fmt,
+            'holdings': holdings,
+            'rows': self.rows,
+            'skipped': self.skipped,
+            'symbols': len(holdings),
+            'sources': len(self.sources),
+        }
+
+
+def _aggregate_csv(chunks, agg):
+    reader = csv.reader(_iter_lines(chunks))
+    header = None
+    for row in reader:
+        if header is None:
+            if not any(cell.strip() for cell in row):
+                continue
+            keys = [_normalize_key(c) for c in row]
+            sym_key, amt_key = _pick_column(keys, SYMBOL_KEYS), _pick_column(keys, AMOUNT_KEYS)
+            if not sym_key or not amt_key:
+                raise PortfolioImportError("CSV header needs an asset/symbol column and an amount/balance column")
+            src_key = _pick_column(keys, SOURCE_KEYS)
+            sym_i, amt_i = keys.index(sym_key), keys.index(amt_key)
+            src_i = keys.index(src_key) if src_key else None
+            header, width = row, max(sym_i, amt_i)
+            continue
+        if len(row) <= width:
+            if any(cell.strip() for cell in row):
+                agg.rows += 1
+                agg.skipped += 1
+            continue
+        agg.add(row[sym_i], row[amt_i], row[src_i] if src_i is not None and src_i < len(row) else None)
+    if header is None:
+        raise PortfolioImportError("CSV file is empty")
+
+
+def _record_layout(obj):
+    """Object ke raw keys → (symbol key, amount key, source key) - har key-shape ke liye ek baar"""
+    keys = {_normalize_key(k): k for k in obj}
+    sym, amt = _pick_column(keys, SYMBOL_KEYS), _pick_column(keys, AMOUNT_KEYS)
+    if not sym or not amt:
+        return None
+    src = _pick_column(keys, SOURCE_KEYS)
+    return keys[sym], keys[amt], keys[src] if src else None
+
+
+def _add_json_record(obj, agg, layouts):
+    """Ek JSON object → agg. Wrapper object (list value) mile to uske elements."""
+    if not isinstance(obj, dict):
+        agg.rows += 1
+        agg.skipped += 1
+        return
+    shape = tuple(obj)
+    if shape in layouts:
+        layout = layouts[shape]
+    else:
+        layout = _record_layout(obj)
+        if len(layouts) < 256:
+            layouts[shape] = layout
+    if layout:
+        sym, amt, src = layout
+        agg.add(obj[sym], obj[amt], obj[src] if src else None)
+        return
+    # Wrapper object (JSONL line / array element) - pehli list jisme objects hon
+    nested = [v for v in obj.values() if isinstance(v, list) and any(isinstance(i, dict) for i in v)]
+    if nested:
+        for item in nested[0]:
+            _add_json_record(item, agg, layouts)
+    else:
+        agg.rows += 1
+        agg.skipped += 1
+
+
+def _aggregate_json(chunks, agg):
+    layouts = {}
+    for obj in _iter_json_objects(chunks):
+        _add_json_record(obj, agg, layouts)
+
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+
+def import_portfolio_file(uploaded):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  STREAMING PORTFOLIO IMPORT                                               ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    uploaded: Django UploadedFile (.csv / .json / .jsonl / .ndjson -
+    extension na ho to content se pehchana jaata hai)
+
+    RETURNS: (result, error) - result = {
+        'format', 'holdings': [{'symbol', 'amount'}] (extract_holdings jaisa),
+        'rows', 'skipped', 'symbols', 'sources'
+    }
+    """
+    max_bytes = getattr(settings, 'PORTFOLIO_IMPORT_MAX_MB', 20) * 1024 * 1024
+    name = (uploaded.name or '').lower()
+    chunks = _text_chunks(uploaded, max_bytes)
+
+    if name.endswith('.csv') or name.endswith('.txt'):
+        fmt = 'csv'
+    elif name.endswith(('.json', '.jsonl', '.ndjson')):
+        fmt = 'json'
+    else:
+        # Extension nahi - pehla non-space character dekho
+        first = next(chunks, '')
+        chunks = _prepend(first, chunks)
+        fmt = 'json' if first.lstrip()[:1] in ('[', '{') else 'csv'
+
+    agg = _Aggregator()
+    try:
+        if fmt == 'csv':
+            _aggregate_csv(chunks, agg)
+        else:
+            _aggregate_json(chunks, agg)
+    except PortfolioImportError as e:
+        return None, str(e)
+    except csv.Error as e:
+        return None, f"Invalid CSV: {e}"
+
+    result = agg.result(fmt)
+    if not result['holdings']:
+        return None, f"No positive balances found ({agg.rows} rows read, {agg.skipped} skipped)"
+    return result, None
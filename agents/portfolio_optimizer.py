@@ -0,0 +1,296 @@
+"""
+================================================================================
+                WEB3.AI - PORTFOLIO OPTIMIZER (target allocation + trade list)
+================================================================================
+YEH FILE FINANCE AGENT KE SUGGESTED ALLOCATIONS LOCALLY CALCULATE KARTI HAI
+
+FUNCTIONALITY:
+- risk_appetite (conservative / balanced / aggressive / degen) → method +
+  constraints (RISK_PROFILES)
+- Stables ek cash sleeve: cash_floor ≤ cash ≤ cash_cap (per profile) - risk
+  appetite badhne pe stable share girta hai
+- Mean-variance: max  w·μ - (λ/2) w·Σw - γ·HHI,  sum(w) = 1, 0 ≤ w ≤ max_weight
+  (accelerated projected gradient, capped-simplex projection); μ cross-sectional
+  mean ki taraf shrunk - ek asset pe corner solution nahi
+- Risk parity: har risky asset ka barabar risk contribution (multiplicative
+  updates), cash sleeve alag se
+- Daily closes: analyze_portfolio() wala matrix reuse (history=) - sirf jo
+  candidates us matrix mein nahi (e.g. RECOMMENDATION_UNIVERSE) woh store se
+  padhe jaate hain → shrunk μ, Σ (NumPy)
+- Target % (exact 100 tak round) + Buy/Sell trade list (USD + units)
+- Deterministic: same input = same output; LLM sirf narrate karta hai
+
+USED BY:
+- agents/views.py → run_finance_x402
+
+LOCATION: agents/portfolio_optimizer.py
+================================================================================
+"""
+
+import numpy as np
+
+from .portfolio_analytics import PERIODS_PER_YEAR, load_history
+
+
+# cash_floor / cash_cap = stables sleeve ki range - ek profile ki range agle ke upar,
+# isliye risk appetite badhne pe stable share kabhi nahi badhta
+RISK_PROFILES = {
+    'conservative': {'method': 'risk_parity', 'risk_aversion': 8.0, 'max_weight': 0.35,
+                     'cash_floor': 0.30, 'cash_cap': 0.60, 'concentration_penalty': 0.0},
+    'balanced': {'method': 'mean_variance', 'risk_aversion': 4.0, 'max_weight': 0.40,
+                 'cash_floor': 0.10, 'cash_cap': 0.25, 'concentration_penalty': 0.5},
+    'aggressive': {'method': 'mean_variance', 'risk_aversion': 2.0, 'max_weight': 0.60,
+                   'cash_floor': 0.05, 'cash_cap': 0.10, 'concentration_penalty': 0.3},
+    'degen': {'method': 'mean_variance', 'risk_aversion': 1.0, 'max_weight': 0.85,
+              'cash_floor': 0.0, 'cash_cap': 0.05, 'concentration_penalty': 0.15},
+}
+STABLES = {'USD', 'USDC', 'USDT', 'DAI', 'BUSD', 'TUSD', 'FDUSD', 'PYUSD', 'USDE'}
+RECOMMENDATION_UNIVERSE = ['BTC', 'ETH', 'SOL']  # Sirf cash ho to in mein allocate
+MIN_HISTORY_DAYS = 30        # Isse kam history wale assets locked (current weight pe)
+MEAN_SHRINKAGE = 0.5         # μ ka itna hissa cross-sectional mean (estimation error)
+COV_SHRINKAGE = 0.2          # Σ → diagonal ki taraf shrink
+MIN_TRADE_PCT = 0.5          # Isse chhote rebalances skip
+
+
+# ============================================================================
+# MATH HELPERS
+# ============================================================================
+
+def project_capped_simplex(v, total, lo, hi, tol=1e-12):
+    """v ko {sum(w) = total, lo ≤ w ≤ hi} pe project karta hai (τ pe bisection)"""
+    if hi.sum() < total:
+        return hi.copy()
+    left, right = float(np.min(v - hi)), float(np.max(v - lo))
+    while right - left > tol:
+        tau = (left + right) / 2
+        if np.clip(v - tau, lo, hi).sum() > total:
+            left = tau
+        else:
+            right = tau
+    return np.clip(v - (left + right) / 2, lo, hi)
+
+
+def mean_variance(mu, cov, risk_aversion, lo, hi, total=1.0, concentration=0.0, iterations=500):
+    """
+    Accelerated projected gradient (FISTA) on  w·μ - (λ/2) w·Σw - Σ γ_i w_i²
+    (concave - global optimum). γ = concentration penalty (HHI term) - ek asset
+    pe corner solution ki jagah diversified weights.
+    """
+    n = len(mu)
+    w = y = project_capped_simplex(np.full(n, total / n), total, lo, hi)
+    # Step = 1 / Lipschitz constant (λ · largest eigenvalue, power iteration se)
+    x = np.ones(n)
+    for _ in range(30):
+        x = cov @ x
+        x /= np.linalg.norm(x) or 1.0
+    gamma = np.broadcast_to(np.asarray(concentration, dtype=np.float64), (n,))
+    step = 1.0 / max(risk_aversion * float(x @ cov @ x) + 2 * float(gamma.max()), 1e-9)
+    t = 1.0
+    for _ in range(iterations):
+        new_w = project_capped_simplex(y + step * (mu - risk_aversion * cov @ y - 2 * gamma * y), total, lo, hi)
+        if np.abs(new_w - w).max() < 1e-9:
+            return new_w
+        if (y - new_w) @ (new_w - w) > 0:
+            t = 1.0  # Momentum galat disha mein - restart (O'Donoghue-Candès)
+        new_t = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        y = new_w + (t - 1) / new_t * (new_w - w)
+        w, t = new_w, new_t
+    return w
+
+
+def risk_parity(cov, total=1.0, iterations=500):
+    """Equal risk contribution: w_i (Σw)_i sab ke liye barabar"""
+    n = cov.shape[0]
+    w = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        marginal = cov @ w
+        contrib = w * marginal
+        target = contrib.sum() / n
+        new_w = w * np.sqrt(target / np.maximum(contrib, 1e-18))
+        new_w /= new_w.sum()
+        if np.abs(new_w - w).max() < 1e-10:
+            w = new_w
+            break
+        w = new_w
+    return w * total
+
+
+def round_percentages(weights):
+    """Largest-remainder rounding (1 decimal) - total exactly 100.0"""
+    units = np.asarray(weights) * 1000
+    floored = np.floor(units)
+    shortfall = int(round(1000 - floored.sum()))
+    if shortfall > 0:
+        floored[np.argsort(-(units - floored))[:shortfall]] += 1
+    return [round(float(u) / 10, 1) for u in floored]
+
+
+def _history_matrix(universe, history, days):
+    """
+    Universe ke columns ka closes matrix. history = analyze_portfolio() ka
+    (closes, ids) - dono matrices aaj ke bucket pe khatam hote hain, isliye
+    neeche se align; jo ids usme nahi woh load_history se (shuru NaN padded).
+    """
+    keys = [r['cg_id'] or r['symbol'] for r in universe]
+    if history is None:
+        return load_history([r['cg_id'] for r in universe], days)
+
+    closes, ids = history
+    column = {key: j for j, key in enumerate(ids)}
+    missing = [r for r, key in zip(universe, keys) if key not in column]
+    extra = load_history([r['cg_id'] for r in missing], days) if missing else np.empty((0, 0))
+    rows = max(closes.shape[0], extra.shape[0])
+    matrix = np.full((rows, len(universe)), np.nan)
+    k = 0
+    for j, key in enumerate(keys):
+        if key in column:
+            matrix[rows - closes.shape[0]:, j] = closes[:, column[key]]
+        else:
+            matrix[rows - extra.shape[0]:, j] = extra[:, k]
+            k += 1
+    return matrix
+
+
+# ============================================================================
+# OPTIMIZER
+# ============================================================================
+
+def optimize_portfolio(rows, risk_appetite='balanced', history=None, days=90):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  TARGET ALLOCATION + TRADE LIST                                           ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    rows: get_portfolio_snapshot() rows - priced (price not None) rows universe
+    banate hain; value 0 wali rows = candidates (e.g. RECOMMENDATION_UNIVERSE).
+    history: analyze_portfolio() ka (closes, ids) - wahi matrix reuse, dobara
+    history load nahi (None → load_history se).
+
+    RETURNS: {
+        'method', 'risk_appetite', 'allocations': [{'asset', 'percentage'}],
+        'targets': [{'asset', 'current_pct', 'target_pct'}],
+        'trades': [{'asset', 'action', 'amount_usd', 'units'}],
+        'expected_return_annual', 'expected_volatility_annual', 'locked'
+    } ya None (kuch priced nahi / total 0)
+    """
+    profile = RISK_PROFILES.get(str(risk_appetite).lower(), RISK_PROFILES['balanced'])
+    universe = [r for r in rows if r['price']]
+    values = np.array([r['value'] or 0.0 for r in universe], dtype=np.float64)
+    total = float(values.sum())
+    if not universe or total <= 0:
+        return None
+
+    symbols = [r['symbol'] for r in universe]
+    closes = _history_matrix(universe, history, days)
+    is_stable = np.array([s in STABLES for s in symbols])
+    for j, r in enumerate(universe):
+        if not r['cg_id'] and closes.shape[0]:
+            closes[:, j] = 1.0  # Cash
+
+    # Kam history wale assets locked (current weight) - baaki optimize hote hain
+    history_len = (~np.isnan(closes)).sum(axis=0) if closes.shape[0] else np.zeros(len(universe))
+    free = (history_len >= MIN_HISTORY_DAYS) | is_stable
+    if closes.shape[0] < 2:
+        free[:] = False  # History hi nahi - jaisa hai waisa rakho
+    current = values / total
+    locked_total = float(current[~free].sum())
+
+    weights = current.copy()
+    idx = np.flatnonzero(free)
+    port_mu = port_vol = 0.0
+    if len(idx):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.nan_to_num(np.diff(np.log(closes[:, idx]), axis=0), nan=0.0, posinf=0.0, neginf=0.0)
+        stable_mask = is_stable[idx]
+        risky, stables = np.flatnonzero(~stable_mask), idx[stable_mask]
+        returns = returns[:, risky]
+        budget = 1.0 - locked_total
+
+        if len(risky):
+            mu = returns.mean(axis=0) * PERIODS_PER_YEAR
+            # Har asset ka mean cross-sectional mean ki taraf (90 din ka mean noisy hai)
+            mu = MEAN_SHRINKAGE * mu.mean() + (1 - MEAN_SHRINKAGE) * mu
+            cov = np.atleast_2d(np.cov(returns, rowvar=False)) * PERIODS_PER_YEAR if len(returns) > 1 else np.zeros((len(risky), len(risky)))
+            cov = (1 - COV_SHRINKAGE) * cov + COV_SHRINKAGE * np.diag(np.diag(cov))
+            cov += np.eye(len(risky)) * 1e-8  # Flat-price coins pe bhi invertible / finite
+
+            if len(stables):
+                # Stables = ek cash sleeve (μ = 0, σ = 0), floor + profile ceiling ke beech.
+                # Risky caps poora budget na le sakein to ceiling utna dheela
+                cap = profile['max_weight']
+                cash_lo = min(profile['cash_floor'], budget)
+                cash_hi = min(max(profile['cash_cap'], cash_lo, budget - len(risky) * cap), budget)
+            else:
+                cap = max(profile['max_weight'], budget / len(risky))
+                cash_lo = cash_hi = 0.0
+
+            if profile['method'] == 'risk_parity':
+                risky_w = np.minimum(risk_parity(cov, total=budget - cash_lo), cap)  # Cap se upar ka hissa cash mein
+                if budget - risky_w.sum() > cash_hi + 1e-12:
+                    # Cash ceiling se upar chala gaya - baaki risky assets mein (caps ke andar)
+                    risky_w = project_capped_simplex(risky_w, budget - cash_hi, np.zeros(len(risky)), np.full(len(risky), cap))
+                cash_w = budget - float(risky_w.sum())
+            else:
+                # Cash ek extra column: μ = 0, Σ row/col = 0, sirf risky pe concentration penalty
+                n = len(risky)
+                mu_ext = np.append(mu, 0.0)
+                cov_ext = np.zeros((n + 1, n + 1))
+                cov_ext[:n, :n] = cov
+                penalty = np.append(np.full(n, profile['concentration_penalty']), 0.0)
+                lo = np.append(np.zeros(n), cash_lo)
+                hi = np.append(np.full(n, cap), cash_hi if len(stables) else 0.0)
+                solution = mean_variance(mu_ext, cov_ext, profile['risk_aversion'], lo, hi,
+                                         total=budget, concentration=penalty)
+                risky_w, cash_w = solution[:n], float(solution[n])
+
+            weights[idx[risky]] = risky_w
+            port_mu = float(risky_w @ mu)
+            port_vol = float(np.sqrt(max(risky_w @ cov @ risky_w, 0.0)))
+        else:
+            cash_w = budget
+
+        if len(stables):
+            # Sleeve stables mein current share ke hisaab se (sab 0 → barabar)
+            held = current[stables]
+            weights[stables] = cash_w * (held / held.sum() if held.sum() > 0 else np.full(len(stables), 1.0 / len(stables)))
+
+    target_pct = round_percentages(weights)
+    current_pct = np.round(current * 100, 1)
+    trades = []
+    for j, r in enumerate(universe):
+        diff_usd = (weights[j] - current[j]) * total
+        if abs(weights[j] - current[j]) * 100 < MIN_TRADE_PCT:
+            continue
+        trades.append({
+            'asset': r['symbol'],
+            'action': 'Buy' if diff_usd > 0 else 'Sell',
+            'amount_usd': round(float(abs(diff_usd)), 2),
+            'units': round(float(abs(diff_usd)) / r['price'], 8),
+        })
+    trades.sort(key=lambda t: -t['amount_usd'])
+
+    return {
+        'method': profile['method'],
+        'risk_appetite': str(risk_appetite).lower() if str(risk_appetite).lower() in RISK_PROFILES else 'balanced',
+        'allocations': [{'asset': s, 'percentage': p} for s, p in zip(symbols, target_pct) if p > 0],
+        'targets': [{'asset': s, 'current_pct': float(c), 'target_pct': t}
+                    for s, c, t in zip(symbols, current_pct, target_pct)],
+        'trades': trades,
+        'expected_return_annual': round(port_mu, 4),
+        'expected_volatility_annual': round(port_vol, 4),
+        'locked': [s for s, f in zip(symbols, free) if not f],
+    }
+
+
+def optimizer_prompt_block(plan, max_assets=25):
+    """LLM ke liye plan summary - woh sirf explain karega, numbers nahi badlega"""
+    if not plan:
+        return "No optimized allocation available."
+    lines = [f"Method: {plan['method']} ({plan['risk_appetite']}) | expected return "
+             f"{plan['expected_return_annual']:.0%}, volatility {plan['expected_volatility_annual']:.0%} (annualized)"]
+    targets = sorted(plan['targets'], key=lambda t: -max(t['current_pct'], t['target_pct']))[:max_assets]
+    lines += [f"- {t['asset']}: {t['current_pct']}% → {t['target_pct']}%" for t in targets]
+    lines += [f"Trade: {t['action']} ${t['amount_usd']:,.2f} of {t['asset']}" for t in plan['trades'][:15]]
+    if plan['locked']:
+        lines.append("Kept at current weight (not enough history): " + ", ".join(plan['locked']))
+    return "\n".join(lines)
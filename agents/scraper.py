@@ -19,10 +19,34 @@ WORKFLOW:
 ┌─────────────────────────────────────────────────────────────────────┐
 │ 1. scrape_competitor(url) call hota hai                             │
 │ 2. Homepage fetch hota hai                                          │
-│ 3. Important links dhundhe jaate hain (pricing, about, features)    │
+│ 3. Important links dhundhe jaate hain (sitemap + homepage, scored)  │
 │ 4. Un pages ka content bhi fetch hota hai                           │
-│ 5. Sab content combine karke return hota hai                        │
+│ 5. Pages ke beech repeated lines (header/footer) dedupe hoti hain    │
+│ 6. Sab content combine karke return hota hai                        │
 └─────────────────────────────────────────────────────────────────────┘
+
+HTTP CACHE (ETag / Last-Modified):
+- Har fetched page ka compressed HTML + extracted text disk pe store hota hai
+  (settings.SCRAPER_CACHE_DIR, default: MEDIA_ROOT/cache/scraper)
+- Agli baar conditional GET jaata hai; 304 aaya to stored extraction reuse
+
+EXTRACTION MODES (settings.SCRAPER_EXTRACTION_MODE):
+- 'main' (default): readability-style scoring - sirf dominant content region
+  (text density high, link density low). Chhota result mile to 'full' fallback
+- 'full': purana behaviour - script/style/nav/footer ke alawa sab visible text
+- Benchmark: python manage.py bench_extraction [corpus_dir]
+
+HEDGED FETCH (direct vs Jina Reader):
+- Direct fetch ke response headers adaptive deadline tak na aayein to Jina
+  Reader parallel mein start hota hai - jo pehle successfully aaye woh jeetta hai
+- Deadline per domain seekhi jaati hai (header latency ka EWMA x3, 1.5s-8s clamp)
+- Jo domain direct block karta hai (ya baar baar race haarta hai), uska route
+  yaad rehta hai - agli baar seedha Jina Reader use hota hai
+
+RESULT CACHE (scrape_site_cached / scrape_competitor_cached):
+- Poora assembled multi-page result normalized URL pe cache hota hai
+- Scraper aur CompeteScan dono same cache share karte hain
+- TTL ke baad stale-while-revalidate: purana result + background refresh
 ================================================================================
 """
 
@@ -30,9 +54,18 @@ WORKFLOW:
 # IMPORTS - Required libraries
 # ============================================================================
 
+import re                # Whitespace normalize (dedup fingerprints)
+import time              # Cache entries ke timestamps / route TTL ke liye
+import hashlib           # Line fingerprints (cross-page dedup)
+import threading         # Stale results ka background refresh
+import concurrent.futures  # Hedged fetch - direct aur Jina parallel race
 import requests          # HTTP requests bhejne ke liye (website fetch)
-from bs4 import BeautifulSoup  # HTML parse karne ke liye (content extraction)
-from urllib.parse import urljoin, urlparse  # URL manipulation ke liye
+from bs4 import BeautifulSoup, CData, NavigableString  # HTML parse karne ke liye (content extraction)
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, parse_qsl, urlencode  # URL manipulation ke liye
+from django.conf import settings  # Cache directory / size limits
+from .disk_cache import DiskCache  # On-disk HTTP cache
+from .discovery import discover_pages  # robots.txt + sitemap based page discovery
+from .ipv4 import http  # force_ipv4 → IPv4 session (global socket patch nahi)
 
 
 # ============================================================================
@@ -61,51 +94,511 @@ HEADERS = {
 # HELPER FUNCTIONS
 # ============================================================================
 
-def clean_text(soup):
+def strip_boilerplate(soup):
     for script in soup(["script", "style", "nav", "footer", "iframe", "noscript"]):
         script.decompose()
-    text = soup.get_text(separator=' ', strip=True)
+    return soup
+
+
+# Sirf in elements pe nayi line - inline tags (b, span, a...) ka text same line pe
+BLOCK_LEVEL_TAGS = frozenset([
+    'address', 'article', 'aside', 'blockquote', 'body', 'br', 'caption', 'dd', 'details', 'dialog',
+    'div', 'dl', 'dt', 'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4',
+    'h5', 'h6', 'header', 'hr', 'html', 'li', 'main', 'nav', 'ol', 'option', 'p', 'pre', 'section',
+    'summary', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul',
+])
+_LINE_BREAK = object()
+
+
+def block_text(root):
+    """
+    Har block element (p, li, td, div...) ek line; uske andar ka inline text space se join.
+    `Get <b>50%</b> off` → "Get 50% off" (get_text(separator='\\n') teen lines bana deta tha).
+    Iterative walk - deep DOMs pe recursion limit nahi.
+    """
+    out = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node is _LINE_BREAK:
+            out.append('\n')
+        elif isinstance(node, NavigableString):
+            if type(node) in (NavigableString, CData):  # Comments / doctype skip (get_text jaisa)
+                out.append(str(node))
+        else:
+            if node.name in BLOCK_LEVEL_TAGS:
+                out.append('\n')
+                stack.append(_LINE_BREAK)
+            stack.extend(reversed(node.contents))
+    lines = (' '.join(line.split()) for line in ''.join(out).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def clean_text(soup):
+    strip_boilerplate(soup)
+    text = block_text(soup)  # Har block apni line pe (dedup ke liye zaroori)
+    return _normalize_lines(text)[:15000]
+
+
+# ============================================================================
+# MAIN-CONTENT EXTRACTION (readability-style) - sidebars / link lists / legal hatao
+# ============================================================================
+# Text blocks (p, li, td, headings...) ko text length aur link density se score
+# karte hain; score parent (full) aur grandparent (half) ko milta hai. Sabse
+# bada container + uske strong siblings (pricing cards jaise) = main content.
+
+MAIN_BLOCK_TAGS = ['p', 'li', 'td', 'th', 'dd', 'dt', 'blockquote', 'pre',
+                   'h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+MAIN_POSITIVE_RE = re.compile(r'content|main|article|body|pricing|plan|feature|product|post|entry|hero', re.I)
+MAIN_NEGATIVE_RE = re.compile(r'sidebar|side-bar|related|comment|share|social|footer|menu|nav|banner|'
+                              r'cookie|consent|legal|breadcrumb|widget|promo|newsletter|subscribe|popup|modal', re.I)
+MAIN_CONTENT_MIN_CHARS = 300  # Isse chhota main content mila to full-page fallback
+
+
+def _node_weight(el):
+    hint = ' '.join(el.get('class') or []) + ' ' + (el.get('id') or '')
+    weight = 0
+    if MAIN_NEGATIVE_RE.search(hint):
+        weight -= 25
+    if MAIN_POSITIVE_RE.search(hint):
+        weight += 25
+    if el.name in ('main', 'article'):
+        weight += 30
+    elif el.name in ('aside', 'header', 'form'):
+        weight -= 25
+    return weight
+
+
+def _link_density(el, text_len):
+    if not text_len:
+        return 1.0
+    link_len = sum(len(a.get_text(' ', strip=True)) for a in el.find_all('a'))
+    return min(link_len / text_len, 1.0)
+
+
+def _normalize_lines(text):
     lines = (line.strip() for line in text.splitlines())
     chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-    text = '\n'.join(chunk for chunk in chunks if chunk)
-    return text[:15000]
+    return '\n'.join(chunk for chunk in chunks if chunk)
+
+
+def extract_main_content(soup):
+    """
+    Soup se sirf dominant content region ka text nikalta hai (soup modify nahi hota,
+    taaki link discovery ke liye poora DOM bacha rahe). Kuch na mile to "" return.
+    """
+    candidates = {}  # id(element) → [element, score]
+
+    for block in soup.find_all(MAIN_BLOCK_TAGS):
+        text = block.get_text(' ', strip=True)
+        if len(text) < 20:
+            continue
+        density = _link_density(block, len(text))
+        block_score = (1 + text.count(',') + min(len(text) // 100, 3)) * (1 - density)
+
+        parent = block.parent
+        grandparent = parent.parent if parent is not None else None
+        for ancestor, factor in ((parent, 1.0), (grandparent, 0.5)):
+            if ancestor is None or ancestor.name in ('[document]', 'html', 'body'):
+                continue
+            entry = candidates.get(id(ancestor))
+            if entry is None:
+                entry = candidates[id(ancestor)] = [ancestor, _node_weight(ancestor)]
+            entry[1] += block_score * factor
+
+    if not candidates:
+        return ""
+
+    # Top candidates ka score unki apni link density se scale karo
+    ranked = sorted(candidates.values(), key=lambda item: -item[1])[:10]
+    best, best_score = None, 0.0
+    for el, score in ranked:
+        text_len = len(el.get_text(' ', strip=True))
+        adjusted = score * (1 - _link_density(el, text_len))
+        if adjusted > best_score:
+            best, best_score = el, adjusted
+    if best is None:
+        return ""
+
+    # Strong siblings bhi include karo (multi-column layouts, pricing cards)
+    threshold = max(10.0, best_score * 0.2)
+    chosen = []
+    parent = best.parent
+    siblings = parent.find_all(recursive=False) if parent is not None else [best]
+    for sibling in siblings:
+        if sibling is best:
+            chosen.append(sibling)
+            continue
+        entry = candidates.get(id(sibling))
+        if entry and entry[1] >= threshold:
+            chosen.append(sibling)
+
+    text = '\n'.join(block_text(el) for el in chosen)
+    return _normalize_lines(text)[:15000]
 
 
-def get_page_content(url):
+def extract_text(soup, mode=None):
+    """
+    Extraction mode dispatch:
+    - 'main' → extract_main_content(), chhota result ho to clean_text() fallback
+    - 'full' → clean_text() (purana behaviour - sab visible text)
+    """
+    mode = mode or getattr(settings, 'SCRAPER_EXTRACTION_MODE', 'main')
+    if mode == 'main':
+        strip_boilerplate(soup)
+        main = extract_main_content(soup)
+        if len(main) >= MAIN_CONTENT_MIN_CHARS:
+            return main
+    return clean_text(soup)
+
+
+# ============================================================================
+# HTTP CACHE - Conditional GET (ETag / Last-Modified)
+# ============================================================================
+
+_http_cache = None
+
+
+def get_http_cache():
+    """Process-wide DiskCache instance (lazily banta hai, settings se config)"""
+    global _http_cache
+    if _http_cache is None:
+        cache_dir = getattr(settings, 'SCRAPER_CACHE_DIR', None) or (settings.MEDIA_ROOT / 'cache' / 'scraper')
+        max_mb = getattr(settings, 'SCRAPER_CACHE_MAX_MB', 200)
+        _http_cache = DiskCache(cache_dir, max_bytes=max_mb * 1024 * 1024)
+    return _http_cache
+
+
+def _conditional_headers(entry):
+    headers = dict(HEADERS)
+    headers.pop('Cache-Control', None)  # max-age=0 validators ke saath redundant hai
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+def _store_page(cache, url, resp, via, text, html=None, mode=None):
     try:
-        print(f"    📥 Fetching: {url[:50]}...")
-        # Method 1: Direct Request
-        resp = requests.get(url, headers=HEADERS, timeout=10)
-        
+        cache.set(f"page:{url}", {
+            'url': url,
+            'via': via,  # 'direct' ya 'jina'
+            'mode': mode,  # Extraction mode jisse 'text' bana (direct pages)
+            'etag': resp.headers.get('ETag'),
+            'last_modified': resp.headers.get('Last-Modified'),
+            'text': text,
+            'html': html,
+            'stored_at': time.time(),
+        })
+    except OSError as e:
+        print(f"    ⚠️ HTTP cache write failed: {str(e)[:50]}")
+
+
+# ============================================================================
+# ROUTE LEARNING - Per domain stats: kaunsa path kaam karta hai, kitna fast
+# ============================================================================
+
+HEDGE_DEFAULT_S = 3.0        # Naye domain ke liye header deadline
+HEDGE_MIN_S = 1.5
+HEDGE_MAX_S = 8.0
+HEDGE_LATENCY_FACTOR = 3     # Deadline = EWMA header latency x factor
+ROUTE_EWMA_ALPHA = 0.3
+HEDGE_LOSSES_TO_SWITCH = 2   # Itni baar lagataar Jina jeete to domain Jina-first
+
+
+def _load_route(cache, url):
+    return cache.get(f"route:{urlparse(url).netloc}") or {}
+
+
+def _prefers_jina(route):
+    return route.get('via') == 'jina' and time.time() < route.get('via_until', 0)
+
+
+def _hedge_deadline(route):
+    """Domain ki header latency se deadline (pehli baar default)"""
+    ewma = route.get('header_ewma')
+    if not ewma:
+        return HEDGE_DEFAULT_S
+    return min(HEDGE_MAX_S, max(HEDGE_MIN_S, ewma * HEDGE_LATENCY_FACTOR))
+
+
+def _record_route(cache, url, route, direct=None, jina_ok=None, header_s=None, hedge_lost=False):
+    """
+    Fetch outcome se domain stats update karo:
+    - header_ewma: direct response headers ka latency (race haara to deadline as lower bound)
+    - direct blocked + Jina ok, ya HEDGE_LOSSES_TO_SWITCH baar race haara → Jina-first (TTL)
+    - Direct success → wapas direct-first
+    """
+    now = time.time()
+    direct_ok = direct is not None and bool(direct['text'])
+    if direct is not None:
+        counter = 'direct_ok' if direct_ok else 'direct_fail'
+        route[counter] = route.get(counter, 0) + 1
+        if direct['header_s'] is not None:
+            header_s = direct['header_s']
+    if header_s is not None:
+        prev = route.get('header_ewma')
+        ewma = header_s if prev is None else (1 - ROUTE_EWMA_ALPHA) * prev + ROUTE_EWMA_ALPHA * header_s
+        route['header_ewma'] = round(ewma, 3)
+    if jina_ok is not None:
+        counter = 'jina_ok' if jina_ok else 'jina_fail'
+        route[counter] = route.get(counter, 0) + 1
+
+    if hedge_lost:
+        route['hedge_lost'] = route.get('hedge_lost', 0) + 1
+    elif direct_ok:
+        route['hedge_lost'] = 0
+
+    blocked = direct is not None and not direct_ok
+    if jina_ok and (blocked or route.get('hedge_lost', 0) >= HEDGE_LOSSES_TO_SWITCH):
+        route['via'] = 'jina'
+        route['via_until'] = now + getattr(settings, 'SCRAPER_ROUTE_TTL', 24 * 3600)
+    elif direct_ok or (jina_ok is False and route.get('via') == 'jina'):
+        route['via'] = 'direct'
+        route.pop('via_until', None)
+    route['updated_at'] = now
+
+    try:
+        cache.set(f"route:{urlparse(url).netloc}", route)
+    except OSError:
+        pass
+
+
+# ============================================================================
+# FETCH PATHS - Direct (conditional GET) aur Jina Reader
+# ============================================================================
+
+def _fetch_direct(url, cache, entry, headers_ready=None, force_ipv4=False):
+    """
+    Direct conditional GET. stream=True - headers aate hi headers_ready set hota hai
+    (hedging isi signal pe decide karta hai), body baad mein padhi jaati hai.
+    RETURNS: {'text', 'soup', 'status', 'header_s'} - fail pe text ''
+    """
+    result = {'text': '', 'soup': None, 'status': None, 'header_s': None}
+    direct_entry = entry if entry and entry.get('via') == 'direct' else None
+    started = time.monotonic()
+    try:
+        resp = http(force_ipv4).get(url, headers=_conditional_headers(direct_entry), timeout=10, stream=True)
+    except requests.RequestException as e:
+        print(f"    ⚠️ Direct fetch error: {str(e)[:50]}")
+        return result
+    finally:
+        if headers_ready is not None:
+            headers_ready.set()
+    result['header_s'] = time.monotonic() - started
+    result['status'] = resp.status_code
+
+    try:
+        mode = getattr(settings, 'SCRAPER_EXTRACTION_MODE', 'main')
+        if resp.status_code == 304 and direct_entry:
+            soup = None
+            if direct_entry.get('html'):
+                soup = BeautifulSoup(direct_entry['html'], 'html.parser')
+            if direct_entry.get('mode') == mode or soup is None:
+                print(f"    ♻️ 304 Not Modified - reusing cached extraction ({len(direct_entry['text'])} chars)")
+                result.update(text=direct_entry['text'], soup=strip_boilerplate(soup) if soup else None)
+                return result
+            # Extraction mode badal gaya - stored HTML se dobara extract (network nahi)
+            clean = extract_text(soup, mode)
+            print(f"    ♻️ 304 Not Modified - re-extracted cached HTML ({len(clean)} chars)")
+            direct_entry.update(text=clean, mode=mode)
+            try:
+                cache.set(f"page:{url}", direct_entry)
+            except OSError:
+                pass
+            result.update(text=clean, soup=soup)
+            return result
+
         if resp.status_code == 200:
+            html = resp.text
             soup = BeautifulSoup(resp.content, 'html.parser')
-            clean = clean_text(soup)
-            print(f"    ✅ Scraped {len(clean)} characters")
-            return clean, soup
-        
-        print(f"    ⚠️ Direct fetch failed (HTTP {resp.status_code}). Trying Jina Reader...")
-        
-        # Method 2: Jina Reader Fallback (For 403s/JS sites)
-        jina_url = f"https://r.jina.ai/{url}"
-        resp = requests.get(jina_url, headers=HEADERS, timeout=15)
-        
-        if resp.status_code == 200:
-            print(f"    ✅ Scraped via Jina Reader ({len(resp.text)} chars)")
-            return resp.text, None  # Jina returns plain MD, no Soup
-            
-        print(f"    ❌ Jina Reader failed: HTTP {resp.status_code}")
+            clean = extract_text(soup, mode)
+            print(f"    ✅ Scraped {len(clean)} characters ({mode} extraction)")
+            _store_page(cache, url, resp, 'direct', clean, html, mode)
+            result.update(text=clean, soup=soup)
+    except Exception as e:
+        print(f"    ⚠️ Direct fetch error: {str(e)[:50]}")
+    finally:
+        resp.close()
+    return result
+
+
+def _fetch_via_jina(url, cache, entry, force_ipv4=False):
+    jina_url = f"https://r.jina.ai/{url}"
+    cached = entry if entry and entry.get('via') == 'jina' else None
+    try:
+        resp = http(force_ipv4).get(jina_url, headers=_conditional_headers(cached), timeout=15)
+    except requests.RequestException as e:
+        print(f"    ❌ Jina Reader error: {str(e)[:50]}")
+        return ""
+
+    if resp.status_code == 304 and cached:
+        print(f"    ♻️ Jina Reader: 304 Not Modified (cached {len(cached['text'])} chars)")
+        return cached['text']
+
+    if resp.status_code == 200:
+        print(f"    ✅ Scraped via Jina Reader ({len(resp.text)} chars)")
+        _store_page(cache, url, resp, 'jina', resp.text)
+        return resp.text
+
+    print(f"    ❌ Jina Reader failed: HTTP {resp.status_code}")
+    return ""
+
+
+def _hedged_fetch(url, cache, entry, route, force_ipv4=False):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  HEDGED FETCH - direct pehle, deadline ke baad Jina bhi, pehla success    ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    1. Direct fetch background thread mein start
+    2. Deadline tak headers aa gaye → direct ka result; fail hua to Jina (sequential)
+    3. Deadline miss → Jina parallel start, jo pehle successful ho woh return
+    Haara hua request background mein khatam hota hai (apne timeout tak), wait nahi karte.
+    """
+    deadline = _hedge_deadline(route)
+    headers_ready = threading.Event()
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix='scrape-hedge')
+    try:
+        direct = pool.submit(_fetch_direct, url, cache, entry, headers_ready, force_ipv4)
+
+        if headers_ready.wait(deadline):
+            result = direct.result()
+            if result['text']:
+                _record_route(cache, url, route, direct=result)
+                return result['text'], result['soup']
+            print(f"    ⚠️ Direct fetch failed (HTTP {result['status']}). Trying Jina Reader...")
+            text = _fetch_via_jina(url, cache, entry, force_ipv4)
+            # Dono outcomes ek saath - blocked + Jina ok hi domain ko Jina-first banata hai
+            _record_route(cache, url, route, direct=result, jina_ok=bool(text))
+            return text, None  # Jina returns plain MD, no Soup
+
+        print(f"    ⏱️ No response headers after {deadline:.1f}s - starting Jina Reader in parallel...")
+        jina = pool.submit(_fetch_via_jina, url, cache, entry, force_ipv4)
+        pending = {direct, jina}
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            if direct in done and direct.result()['text']:
+                print("    🏁 Direct fetch won the race")
+                _record_route(cache, url, route, direct=direct.result())
+                return direct.result()['text'], direct.result()['soup']
+            if jina in done and jina.result():
+                print("    🏁 Jina Reader won the race")
+                if direct.done():  # Direct pehle hi fail ho chuka (blocked)
+                    _record_route(cache, url, route, direct=direct.result(), jina_ok=True)
+                else:
+                    _record_route(cache, url, route, jina_ok=True, header_s=deadline, hedge_lost=True)
+                return jina.result(), None
+
+        _record_route(cache, url, route, direct=direct.result(), jina_ok=False)
         return "", None
-        
+    finally:
+        pool.shutdown(wait=False)
+
+
+def get_page_content(url, force_ipv4=False):
+    """
+    Ek page ka (text, soup). force_ipv4 = sirf is fetch ke connections IPv4
+    (long-running batch streams ke liye - views ka global socket patch nahi).
+    """
+    try:
+        print(f"    📥 Fetching: {url[:50]}...")
+        cache = get_http_cache()
+        entry = cache.get(f"page:{url}")
+        route = _load_route(cache, url)
+
+        # Known-blocked domain: seedha Jina Reader (direct fetch ka wait bachao)
+        if _prefers_jina(route):
+            print("    ↪ Domain known to block direct fetch. Using Jina Reader...")
+            text = _fetch_via_jina(url, cache, entry, force_ipv4)
+            if text:
+                _record_route(cache, url, route, jina_ok=True)
+                return text, None
+            result = _fetch_direct(url, cache, entry, force_ipv4=force_ipv4)
+            _record_route(cache, url, route, direct=result, jina_ok=False)
+            return result['text'], result['soup']
+
+        return _hedged_fetch(url, cache, entry, route, force_ipv4)
+
     except Exception as e:
         print(f"    ❌ Scrape Error: {str(e)[:50]}")
         return "", None
 
 
+# ============================================================================
+# CROSS-PAGE BOILERPLATE DEDUP - Header/menu/cookie banner/footer ek hi baar
+# ============================================================================
+
+_WS_RE = re.compile(r'\s+')
+
+
+def _line_fingerprint(line):
+    normalized = _WS_RE.sub(' ', line).strip().lower()
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest() if normalized else None
+
+
+def dedupe_pages(pages):
+    """
+    Ek scrape ke sab pages mein repeated lines hatata hai (first occurrence rehti hai).
+    Same page ke andar repeats nahi hatate - pricing tables mein "✓" / "Unlimited"
+    jaise cells genuinely repeat hote hain. Sirf pichle pages mein dikh chuki lines drop.
+
+    RETURNS: (deduped_pages, stats)
+    """
+    seen = set()
+    deduped = []
+    chars_before = chars_after = lines_removed = 0
+
+    for page in pages:
+        page_seen = set()
+        kept = []
+        for line in page['text'].splitlines():
+            fp = _line_fingerprint(line)
+            if fp is not None and fp in seen and fp not in page_seen:
+                lines_removed += 1
+                continue
+            if fp is not None:
+                page_seen.add(fp)
+            kept.append(line)
+        seen |= page_seen
+        text = '\n'.join(kept)
+        chars_before += len(page['text'])
+        chars_after += len(text)
+        deduped.append(dict(page, text=text))
+
+    removed = chars_before - chars_after
+    stats = {
+        'lines_removed': lines_removed,
+        'chars_before': chars_before,
+        'chars_after': chars_after,
+        'chars_removed': removed,
+        'percent_removed': round(100.0 * removed / chars_before, 1) if chars_before else 0.0,
+    }
+    return deduped, stats
+
+
+def build_context(pages, limit=50000):
+    """Pages list ({section, url, text}) ko LLM-ready combined context mein jodta hai"""
+    combined_context = ""
+    for page in pages:
+        combined_context += f"--- {page['section']} ({page['url']}) ---\n{page['text']}\n\n"
+    return combined_context[:limit]
+
+
 # ============================================================================
 # MAIN SCRAPER FUNCTION
 # ============================================================================
 
-def scrape_competitor(base_url):
+def scrape_site(base_url, max_pages=4, force_ipv4=False):
+    """
+    Homepage + key pages scrape karta hai aur structured result deta hai:
+    { 'url', 'context', 'pages': [{'section', 'url', 'text'}, ...], 'dedup': {...} }
+    Fail hone pe context "" aur pages [] hote hain.
+    max_pages = homepage ke alawa kitne sub-pages fetch karein (batch crawl budget).
+    force_ipv4 = saare fetches IPv4 clients se (get_page_content).
+    """
     if not base_url.startswith('http'):
         base_url = 'https://' + base_url
 
@@ -114,54 +607,147 @@ def scrape_competitor(base_url):
     
     # Homepage scrape
     print("📄 Fetching Homepage...")
-    home_text, home_soup = get_page_content(base_url)
+    home_text, home_soup = get_page_content(base_url, force_ipv4)
     
     if not home_text:
         print("❌ Failed to fetch content via all methods!")
-        return "Failed to fetch website content."
+        return {'url': base_url, 'context': "", 'pages': [], 'dedup': None}
 
-    combined_context = f"--- HOMEPAGE ({base_url}) ---\n{home_text}\n\n"
+    pages = [{'section': 'HOMEPAGE', 'url': base_url, 'text': home_text}]
 
-    # Link discovery (only if Direct fetch worked and Soup is available)
-    if home_soup:
-        print("\n🔗 Discovering important pages...")
-        visited = set([base_url, base_url + '/'])
-        keywords = ['pricing', 'plans', 'features', 'product', 'about', 'contact']
+    # Page discovery: robots.txt + sitemap first, homepage links (HTML ya Jina markdown) fallback
+    print("\n🔗 Discovering important pages...")
+    try:
+        links_to_visit = discover_pages(base_url, home_soup=home_soup, home_text=home_text, limit=max_pages,
+                                        force_ipv4=force_ipv4, cache=get_http_cache()) if max_pages > 0 else []
+    except Exception as e:
+        print(f"    ⚠️ Discovery failed: {str(e)[:50]}")
         links_to_visit = []
 
-        for a in home_soup.find_all('a', href=True):
-            href = a['href']
-            try:
-                full_url = urljoin(base_url, href)
-                if urlparse(full_url).netloc != urlparse(base_url).netloc:
-                    continue
-                if any(k in full_url.lower() for k in keywords):
-                    if full_url not in visited and full_url not in links_to_visit:
-                        links_to_visit.append(full_url)
-                        visited.add(full_url)
-                        print(f"    Found: {full_url}")
-            except:
-                continue
-        
-        links_to_visit = links_to_visit[:4]
-        print(f"\n📄 Fetching {len(links_to_visit)} additional pages...")
-        
-        for link in links_to_visit:
-            text, _ = get_page_content(link)
-            if text:
-                section = "PAGE"
-                for k in keywords:
-                    if k in link.lower(): 
-                        section = k.upper()
-                        break
-                combined_context += f"--- {section} ({link}) ---\n{text}\n\n"
-    else:
-        print("    ℹ Soup unavailable (Jina Scrape). Skipping sub-page discovery.")
-
-    result = combined_context[:50000]
+    print(f"\n📄 Fetching {len(links_to_visit)} additional pages...")
+    for section, link in links_to_visit:
+        print(f"    Found: [{section}] {link}")
+        text, _ = get_page_content(link, force_ipv4)
+        if text:
+            pages.append({'section': section, 'url': link, 'text': text})
+
+    pages, dedup = dedupe_pages(pages)
+    print(f"\n🧹 Dedup: removed {dedup['lines_removed']} repeated lines "
+          f"({dedup['chars_removed']} chars, {dedup['percent_removed']}%)")
+
+    result = build_context(pages)
     
     print("=" * 60)
     print(f"✅ [SCRAPER] Complete! Total: {len(result)} characters")
     print("=" * 60 + "\n")
     
-    return result
+    return {'url': base_url, 'context': result, 'pages': pages, 'dedup': dedup}
+
+
+def scrape_competitor(base_url):
+    site = scrape_site(base_url)
+    return site['context'] or "Failed to fetch website content."
+
+
+# ============================================================================
+# SHARED SCRAPE-RESULT CACHE - Scraper + CompeteScan dono reuse karte hain
+# ============================================================================
+# Fresh window (SCRAPE_RESULT_TTL) ke andar: cached result turant return
+# Stale window (SCRAPE_RESULT_STALE_TTL) ke andar: stale result return + background refresh
+# Uske baad: synchronous re-scrape
+# Key = normalized URL + max_pages - refresh usi crawl budget se hota hai jisse entry bani
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def normalize_url(url):
+    """Cache key ke liye URL normalize: scheme/host lowercase, default port, fragment, utm_* hatao"""
+    url = url.strip()
+    if not url.startswith('http'):
+        url = 'https://' + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    path = parts.path.rstrip('/') or ''
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_')
+    ))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def _scrape_and_store(key, url, max_pages=4, force_ipv4=False):
+    site = scrape_site(url, max_pages=max_pages, force_ipv4=force_ipv4)
+    if not site['context']:
+        return site, None
+    entry = {'site': site, 'scraped_at': time.time(), 'max_pages': max_pages}
+    try:
+        get_http_cache().set(key, entry)
+    except OSError as e:
+        print(f"    ⚠️ Result cache write failed: {str(e)[:50]}")
+    return site, entry
+
+
+def _background_refresh(key, url, max_pages=4, force_ipv4=False):
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def run():
+        try:
+            print(f"🔄 [SCRAPER] Revalidating stale result in background: {url}")
+            _scrape_and_store(key, url, max_pages, force_ipv4)  # Wahi crawl budget jisse entry bani thi
+        except Exception as e:
+            print(f"    ❌ Background refresh error: {str(e)[:50]}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def scrape_site_cached(url, max_pages=4, refresh=False, force_ipv4=False):
+    """
+    scrape_site() ka cached version. Returns (site, meta):
+    meta = { 'status': 'fresh' | 'cached' | 'stale', 'age_seconds': int, 'scraped_at': epoch, 'dedup': {...} }
+    - fresh  → abhi live scrape hua
+    - cached → TTL ke andar ka result reuse hua
+    - stale  → purana result diya, background mein refresh chal raha hai
+    refresh=True → stored result skip, hamesha live scrape (CompeteScan "changes" mode -
+    warna TTL ke andar snapshot diff hamesha khaali aata). Pages ka HTTP cache
+    (ETag / 304) phir bhi kaam karta hai; naya result cache mein store hota hai.
+    force_ipv4 → scrape (aur stale refresh) IPv4 clients se, global patch ke bina.
+    """
+    normalized = normalize_url(url)
+    # max_pages key ka hissa - batch (kam pages) aur single scan (4 pages) ek dusre ki entry overwrite na karein
+    key = f"result:{normalized}:p{max_pages}"
+    ttl = getattr(settings, 'SCRAPE_RESULT_TTL', 3600)
+    stale_ttl = getattr(settings, 'SCRAPE_RESULT_STALE_TTL', 86400)
+
+    entry = None if refresh else get_http_cache().get(key)
+    if entry:
+        site = entry['site']
+        age = time.time() - entry['scraped_at']
+        meta = {'age_seconds': int(age), 'scraped_at': entry['scraped_at'], 'dedup': site.get('dedup')}
+        if age < ttl:
+            print(f"♻️ [SCRAPER] Cache hit for {normalized} (age {int(age)}s)")
+            return site, dict(meta, status='cached')
+        if age < ttl + stale_ttl:
+            print(f"♻️ [SCRAPER] Serving stale result for {normalized} (age {int(age)}s)")
+            _background_refresh(key, normalized, max_pages, force_ipv4)
+            return site, dict(meta, status='stale')
+
+    site, entry = _scrape_and_store(key, normalized, max_pages, force_ipv4)
+    scraped_at = entry['scraped_at'] if entry else time.time()
+    return site, {'status': 'fresh', 'age_seconds': 0, 'scraped_at': scraped_at, 'dedup': site.get('dedup')}
+
+
+def scrape_competitor_cached(url):
+    """scrape_competitor() jaisa, lekin shared cache ke saath. Returns (context, meta)"""
+    site, meta = scrape_site_cached(url)
+    return site['context'], meta
@@ -0,0 +1,170 @@
+"""
+================================================================================
+                WEB3.AI - COMPACT SEGMENT STORE (utterances / transcript segments)
+================================================================================
+YEH FILE TRANSCRIPT SEGMENTS KO COLUMNAR BINARY FORMAT MEIN STORE KARTI HAI
+
+FUNCTIONALITY:
+- Per-segment dicts ki jagah parallel arrays: start (float64), duration (float64),
+  speaker id (int32), text offsets (uint32) + ek single UTF-8 text buffer
+- Ek bytes blob mein serialize hota hai (TranscriptSegments.blob side table)
+- Blob ko zero-copy memoryviews se padhta hai - slice(t0, t1) sirf requested
+  range ka text decode karta hai (bisect se start index milta hai)
+
+USED BY:
+- agents/views.py → audio agents (utterances), YT Docs (segments),
+  /api/tx/<id>/segments/ endpoint
+
+LOCATION: agents/segment_store.py
+
+BLOB LAYOUT (little-endian):
+┌─────────────────────────────────────────────────────────────────────┐
+│ header: b'SEG1' | count u32 | speakers_len u32 | text_len u32 |      │
+│         max_duration f64 | total_duration f64                       │
+│ speakers JSON (utf-8)                                               │
+│ starts    f64 x count                                               │
+│ durations f64 x count                                               │
+│ speakers  i32 x count   (-1 = unknown)                              │
+│ offsets   u32 x (count + 1)  ← text[offsets[i]:offsets[i+1]]         │
+│ text      utf-8 bytes                                               │
+└─────────────────────────────────────────────────────────────────────┘
+================================================================================
+"""
+
+import json
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+MAGIC = b'SEG1'
+HEADER = struct.Struct('<4sIIIdd')
+
+
+def _le_bytes(arr):
+    """Array ko little-endian bytes mein (big-endian machines pe byteswap)"""
+    if sys.byteorder == 'big':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+class SegmentStore:
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  COLUMNAR SEGMENT STORE - build() se bytes, SegmentStore(blob) se read     ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    USAGE:
+    ```python
+    blob = SegmentStore.build(utterances)          # list of dicts → bytes
+    store = SegmentStore(blob)                     # O(1) - sirf header parse
+    store.slice(60, 120)                           # 1:00-2:00 ke segments (dicts)
+    store.slice_index(0, 50)                       # pehle 50 segments
+    ```
+
+    Input dicts mein 'start' + ('duration' ya 'end'), 'speaker' / 'speaker_id',
+    'text' keys ho sakti hain. Times na hon to 0 store hota hai.
+    """
+
+    def __init__(self, blob):
+        view = memoryview(blob)
+        magic, count, speakers_len, text_len, max_duration, total_duration = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a segment store blob")
+
+        pos = HEADER.size
+        self.speakers = json.loads(bytes(view[pos:pos + speakers_len]).decode('utf-8'))
+        pos += speakers_len
+        self.count = count
+        self.max_duration = max_duration
+        self.duration = total_duration
+
+        native = sys.byteorder == 'little'
+
+        def column(typecode, n):
+            nonlocal pos
+            size = array(typecode).itemsize * n
+            chunk = view[pos:pos + size]
+            pos += size
+            if native:
+                return chunk.cast(typecode)  # Zero-copy view
+            arr = array(typecode, bytes(chunk))
+            arr.byteswap()
+            return arr
+
+        self._starts = column('d', count)
+        self._durations = column('d', count)
+        self._speaker_ids = column('i', count)
+        self._offsets = column('I', count + 1)
+        self._text = view[pos:pos + text_len]
+
+    # ┌──────────────────────────────────────────────────────────────────────┐
+    # │ BUILD - segments list → bytes                                        │
+    # └──────────────────────────────────────────────────────────────────────┘
+    @staticmethod
+    def build(segments):
+        starts, durations, speaker_ids, offsets = array('d'), array('d'), array('i'), array('I', [0])
+        speakers, speaker_index = [], {}
+        text = bytearray()
+        total_duration = 0.0
+
+        # Time order zaroori hai (bisect); times na hon to original order rehta hai
+        ordered = sorted(segments, key=lambda seg: float(seg.get('start') or 0))
+        for seg in ordered:
+            start = float(seg.get('start') or 0)
+            if seg.get('duration') is not None:
+                duration = float(seg['duration'])
+            else:
+                duration = max(0.0, float(seg.get('end') or start) - start)
+            speaker = seg.get('speaker', seg.get('speaker_id'))
+            if speaker is None:
+                sid = -1
+            else:
+                speaker = str(speaker)
+                if speaker not in speaker_index:
+                    speaker_index[speaker] = len(speakers)
+                    speakers.append(speaker)
+                sid = speaker_index[speaker]
+
+            starts.append(start)
+            durations.append(duration)
+            total_duration = max(total_duration, start + duration)
+            speaker_ids.append(sid)
+            text.extend((seg.get('text') or '').encode('utf-8'))
+            offsets.append(len(text))
+
+        speakers_json = json.dumps(speakers).encode('utf-8')
+        header = HEADER.pack(MAGIC, len(starts), len(speakers_json), len(text),
+                             max(durations, default=0.0), total_duration)
+        return b''.join([
+            header, speakers_json,
+            _le_bytes(starts), _le_bytes(durations), _le_bytes(speaker_ids), _le_bytes(offsets),
+            bytes(text),
+        ])
+
+    # ┌──────────────────────────────────────────────────────────────────────┐
+    # │ READ - sirf requested range decode hoti hai                          │
+    # └──────────────────────────────────────────────────────────────────────┘
+    def __len__(self):
+        return self.count
+
+    def segment(self, i):
+        sid = self._speaker_ids[i]
+        return {
+            'start': self._starts[i],
+            'duration': self._durations[i],
+            'speaker': self.speakers[sid] if sid >= 0 else None,
+            'text': bytes(self._text[self._offsets[i]:self._offsets[i + 1]]).decode('utf-8'),
+        }
+
+    def slice_index(self, i0, i1):
+        i0, i1 = max(0, i0), min(self.count, i1)
+        return [self.segment(i) for i in range(i0, i1)]
+
+    def slice(self, t0, t1):
+        """[t0, t1) se overlap karne wale segments (time order mein)"""
+        lo = bisect_left(self._starts, t0 - self.max_duration)  # Isse pehle wale t0 tak khatam ho chuke
+        hi = bisect_left(self._starts, t1)
+        return [self.segment(i) for i in range(lo, hi)
+                if self._starts[i] >= t0 or self._starts[i] + self._durations[i] > t0]
@@ -0,0 +1,213 @@
+"""
+================================================================================
+                WEB3.AI - COMPETITOR SNAPSHOT STORE + SECTION DIFF
+================================================================================
+YEH FILE COMPETESCAN KE "WHAT CHANGED" MODE KO POWER KARTI HAI
+
+FUNCTIONALITY:
+- Har scan ke per-page extractions compressed form mein store (CompetitorSnapshot)
+- Snapshots domain + result schema pe keyed: CompeteScan page ('full') aur
+  x402 / batch ('compact') alag JSON shapes return karte hain - ek endpoint ko
+  doosre ka result kabhi nahi milta
+- Page text ko sections mein todta hai (heading-like lines pe boundary)
+- Pichle snapshot se section-level diff: added / removed / changed
+- Changed sections + pichla structured result → chhota Gemini prompt
+
+USED BY:
+- agents/views.py → run_competescan, run_competescan_x402 (mode="changes"),
+  run_competescan_batch_x402 (sirf save)
+
+LOCATION: agents/snapshots.py
+
+WORKFLOW:
+┌─────────────────────────────────────────────────────────────────────┐
+│ 1. latest_snapshot(url, schema) → pichla scan (pages + result)      │
+│ 2. diff_pages(prev_pages, cur_pages) → sirf badle hue sections      │
+│ 3. Koi change nahi → pichla result reuse (Gemini call hi nahi)      │
+│ 4. Change hai → changes_prompt() (diff + previous JSON) → Gemini    │
+│ 5. save_snapshot() → agli run ka baseline                           │
+└─────────────────────────────────────────────────────────────────────┘
+================================================================================
+"""
+
+import difflib
+import hashlib
+import json
+import re
+import zlib
+from urllib.parse import urlparse
+
+from .models import CompetitorSnapshot
+
+
+# ============================================================================
+# CONSTANTS
+# ============================================================================
+
+SECTION_MAX_CHARS = 1200     # Isse bada section ho to agli line pe naya section
+HEADING_MAX_CHARS = 60       # Chhoti, bina full-stop wali line = heading
+CHANGES_CONTEXT_LIMIT = 15000
+SNAPSHOTS_PER_DOMAIN = 10    # Purane snapshots prune ho jaate hain (har schema ke)
+SCHEMA_FULL = 'full'         # run_competescan ka detailed result
+SCHEMA_COMPACT = 'compact'   # analyze_competitor_context() (x402 + batch)
+_WS_RE = re.compile(r'\s+')
+
+
+# ============================================================================
+# STORAGE HELPERS
+# ============================================================================
+
+def domain_for(url):
+    if not url.startswith('http'):
+        url = 'https://' + url
+    return urlparse(url).netloc.lower().removeprefix('www.')
+
+
+def pack_pages(pages):
+    return zlib.compress(json.dumps(pages).encode('utf-8'), 6)
+
+
+def unpack_pages(blob):
+    return json.loads(zlib.decompress(bytes(blob)).decode('utf-8'))
+
+
+def latest_snapshot(url, schema):
+    """Domain + schema ka sabse naya snapshot (ya None)"""
+    return CompetitorSnapshot.objects.filter(domain=domain_for(url), schema=schema).first()
+
+
+def save_snapshot(url, pages, result, schema):
+    """Naya snapshot save karo; domain + schema ke sirf latest SNAPSHOTS_PER_DOMAIN rakhte hain"""
+    domain = domain_for(url)
+    snapshot = CompetitorSnapshot.objects.create(
+        domain=domain,
+        schema=schema,
+        url=url if url.startswith('http') else 'https://' + url,
+        pages_blob=pack_pages(pages),
+        result_data=json.dumps(result),
+    )
+    stale_ids = CompetitorSnapshot.objects.filter(
+        domain=domain, schema=schema).values_list('id', flat=True)[SNAPSHOTS_PER_DOMAIN:]
+    CompetitorSnapshot.objects.filter(id__in=list(stale_ids)).delete()
+    return snapshot
+
+
+# ============================================================================
+# SECTIONING + DIFF
+# ============================================================================
+
+def _is_heading(line):
+    return len(line) <= HEADING_MAX_CHARS and not line.rstrip().endswith(('.', ',', ':', ';'))
+
+
+def split_sections(text):
+    """Page text ko sections mein todta hai: heading-like line ya size limit pe boundary"""
+    sections, current, size = [], [], 0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if current and (size >= SECTION_MAX_CHARS or (_is_heading(line) and size >= 200)):
+            sections.append('\n'.join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        sections.append('\n'.join(current))
+    return sections
+
+
+def _section_key(section):
+    normalized = _WS_RE.sub(' ', section).strip().lower()
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _page_key(page):
+    # URL path (query/fragment ke bina) - same page across runs match ho
+    return urlparse(page['url']).path.rstrip('/') or '/'
+
+
+def diff_pages(previous_pages, current_pages):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  SECTION-LEVEL DIFF (pichla snapshot vs abhi ka scrape)                   ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+
+    RETURNS: {
+        'changes': [{'page', 'url', 'type': added|removed|changed, 'before', 'after'}],
+        'sections_total': int, 'sections_changed': int, 'has_changes': bool
+    }
+    """
+    previous = {_page_key(p): p for p in previous_pages}
+    current = {_page_key(p): p for p in current_pages}
+    changes = []
+    total = 0
+
+    for key, page in current.items():
+        new_sections = split_sections(page['text'])
+        total += len(new_sections)
+        old_page = previous.get(key)
+        if old_page is None:
+            changes.append({'page': page['section'], 'url': page['url'], 'type': 'added',
+                            'before': '', 'after': '\n\n'.join(new_sections)})
+            continue
+
+        old_sections = split_sections(old_page['text'])
+        matcher = difflib.SequenceMatcher(
+            a=[_section_key(s) for s in old_sections],
+            b=[_section_key(s) for s in new_sections],
+            autojunk=False,
+        )
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                continue
+            change_type = {'replace': 'changed', 'delete': 'removed', 'insert': 'added'}[tag]
+            changes.append({
+                'page': page['section'], 'url': page['url'], 'type': change_type,
+                'before': '\n\n'.join(old_sections[i1:i2]),
+                'after': '\n\n'.join(new_sections[j1:j2]),
+            })
+
+    for key, page in previous.items():
+        if key not in current:
+            changes.append({'page': page['section'], 'url': page['url'], 'type': 'removed',
+                            'before': page['text'], 'after': ''})
+
+    return {
+        'changes': changes,
+        'sections_total': total,
+        'sections_changed': len(changes),
+        'has_changes': bool(changes),
+    }
+
+
+def changes_context(diff, limit=CHANGES_CONTEXT_LIMIT):
+    """Diff ko compact prompt text mein convert karta hai"""
+    out = []
+    for change in diff['changes']:
+        block = f"--- [{change['type'].upper()}] {change['page']} ({change['url']}) ---\n"
+        if change['before']:
+            block += f"BEFORE:\n{change['before']}\n"
+        if change['after']:
+            block += f"AFTER:\n{change['after']}\n"
+        out.append(block)
+    return '\n'.join(out)[:limit]
+
+
+def changes_prompt(previous_result, diff):
+    """'What changed' mode ka Gemini prompt: sirf diff + pichla structured result"""
+    return f"""
+    You are a product strategist and competitive analyst tracking a competitor over time.
+    Below is your PREVIOUS structured analysis (JSON) and ONLY the website sections that
+    changed since then. Update the analysis to reflect the changes.
+
+    Return ONLY valid JSON using exactly the same schema as the previous analysis, plus
+    one extra key:
+    "what_changed": [{{"area": "pricing/positioning/product/...", "change": "...", "impact": "High/Med/Low"}}]
+
+    PREVIOUS ANALYSIS:
+    {json.dumps(previous_result)[:15000]}
+
+    CHANGED SECTIONS:
+    {changes_context(diff)}
+    """
@@ -1,3 +1,328 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+import numpy as np
+from bs4 import BeautifulSoup
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from .audio_helper import plan_chunks, stitch_chunks
+from .discovery import locale_language, score_url
+from .portfolio_import import MAX_LINE_CHARS, import_portfolio_file
+from .portfolio_optimizer import RISK_PROFILES, optimize_portfolio, project_capped_simplex, round_percentages
+from .scraper import block_text, clean_text, dedupe_pages, extract_main_content, extract_text
+from .segment_store import SegmentStore
+
+
+def _random_walks(seed, drifts, vols, days=90):
+    """Synthetic daily closes (T x N) - log-normal random walks"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(np.array(drifts) / 365, np.array(vols) / np.sqrt(365), (days - 1, len(drifts)))
+    return np.exp(np.vstack([np.zeros(len(drifts)), np.cumsum(returns, axis=0)]))
+
+
+class OptimizerRiskProfileTests(SimpleTestCase):
+    """Risk appetite badhne pe stable share kabhi nahi badhna chahiye, aur koi corner solution nahi"""
+
+    def setUp(self):
+        risky = _random_walks(7, [0.4, 0.2, 1.5], [0.6, 0.8, 1.1])
+        self.closes = np.column_stack([risky, np.ones(len(risky))])
+        self.rows = [
+            {'symbol': 'BTC', 'cg_id': 'bitcoin', 'price': 60000.0, 'value': 4000.0},
+            {'symbol': 'ETH', 'cg_id': 'ethereum', 'price': 3000.0, 'value': 3000.0},
+            {'symbol': 'SOL', 'cg_id': 'solana', 'price': 150.0, 'value': 1000.0},
+            {'symbol': 'USDC', 'cg_id': 'usd-coin', 'price': 1.0, 'value': 2000.0},
+        ]
+        self.ids = [r['cg_id'] for r in self.rows]
+
+    def _targets(self, rows, history):
+        plans = [optimize_portfolio(rows, profile, history=history) for profile in RISK_PROFILES]
+        return [{t['asset']: t['target_pct'] for t in plan['targets']} for plan in plans]
+
+    def assert_monotone_and_diversified(self, targets, stable):
+        stable_share = [t[stable] for t in targets]
+        self.assertEqual(stable_share, sorted(stable_share, reverse=True))
+        self.assertGreater(stable_share[0], stable_share[-1])
+        for t in targets:
+            self.assertAlmostEqual(sum(t.values()), 100.0, places=6)
+            self.assertGreaterEqual(sum(1 for asset, pct in t.items() if asset != stable and pct >= 1.0), 2)
+
+    def test_stable_share_falls_with_risk_appetite(self):
+        targets = self._targets(self.rows, (self.closes, self.ids))
+        self.assert_monotone_and_diversified(targets, 'USDC')
+        for t, profile in zip(targets, RISK_PROFILES.values()):
+            self.assertGreaterEqual(t['USDC'] + 0.05, profile['cash_floor'] * 100)
+
+    def test_cash_only_book(self):
+        rows = [{'symbol': 'USD', 'cg_id': None, 'price': 1.0, 'value': 1000.0}] + [
+            {**r, 'value': 0.0} for r in self.rows[:3]]
+        closes = np.column_stack([np.ones(len(self.closes)), self.closes[:, :3]])
+        targets = self._targets(rows, (closes, ['USD'] + self.ids[:3]))
+        self.assert_monotone_and_diversified(targets, 'USD')
+
+    def test_random_books_keep_ordering(self):
+        for seed in range(25):
+            rng = np.random.default_rng(seed)
+            n = int(rng.integers(2, 7))
+            risky = _random_walks(seed, rng.normal(0, 2, n), rng.uniform(0.3, 1.5, n))
+            closes = np.column_stack([risky, np.ones(len(risky))])
+            rows = [{'symbol': f'A{i}', 'cg_id': f'a{i}', 'price': 1.0, 'value': float(rng.uniform(1, 100))}
+                    for i in range(n)] + [{'symbol': 'USDT', 'cg_id': 'tether', 'price': 1.0, 'value': 10.0}]
+            with self.subTest(seed=seed):
+                targets = self._targets(rows, (closes, [r['cg_id'] for r in rows]))
+                self.assert_monotone_and_diversified(targets, 'USDT')
+
+
+# ============================================================================
+# SCRAPER - extraction + dedup
+# ============================================================================
+
+PRICING_HTML = """
+<html><body>
+  <nav><a href="/">Home</a> <a href="/pricing">Pricing</a> <a href="/blog">Blog</a></nav>
+  <div class="sidebar"><ul><li><a href="/a">Related post one here</a></li><li><a href="/b">Related post two here</a></li></ul></div>
+  <main class="pricing">
+    <p>Starter plan: <b>$9</b> per month, billed yearly, with up to 3 projects, email support, and basic analytics.</p>
+    <p>Pro plan: <b>$29</b> per month, unlimited projects, priority support, SSO, audit logs, and custom domains.</p>
+    <p>Enterprise: contact sales for volume pricing, dedicated support, SLAs, on-prem deployment, and invoicing.</p>
+  </main>
+  <footer>Copyright Acme</footer>
+  <script>var tracking = 1;</script>
+</body></html>
+"""
+
+
+class ExtractionTests(SimpleTestCase):
+    """Inline tags same line pe, main content sidebar / nav ke bina"""
+
+    def test_inline_text_stays_on_one_line(self):
+        soup = BeautifulSoup('<div><p>Get <b>50%</b> off <a href="#">today</a></p><ul><li>A</li><li>B</li></ul></div>',
+                             'html.parser')
+        self.assertEqual(block_text(soup), 'Get 50% off today\nA\nB')
+
+    def test_clean_text_drops_boilerplate(self):
+        text = clean_text(BeautifulSoup(PRICING_HTML, 'html.parser'))
+        self.assertIn('Pro plan: $29 per month', text)
+        self.assertNotIn('tracking', text)
+        self.assertNotIn('Copyright', text)
+
+    def test_main_content_skips_sidebar(self):
+        text = extract_main_content(BeautifulSoup(PRICING_HTML, 'html.parser'))
+        self.assertIn('Starter plan: $9 per month', text)
+        self.assertNotIn('Related post', text)
+        self.assertEqual(len(text.splitlines()), 3)
+
+    def test_extract_text_falls_back_to_full_page(self):
+        html = '<body><div><p>Short page.</p></div><p>Contact us</p></body>'
+        self.assertEqual(extract_text(BeautifulSoup(html, 'html.parser'), mode='main'), 'Short page.\nContact us')
+
+    def test_dedupe_drops_lines_seen_on_earlier_pages(self):
+        pages = [
+            {'section': 'HOME', 'url': 'https://acme.com', 'text': 'Acme\nSign up\nFast builds'},
+            {'section': 'PRICING', 'url': 'https://acme.com/pricing', 'text': 'ACME\n  sign   up\n$9\n✓\n✓'},
+        ]
+        deduped, stats = dedupe_pages(pages)
+        self.assertEqual(deduped[0]['text'], pages[0]['text'])
+        self.assertEqual(deduped[1]['text'], '$9\n✓\n✓')  # Same page ke repeats rehte hain
+        self.assertEqual(deduped[1]['url'], pages[1]['url'])
+        self.assertEqual(stats['lines_removed'], 2)
+        self.assertEqual(stats['chars_removed'], stats['chars_before'] - stats['chars_after'])
+
+
+# ============================================================================
+# DISCOVERY - sitemap URL scoring
+# ============================================================================
+
+class SitemapScoringTests(SimpleTestCase):
+
+    def test_locale_language(self):
+        for segment, language in [('de', 'de'), ('en-us', 'en'), ('pt_br', 'pt'), ('zh-hans', 'zh'),
+                                  ('ai', None), ('go', None), ('pricing', None), ('en-usa', None)]:
+            with self.subTest(segment=segment):
+                self.assertEqual(locale_language(segment), language)
+
+    def test_english_and_non_locale_prefixes_are_kept(self):
+        self.assertEqual(score_url('https://www.acme.com/pricing', 'acme.com'), (10, 'PRICING'))
+        self.assertEqual(score_url('https://acme.com/en-us/pricing', 'acme.com'), (10, 'PRICING'))
+        self.assertEqual(score_url('https://acme.com/ai/features', 'acme.com'), (5.5, 'FEATURES'))
+        self.assertEqual(score_url('https://acme.com/go/products', 'acme.com')[1], 'PRODUCT')
+
+    def test_rejected_urls(self):
+        for url in ['https://acme.com/de/pricing', 'https://acme.com/zh-hans/plans', 'https://acme.com/blog/pricing',
+                    'https://other.com/pricing', 'https://acme.com/pricing.pdf', 'https://acme.com/',
+                    'ftp://acme.com/pricing', 'https://acme.com/team']:
+            with self.subTest(url=url):
+                self.assertEqual(score_url(url, 'acme.com'), (None, None))
+
+    def test_depth_and_query_lower_the_score(self):
+        top, _ = score_url('https://acme.com/pricing', 'acme.com')
+        deep, _ = score_url('https://acme.com/x/y/pricing', 'acme.com')
+        query, _ = score_url('https://acme.com/pricing?ref=nav', 'acme.com')
+        self.assertGreater(top, deep)
+        self.assertGreater(top, query)
+
+
+# ============================================================================
+# AUDIO - chunk planning + stitching
+# ============================================================================
+
+class ChunkPlanTests(SimpleTestCase):
+
+    def test_short_audio_is_one_chunk(self):
+        self.assertEqual(plan_chunks(30.0, [], target=600, max_len=840), [(0.0, 30.0)])
+
+    def test_cuts_at_nearest_silence(self):
+        plan = plan_chunks(100.0, [(5, 6), (28, 30), (61, 62)], target=30, max_len=40)
+        self.assertEqual(plan, [(0.0, 29.0), (29.0, 61.5), (61.5, 100.0)])
+
+    def test_hard_cut_without_silence(self):
+        plan = plan_chunks(100.0, [], target=30, max_len=40)
+        self.assertEqual(plan, [(0.0, 30.0), (30.0, 60.0), (60.0, 100.0)])
+        for start, end in plan:
+            self.assertLessEqual(end - start, 40)
+
+    def test_stitch_maps_speakers_across_overlap(self):
+        first = [
+            {'text': 'Hello', 'start': 0.0, 'end': 0.5, 'speaker_id': 'speaker_0'},
+            {'text': 'there', 'start': 8.0, 'end': 8.4, 'speaker_id': 'speaker_1'},
+            {'text': 'friend', 'start': 9.0, 'end': 9.4, 'speaker_id': 'speaker_1'},
+        ]
+        # Dusra chunk 7s se (2s overlap) - wahi words, labels ulte
+        second = [
+            {'text': 'there', 'start': 1.0, 'end': 1.4, 'speaker_id': 'speaker_0'},
+            {'text': 'friend', 'start': 2.0, 'end': 2.4, 'speaker_id': 'speaker_0'},
+            {'text': 'Bye', 'start': 4.0, 'end': 4.3, 'speaker_id': 'speaker_1'},
+            {'text': 'now', 'start': 5.0, 'end': 5.2, 'speaker_id': 'speaker_2'},
+        ]
+        words = stitch_chunks([
+            {'keep': (0.0, 9.0), 'offset': 0.0, 'words': first},
+            {'keep': (9.0, 13.0), 'offset': 7.0, 'words': second},
+        ])
+        self.assertEqual([w['text'] for w in words], ['Hello', 'there', 'friend', 'Bye', 'now'])
+        self.assertEqual([w['start'] for w in words], [0.0, 8.0, 9.0, 11.0, 12.0])
+        self.assertEqual([w['speaker_id'] for w in words],
+                         ['speaker_0', 'speaker_1', 'speaker_1', 'speaker_2', 'speaker_3'])
+
+
+# ============================================================================
+# SEGMENT STORE - build → blob → read
+# ============================================================================
+
+class SegmentStoreTests(SimpleTestCase):
+
+    def setUp(self):
+        self.segments = [
+            {'start': 10.0, 'end': 14.0, 'speaker_id': 'speaker_1', 'text': 'dusra'},
+            {'start': 0.0, 'duration': 5.0, 'speaker': 'speaker_0', 'text': 'pehla – ünïcode'},
+            {'start': 20.0, 'end': 21.0, 'text': 'bina speaker'},
+        ]
+        self.store = SegmentStore(SegmentStore.build(self.segments))
+
+    def test_round_trip(self):
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store.speakers, ['speaker_0', 'speaker_1'])
+        self.assertEqual(self.store.duration, 21.0)
+        self.assertEqual(self.store.segment(0),
+                         {'start': 0.0, 'duration': 5.0, 'speaker': 'speaker_0', 'text': 'pehla – ünïcode'})
+        self.assertEqual(self.store.segment(2)['speaker'], None)
+        self.assertEqual([s['text'] for s in self.store.slice_index(-5, 99)], ['pehla – ünïcode', 'dusra', 'bina speaker'])
+
+    def test_time_slice_includes_overlapping_segments(self):
+        self.assertEqual([s['text'] for s in self.store.slice(4.0, 12.0)], ['pehla – ünïcode', 'dusra'])
+        self.assertEqual([s['text'] for s in self.store.slice(15.0, 20.0)], [])
+        self.assertEqual([s['text'] for s in self.store.slice(20.5, 99)], ['bina speaker'])
+
+    def test_empty_and_bad_blobs(self):
+        self.assertEqual(len(SegmentStore(SegmentStore.build([]))), 0)
+        with self.assertRaises(ValueError):
+            SegmentStore(b'XXXX' + SegmentStore.build([])[4:])
+
+
+# ============================================================================
+# OPTIMIZER - projection + rounding helpers
+# ============================================================================
+
+class OptimizerHelperTests(SimpleTestCase):
+
+    def test_projection_respects_sum_and_bounds(self):
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            n = int(rng.integers(2, 8))
+            lo = np.zeros(n)
+            hi = np.full(n, max(0.4, 1.0 / n))
+            w = project_capped_simplex(rng.normal(0, 1, n), 1.0, lo, hi)
+            self.assertAlmostEqual(w.sum(), 1.0, places=9)
+            self.assertTrue(np.all(w >= lo - 1e-12) and np.all(w <= hi + 1e-12))
+
+    def test_projection_of_feasible_point_is_identity(self):
+        v = np.array([0.2, 0.3, 0.5])
+        np.testing.assert_allclose(project_capped_simplex(v, 1.0, np.zeros(3), np.ones(3)), v, atol=1e-9)
+
+    def test_projection_with_infeasible_caps(self):
+        hi = np.array([0.2, 0.3])
+        np.testing.assert_array_equal(project_capped_simplex(np.array([1.0, 1.0]), 1.0, np.zeros(2), hi), hi)
+
+    def test_round_percentages_total_100(self):
+        self.assertEqual(round_percentages([1 / 3, 1 / 3, 1 / 3]), [33.4, 33.3, 33.3])
+        rng = np.random.default_rng(1)
+        for _ in range(50):
+            w = rng.dirichlet(np.ones(int(rng.integers(2, 10))))
+            self.assertAlmostEqual(sum(round_percentages(w)), 100.0, places=6)
+
+
+# ============================================================================
+# PORTFOLIO IMPORT - CSV / JSON / JSONL
+# ============================================================================
+
+def _upload(name, content):
+    return SimpleUploadedFile(name, content.encode('utf-8'))
+
+
+class PortfolioImportTests(SimpleTestCase):
+
+    def assert_holdings(self, result, expected):
+        self.assertEqual({h['symbol']: h['amount'] for h in result['holdings']}, expected)
+
+    def test_csv_with_sources_and_short_rows(self):
+        csv_text = 'Exchange,Asset,Balance\nBinance,btc,0.5\nKraken,BTC,"1,000.25"\nBinance,ETH\n\nLedger,ETH,2\n'
+        result, error = import_portfolio_file(_upload('export.csv', csv_text))
+        self.assertIsNone(error)
+        self.assertEqual(result['format'], 'csv')
+        self.assert_holdings(result, {'BTC': 1000.75, 'ETH': 2.0})
+        self.assertEqual((result['rows'], result['skipped'], result['sources']), (4, 1, 3))
+
+    def test_csv_without_amount_column(self):
+        result, error = import_portfolio_file(_upload('export.csv', 'Asset,Note\nBTC,hodl\n'))
+        self.assertIsNone(result)
+        self.assertIn('amount', error)
+
+    def test_json_array_and_sniffed_format(self):
+        content = json.dumps([{'symbol': 'ETH', 'amount': '2.5'}, {'symbol': 'ETH', 'amount': 1}, 'junk'])
+        for name in ('holdings.json', 'holdings'):
+            with self.subTest(name=name):
+                result, error = import_portfolio_file(_upload(name, content))
+                self.assertIsNone(error)
+                self.assertEqual(result['format'], 'json')
+                self.assert_holdings(result, {'ETH': 3.5})
+                self.assertEqual(result['skipped'], 1)
+
+    def test_wrapper_object_pretty_and_minified(self):
+        balances = [{'coin': f'C{i}', 'free': 1} for i in range(4000)]
+        minified = json.dumps({'meta': {'tags': [1, 2]}, 'balances': balances}, separators=(',', ':'))
+        self.assertGreater(len(minified), MAX_LINE_CHARS)  # Ek hi lambi line - JSONL nahi
+        for content in (json.dumps({'balances': balances[:3]}, indent=2), minified):
+            with self.subTest(size=len(content)):
+                result, error = import_portfolio_file(_upload('wallet.json', content))
+                self.assertIsNone(error)
+                self.assertEqual(result['symbols'], len(json.loads(content)['balances']))
+
+    def test_jsonl(self):
+        content = '{"asset": "BTC", "quantity": 1, "wallet": "a"}\n{"asset": "BTC", "quantity": 0.5, "wallet": "b"}\n'
+        result, error = import_portfolio_file(_upload('export.jsonl', content))
+        self.assertIsNone(error)
+        self.assert_holdings(result, {'BTC': 1.5})
+        self.assertEqual(result['sources'], 2)
+
+    def test_no_positive_balances(self):
+        result, error = import_portfolio_file(_upload('export.csv', 'Asset,Balance\nBTC,0\n'))
+        self.assertIsNone(result)
+        self.assertIn('No positive balances', error)
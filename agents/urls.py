@@ -22,12 +22,17 @@ URL STRUCTURE:
 │ /api/x402/scraper/     → Web Scraper (0.0001 MON)                          │
 │ /api/x402/github/      → GitHub Agent (0.0005 MON)                         │
 │ /api/x402/competescan/ → CompeteScan (0.0010 MON)                          │
+│ /api/x402/competescan/batch/ → CompeteScan Batch (0.0080 MON)              │
 │ /api/x402/audio/       → Audio Agent (0.0011 MON)                          │
+│ /api/x402/ytdocs/batch/ → YT Docs Batch (0.0001 MON)                       │
 ├─────────────────────────────────────────────────────────────────────────────┤
 │ UTILITY ENDPOINTS                                                           │
 ├─────────────────────────────────────────────────────────────────────────────┤
 │ /api/stats/            → Dashboard statistics                               │
 │ /api/tx/<id>/          → Transaction details                                │
+│ /api/tx/<id>/segments/ → Transcript segments slice (?start=&end=)          │
+│ /api/jobs/<id>/        → Background job status (poll)                      │
+│ /api/prices/           → Live prices for held symbols (poll)                │
 │ /api/competescan/      → CompeteScan home page                             │
 └─────────────────────────────────────────────────────────────────────────────┘
 
@@ -80,6 +85,21 @@ urlpatterns = [
     # URL param: tx_id (int)
     path('tx/<int:tx_id>/', views.get_transaction_details, name='tx_details'),
     
+    # Transaction Segments - Utterances / YouTube segments ka slice
+    # Method: GET
+    # Query: ?start=&end= (seconds) ya ?offset=&limit=
+    path('tx/<int:tx_id>/segments/', views.get_transaction_segments, name='tx_segments'),
+    
+    # Background Job Status - async audio jobs (mode=async) ka state
+    # Method: GET
+    # Returns: { job_id, status, stage, progress, events, error, result? }
+    path('jobs/<int:job_id>/', views.get_job_status, name='job_status'),
+    
+    # Live Prices - finance dashboard ke symbols (shared price cache, short polling)
+    # Method: GET ?symbols=BTC,ETH (default: last Finance analysis)
+    # Returns: { symbols, unresolved, interval, prices }
+    path('prices/', views.live_prices, name='live_prices'),
+    
     # CompeteScan Home Page - (View, not API)
     path('competescan/', views.competescan_view, name='competescan_home'),
     
@@ -129,11 +149,20 @@ urlpatterns = [
     # └──────────────────────────────────────────────────────────────────────┘
     path('x402/competescan/', views.run_competescan_x402, name='run_competescan_x402'),
     
+    # ┌──────────────────────────────────────────────────────────────────────┐
+    # │ COMPETESCAN BATCH (x402)                                             │
+    # │ Price: 0.0080 MON (max 20 URLs)                                      │
+    # │ Method: POST                                                         │
+    # │ Body: { urls: [...] }                                                │
+    # │ Returns: NDJSON stream - per-competitor results, phir matrix         │
+    # └──────────────────────────────────────────────────────────────────────┘
+    path('x402/competescan/batch/', views.run_competescan_batch_x402, name='run_competescan_batch_x402'),
+    
     # ┌──────────────────────────────────────────────────────────────────────┐
     # │ AUDIO/VOICE AGENT (x402)                                             │
     # │ Price: 0.0011 MON                                                    │
     # │ Method: POST (multipart/form-data)                                   │
-    # │ Body: { audio_file }                                                 │
+    # │ Body: { audio_file, mode? }  (mode=async → 202 + job_id)             │
     # │ Returns: { summary, minutes, todos, deadlines, transcript }          │
     # └──────────────────────────────────────────────────────────────────────┘
     path('x402/audio/', views.run_audio_x402, name='run_audio_x402'),
@@ -147,6 +176,15 @@ urlpatterns = [
     # └──────────────────────────────────────────────────────────────────────┘
     path('x402/ytdocs/', views.run_ytdocs_x402, name='run_ytdocs_x402'),
     
+    # ┌──────────────────────────────────────────────────────────────────────┐
+    # │ 📺 YT DOCS BATCH (x402) - Playlist / channel / video list            │
+    # │ Price: 0.0001 MON (max 15 videos)                                    │
+    # │ Method: POST                                                         │
+    # │ Body: { source | youtube_urls, doc_style }                           │
+    # │ Returns: NDJSON stream - per-video docs, phir course TOC             │
+    # └──────────────────────────────────────────────────────────────────────┘
+    path('x402/ytdocs/batch/', views.run_ytdocs_batch_x402, name='run_ytdocs_batch_x402'),
+    
     # ┌──────────────────────────────────────────────────────────────────────┐
     # │ 📈 SMART PORTFOLIO AGENT (x402) - NEW!                               │
     # │ Price: 0.0015 MON                                                    │
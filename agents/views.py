@@ -33,10 +33,12 @@ import json          # JSON data parse/create karne ke liye (API responses)
 import requests      # External APIs ko call karne ke liye (ElevenLabs, GitHub)
 import time          # Time delays ke liye (transaction wait)
 import os            # Operating system functions (file paths)
+import threading     # Batch agents mein LLM concurrency limit (semaphore)
+import concurrent.futures  # Batch agents - parallel scraping / analysis
 from datetime import timedelta  # Time calculations ke liye
 from django.conf import settings  # Django settings (API keys, etc.)
 from django.utils import timezone  # Timezone aware datetime
-from django.http import JsonResponse  # JSON API responses bhejne ke liye
+from django.http import JsonResponse, StreamingHttpResponse  # JSON API responses (+ NDJSON streaming for batch agents)
 from django.views.decorators.http import require_POST, require_GET  # HTTP method restrictions
 from django.views.decorators.csrf import csrf_exempt  # CSRF exemption for API endpoints
 from django.contrib.auth.decorators import login_required  # User login check
@@ -44,10 +46,21 @@ from google import genai  # Google Gemini AI API
 import socket  # Network socket operations (IPv4 fix)
 from django.shortcuts import render  # HTML templates render karne ke liye
 from web3 import Web3  # Blockchain interaction (Monad Testnet)
-from .models import AnalysisTransaction  # Database model for storing results
-from .scraper import scrape_competitor  # Website scraping utility
+from .models import AnalysisTransaction, TranscriptSegments  # Database models (results + compact segments)
+from .segment_store import SegmentStore  # Columnar utterances / segments blob
+from .jobs import job_snapshot, submit_job  # Background job mode (audio)
+from .audio_helper import store_audio_upload, transcribe_blob  # sha256-dedup uploads, ffprobe pre-flight + chunked parallel transcription (ElevenLabs S2T)
+from .scraper import scrape_competitor_cached, scrape_site_cached  # Website scraping utility (shared result cache)
+from .snapshots import latest_snapshot, save_snapshot, unpack_pages, diff_pages, changes_prompt, SCHEMA_FULL, SCHEMA_COMPACT  # CompeteScan "what changed" mode
+from .scraper import normalize_url  # Batch URL dedupe
+from .github_helper import ingest_repo, repo_prompt_context  # Repo tarball → in-memory file table
+from .ipv4 import gemini_client  # Long-running streams: per-client IPv4 (global socket patch nahi)
 from functools import wraps  # Decorator helper function
-from .finance_helper import extract_holdings, get_market_context_for_gemini # Finance helper
+from .finance_helper import extract_holdings, get_market_context_for_gemini, get_portfolio_snapshot, split_top_rows, ANALYSIS_MAX_ASSETS # Finance helper
+from .portfolio_import import import_portfolio_file  # CSV / JSON exports (streaming aggregate)
+from .portfolio_analytics import analyze_portfolio, analytics_prompt_block  # NumPy risk metrics (deterministic)
+from .portfolio_optimizer import RECOMMENDATION_UNIVERSE, optimize_portfolio, optimizer_prompt_block  # Target allocation
+from .live_prices import latest_prices, poll_interval, resolve_price_symbols  # Live prices (cached, short polling)
 
 
 # ============================================================================
@@ -297,6 +310,63 @@ def parse_repo_url(url):
     parts = [x for x in clean[1].split("/") if x]
     return (parts[0], parts[1]) if len(parts) >= 2 else (None, None)
 
+def github_repo_context(owner, repo, agent_type):
+    """
+    Poori repo (ek tarball request, in-memory file table) → prompt context.
+    Archive na mile (private / rate limit) to purana README-only context.
+    RETURNS: (context, ingest_stats ya None)
+    """
+    snapshot, err = ingest_repo(owner, repo)
+    if err:
+        print(f" ! Repo ingestion failed ({err}) - README fallback")
+        readme = get_gh_content(f"https://raw.githubusercontent.com/{owner}/{repo}/HEAD/README.md")
+        return f"README: {readme[:20000]}", None
+    stats = snapshot['stats']
+    print(f" > Ingested {owner}/{repo}: {len(snapshot['files'])} files, {stats['text_bytes']} bytes text, "
+          f"{stats['archive_bytes']} bytes archive in {stats['elapsed_ms']} ms")
+    ingest = {
+        'commit': snapshot['commit'],
+        'files': stats['members'],
+        'text_files': len(snapshot['files']),
+        'languages': snapshot['languages'],
+        'truncated': stats['truncated'],
+    }
+    return repo_prompt_context(snapshot, agent_type), ingest
+
+def competescan_changes_analysis(url, site, schema):
+    """
+    CompeteScan "what changed" mode: usi schema ke latest snapshot se section diff nikalta hai.
+    - Koi change nahi → pichla result as-is (Gemini call skip)
+    - Change hai → sirf changed sections + pichla JSON Gemini ko
+    RETURNS: (final_data ya None, analysis_info). None = full analysis chalao.
+    """
+    previous = latest_snapshot(url, schema)
+    if not previous or not previous.result_data:
+        return None, {'mode': 'full', 'reason': 'no previous snapshot'}
+    previous_result = json.loads(previous.result_data)
+    if 'error' in previous_result:
+        return None, {'mode': 'full', 'reason': 'previous analysis invalid'}
+
+    diff = diff_pages(unpack_pages(previous.pages_blob), site['pages'])
+    info = {
+        'mode': 'changes',
+        'since': previous.created_at.isoformat(),
+        'sections_total': diff['sections_total'],
+        'sections_changed': diff['sections_changed'],
+    }
+    if not diff['has_changes']:
+        log_info("No section changes since last snapshot - reusing previous analysis")
+        return dict(previous_result, what_changed=[]), info
+
+    log_info(f"{diff['sections_changed']}/{diff['sections_total']} sections changed - incremental Gemini analysis")
+    client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    resp = client.models.generate_content(model='gemini-2.5-flash', contents=changes_prompt(previous_result, diff))
+    try:
+        clean = resp.text.replace("```json", "").replace("```", "")
+        return json.loads(clean), info
+    except:
+        return None, {'mode': 'full', 'reason': 'incremental parse error'}
+
 # --- Views ---
 
 @login_required
@@ -346,16 +416,76 @@ def get_transaction_details(request, tx_id):
     """Fetch full details for a history item."""
     try:
         tx = AnalysisTransaction.objects.get(id=tx_id, user=request.user)
+        # Segments ka sirf metadata (blob load nahi hota) - data /segments/ se aata hai
+        segments = TranscriptSegments.objects.filter(transaction=tx).values('kind', 'count', 'duration').first()
+        if segments:
+            segments['url'] = f"/api/tx/{tx.id}/segments/"
         return JsonResponse({
             'input': tx.title or tx.input_text,  # Add file url if audio ??
             'output': json.loads(tx.output_data) if tx.output_data else {},
             'agent': tx.agent_type,
-            'category': tx.category
+            'category': tx.category,
+            'status': tx.status,
+            'segments': segments
         })
     except AnalysisTransaction.DoesNotExist:
         return JsonResponse({'error': 'Not found'}, status=404)
 
 
+def save_segments(txn, segments, kind):
+    """
+    Utterances / transcript segments ko compact side table mein store karta hai
+    (output_data JSON mein nahi - history page aur detail view halke rehte hain).
+    """
+    if not segments:
+        return None
+    blob = SegmentStore.build(segments)
+    store = SegmentStore(blob)
+    record, _created = TranscriptSegments.objects.update_or_create(
+        transaction=txn,
+        defaults={'kind': kind, 'count': len(store), 'duration': store.duration, 'blob': blob}
+    )
+    return record
+
+
+@login_required
+@require_GET
+def get_transaction_segments(request, tx_id):
+    """
+    Transaction ke segments ka slice (time range ya index range).
+    
+    GET /api/tx/<id>/segments/?start=60&end=120   → 1:00-2:00 ke segments
+    GET /api/tx/<id>/segments/?offset=0&limit=200 → index range (default)
+    
+    Sirf requested slice decode hota hai (SegmentStore zero-copy views).
+    """
+    blob = TranscriptSegments.objects.filter(
+        transaction_id=tx_id, transaction__user=request.user
+    ).values_list('blob', flat=True).first()
+    if blob is None:
+        return JsonResponse({'error': 'Not found'}, status=404)
+    
+    store = SegmentStore(blob)
+    try:
+        if 'start' in request.GET or 'end' in request.GET:
+            start = float(request.GET.get('start', 0))
+            end = float(request.GET.get('end', store.duration + 1))
+            segments = store.slice(start, end)
+        else:
+            offset = max(0, int(request.GET.get('offset', 0)))
+            limit = min(1000, max(1, int(request.GET.get('limit', 200))))
+            segments = store.slice_index(offset, offset + limit)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid range parameters'}, status=400)
+    
+    return JsonResponse({
+        'count': len(store),
+        'duration': store.duration,
+        'speakers': store.speakers,
+        'segments': segments
+    })
+
+
 @login_required
 @require_POST
 def run_github_agent(request):
@@ -397,11 +527,10 @@ def run_github_agent(request):
         print(" > Fetching GitHub Content...")
         socket.getaddrinfo = new_getaddrinfo
         try:
-            readme_url = f"https://raw.githubusercontent.com/{owner}/{repo}/HEAD/README.md"
-            readme = get_gh_content(readme_url)
-            print(f" > Content Fetched ({len(readme)} bytes). Sending to Gemini...")
+            repo_context, ingest = github_repo_context(owner, repo, agent_type)
+            print(f" > Content Fetched ({len(repo_context)} chars). Sending to Gemini...")
             
-            prompt = f"Analyze this GitHub repo ({agent_type}). README: {readme[:20000]}. Return JSON with key 'summary' containing HTML."
+            prompt = f"Analyze this GitHub repo ({agent_type}). Repository contents:\n{repo_context}\n\nReturn JSON with key 'summary' containing HTML."
     
             client = genai.Client(api_key=settings.GEMINI_API_KEY)
             resp = client.models.generate_content(model='gemini-2.5-flash', contents=prompt)
@@ -415,6 +544,8 @@ def run_github_agent(request):
             output_json = json.loads(clean)
         except:
             output_json = {"summary": resp.text}
+        if ingest and isinstance(output_json, dict):
+            output_json['ingest'] = ingest
 
         print(" > Saving to DB...")
         AnalysisTransaction.objects.create(
@@ -466,36 +597,33 @@ def run_audio_agent(request):
         if "YOUR-ELEVENLABS" in settings.ELEVENLABS_API_KEY:
              return JsonResponse({'error': 'Server configuration error: ElevenLabs API Key missing.'}, status=503)
              
-        # Save temp file
+        # Save file (content-addressed - same bytes disk pe ek hi baar)
         print(" > Saving Audio File to DB/Disk...")
+        blob, probe, reject = store_audio_upload(audio_file)  # Pre-flight pehle: khaali / unsupported file → na blob, na ElevenLabs call
+        if reject:
+             print(f" ! Pre-flight rejected: {reject}")
+             return JsonResponse({'error': reject}, status=400)
         txn = AnalysisTransaction.objects.create(
             user=request.user,
             category='AUDIO',
             agent_type='meeting_assistant',
-            input_file=audio_file,
+            input_file=blob.file.name,
+            audio_blob=blob,
             title=audio_file.name,
             tx_hash=tx_hash
         )
         
-        f_path = txn.input_file.path
-        
         # Apply Patch for Requests
         socket.getaddrinfo = new_getaddrinfo
         try:
             print(" > Calling ElevenLabs S2T API...")
-            el_url = "https://api.elevenlabs.io/v1/speech-to-text"
-            with open(f_path, 'rb') as f:
-                r = requests.post(
-                    el_url, 
-                    headers={"xi-api-key": settings.ELEVENLABS_API_KEY}, 
-                    files={'file': f, 'model_id': (None, 'scribe_v1'), 'diarize': (None, 'true')}
-                )
+            # Streaming upload; lambi recording silence pe chunks mein parallel
+            transcript_json, err = transcribe_blob(blob, filename=audio_file.name, probe=probe)
             
-            if r.status_code != 200:
-                 print(f" ! ElevenLabs Error: {r.text}")
+            if err:
+                 print(f" ! ElevenLabs Error: {err}")
                  return JsonResponse({'error': 'Transcription Failed'}, status=500)
             
-            transcript_json = r.json() 
             utterances = transcript_json.get('utterances', [])
             full_text = " ".join([u['text'] for u in utterances]) if utterances else transcript_json.get('text', '')
             print(f" > Transcription Complete. {len(utterances)} Segments found.")
@@ -528,9 +656,13 @@ def run_audio_agent(request):
         final_data['transcript'] = full_text # string fallback
         final_data['utterances'] = utterances # full speaker structure
         
-        # Update DB
+        # Update DB (utterances compact side table mein, output JSON mein sirf count)
         print(" > Updating DB with Results...")
-        txn.output_data = json.dumps(final_data)
+        save_segments(txn, utterances, 'utterances')
+        stored = {k: v for k, v in final_data.items() if k != 'utterances'}
+        stored['segment_count'] = len(utterances)
+        stored['upload_stats'] = transcript_json.get('upload_stats')  # Compact transcode: bytes saved + latency
+        txn.output_data = json.dumps(stored)
         txn.save()
 
         return JsonResponse(final_data)
@@ -561,6 +693,7 @@ def run_competescan(request):
         data = json.loads(request.body)
         url = data.get('url')
         tx_hash = data.get('tx_hash')
+        analysis_mode = data.get('mode', 'full')  # 'full' | 'changes' (incremental)
 
         print(f" > URL: {url} | Tx: {tx_hash}")
         
@@ -581,74 +714,84 @@ def run_competescan(request):
 
         # 2. Scrape
         print(" > Scraping Website...")
-        context = scrape_competitor(url)
+        site, scrape_meta = scrape_site_cached(url, refresh=analysis_mode == 'changes')
+        context = site['context']
         if not context or len(context) < 100:
             return JsonResponse({'error': 'Failed to scrape website content. Please try a different URL.'}, status=400)
         
         print(f" > Scraped {len(context)} chars. Sending to Gemini...")
 
-        # 3. Analyze (Gemini)
-        prompt = f"""
-        You are a product strategist and competitive analyst.
-        Analyze the following website content and return ONLY valid JSON in this schema:
-        {{
-            "business_overview": {{
-                "type": "SaaS/Agency/etc",
-                "products": ["..."],
-                "icp": "Ideal Customer Profile description",
-                "industries": ["..."],
-                "region": "..."
-            }},
-            "pricing": {{
-                "model": "Subscription/Freemium/etc",
-                "plans": [
-                    {{"name": "...", "price": "...", "features": "..."}}
+        # 3. Analyze (Gemini) - "changes" mode mein pehle incremental try
+        final_data, analysis_info = None, {'mode': 'full'}
+        if analysis_mode == 'changes':
+            socket.getaddrinfo = new_getaddrinfo
+            try:
+                final_data, analysis_info = competescan_changes_analysis(url, site, SCHEMA_FULL)
+            finally:
+                socket.getaddrinfo = original_getaddrinfo
+
+        if final_data is None:
+            prompt = f"""
+            You are a product strategist and competitive analyst.
+            Analyze the following website content and return ONLY valid JSON in this schema:
+            {{
+                "business_overview": {{
+                    "type": "SaaS/Agency/etc",
+                    "products": ["..."],
+                    "icp": "Ideal Customer Profile description",
+                    "industries": ["..."],
+                    "region": "..."
+                }},
+                "pricing": {{
+                    "model": "Subscription/Freemium/etc",
+                    "plans": [
+                        {{"name": "...", "price": "...", "features": "..."}}
+                    ],
+                    "free_trial": true/false,
+                    "notes": "..."
+                }},
+                "positioning": {{
+                    "headline_interpretation": "...",
+                    "primary_cta": "...",
+                    "strategy": "..."
+                }},
+                "strengths_weaknesses": {{
+                    "strengths": ["..."],
+                    "weaknesses": ["..."]
+                }},
+                "opportunities": {{
+                    "differentiation": "...",
+                    "product_strategy": "...",
+                    "pricing_strategy": "...",
+                    "marketing_funnel": "..."
+                }},
+                "growth_experiments": [
+                    {{"experiment": "...", "impact": "High/Med/Low"}}
                 ],
-                "free_trial": true/false,
-                "notes": "..."
-            }},
-            "positioning": {{
-                "headline_interpretation": "...",
-                "primary_cta": "...",
-                "strategy": "..."
-            }},
-            "strengths_weaknesses": {{
-                "strengths": ["..."],
-                "weaknesses": ["..."]
-            }},
-            "opportunities": {{
-                "differentiation": "...",
-                "product_strategy": "...",
-                "pricing_strategy": "...",
-                "marketing_funnel": "..."
-            }},
-            "growth_experiments": [
-                {{"experiment": "...", "impact": "High/Med/Low"}}
-            ],
-            "summary": {{
-                "one_line": "...",
-                "key_insights": ["..."]
+                "summary": {{
+                    "one_line": "...",
+                    "key_insights": ["..."]
+                }}
             }}
-        }}
 
-        Website Context:
-        {context}
-        """
-
-        socket.getaddrinfo = new_getaddrinfo
-        try:
-            client = genai.Client(api_key=settings.GEMINI_API_KEY)
-            resp = client.models.generate_content(model='gemini-2.5-flash', contents=prompt)
-        finally:
-            socket.getaddrinfo = original_getaddrinfo
+            Website Context:
+            {context}
+            """
 
-        # 4. Parse & Save
-        print(" > Gemini Response Received. Parsing...")
-        try:
-            clean = resp.text.replace("```json", "").replace("```", "")
-            final_data = json.loads(clean)
-        except:
-            final_data = {"error": "Failed to parse AI response", "raw": resp.text}
+            socket.getaddrinfo = new_getaddrinfo
+            try:
+                client = genai.Client(api_key=settings.GEMINI_API_KEY)
+                resp = client.models.generate_content(model='gemini-2.5-flash', contents=prompt)
+            finally:
+                socket.getaddrinfo = original_getaddrinfo
+
+            # 4. Parse & Save
+            print(" > Gemini Response Received. Parsing...")
+            try:
+                clean = resp.text.replace("```json", "").replace("```", "")
+                final_data = json.loads(clean)
+            except:
+                final_data = {"error": "Failed to parse AI response", "raw": resp.text}
 
         # Save to DB
         AnalysisTransaction.objects.create(
@@ -662,6 +805,12 @@ def run_competescan(request):
             cost=0.0010
         )
 
+        # Snapshot = agli "what changed" run ka baseline
+        if 'error' not in final_data:
+            save_snapshot(url, site['pages'], final_data, SCHEMA_FULL)
+
+        final_data['scrape_cache'] = scrape_meta  # fresh / cached / stale + age
+        final_data['analysis_mode'] = analysis_info
         return JsonResponse(final_data)
 
     except Exception as e:
@@ -750,7 +899,7 @@ def run_scraper_x402(request):
         # IPv4 patch apply karo (some servers fail on IPv6)
         socket.getaddrinfo = new_getaddrinfo
         try:
-            context = scrape_competitor(url)  # Actual scraping function
+            context, scrape_meta = scrape_competitor_cached(url)  # Actual scraping (shared cache)
         finally:
             socket.getaddrinfo = original_getaddrinfo  # Original restore karo
         
@@ -804,7 +953,8 @@ def run_scraper_x402(request):
         output_data = {
             'url': url,
             'content_length': len(context),
-            'markdown': structured_content  # Return structured content
+            'markdown': structured_content,  # Return structured content
+            'scrape_cache': scrape_meta      # fresh / cached / stale + age
         }
         
         AnalysisTransaction.objects.create(
@@ -889,15 +1039,16 @@ def run_github_x402(request):
         
         print(f" > Analyzing: {owner}/{repo} ({agent_type})")
         
-        # Fetch README
+        # Fetch repository (single tarball → in-memory file table)
         socket.getaddrinfo = new_getaddrinfo
         try:
-            readme_url = f"https://raw.githubusercontent.com/{owner}/{repo}/HEAD/README.md"
-            readme = get_gh_content(readme_url)
+            repo_context, ingest = github_repo_context(owner, repo, agent_type)
             
             prompt = f"""
             Analyze this GitHub repo ({agent_type}). 
-            README Context: {readme[:20000]}.
+            Base the analysis on the actual source files below, citing file paths.
+            Repository Context:
+            {repo_context}
             
             Return strictly a JSON object with a single key 'summary'.
             The value of 'summary' should be a well-formatted Markdown string.
@@ -917,6 +1068,8 @@ def run_github_x402(request):
             output_json = json.loads(clean)
         except:
             output_json = {"summary": resp.text}
+        if ingest and isinstance(output_json, dict):
+            output_json['ingest'] = ingest
         
         # Save to DB (payment info from x-payment header)
         payment_header = request.headers.get('x-payment', 'x402-payment')
@@ -940,6 +1093,35 @@ def run_github_x402(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+def analyze_competitor_context(context, force_ipv4=False):
+    """
+    Scraped website context → compact CompeteScan JSON (Gemini).
+    run_competescan_x402 aur batch endpoint dono yahi schema use karte hain.
+    force_ipv4 → sirf is Gemini client ke connections IPv4 (batch stream).
+    """
+    prompt = f"""
+    You are a product strategist and competitive analyst.
+    Analyze the following website content and return ONLY valid JSON:
+    {{
+        "business_overview": {{ "type": "...", "products": [], "icp": "...", "region": "..." }},
+        "pricing": {{ "model": "...", "plans": [], "free_trial": true }},
+        "strengths_weaknesses": {{ "strengths": [], "weaknesses": [] }},
+        "summary": {{ "one_line": "...", "key_insights": [] }}
+    }}
+    
+    Website Content: {context[:30000]}
+    """
+    
+    client = gemini_client(force_ipv4)
+    resp = client.models.generate_content(model='gemini-2.5-flash', contents=prompt)
+    
+    try:
+        clean = resp.text.replace("```json", "").replace("```", "")
+        return json.loads(clean)
+    except:
+        return {"error": "Parse error", "raw": resp.text[:1000]}
+
+
 @login_required
 @require_POST
 @x402_payment_required(required_amount=0.0010, asset="MON", description="CompeteScan Analysis Agent")
@@ -953,6 +1135,7 @@ def run_competescan_x402(request):
     try:
         data = json.loads(request.body)
         url = data.get('url')
+        analysis_mode = data.get('mode', 'full')  # 'full' | 'changes' (incremental)
         
         if not url:
             return JsonResponse({'error': 'Missing URL parameter'}, status=400)
@@ -962,35 +1145,21 @@ def run_competescan_x402(request):
         # Scrape
         socket.getaddrinfo = new_getaddrinfo
         try:
-            context = scrape_competitor(url)
+            site, scrape_meta = scrape_site_cached(url, refresh=analysis_mode == 'changes')
+            context = site['context']
             if not context or len(context) < 100:
                 return JsonResponse({'error': 'Failed to scrape website content.'}, status=400)
             
-            # Gemini Analysis
-            prompt = f"""
-            You are a product strategist and competitive analyst.
-            Analyze the following website content and return ONLY valid JSON:
-            {{
-                "business_overview": {{ "type": "...", "products": [], "icp": "...", "region": "..." }},
-                "pricing": {{ "model": "...", "plans": [], "free_trial": true }},
-                "strengths_weaknesses": {{ "strengths": [], "weaknesses": [] }},
-                "summary": {{ "one_line": "...", "key_insights": [] }}
-            }}
-            
-            Website Content: {context[:30000]}
-            """
+            # "changes" mode: pichle snapshot ke against sirf diff analyze karo
+            final_data, analysis_info = None, {'mode': 'full'}
+            if analysis_mode == 'changes':
+                final_data, analysis_info = competescan_changes_analysis(url, site, SCHEMA_COMPACT)
             
-            client = genai.Client(api_key=settings.GEMINI_API_KEY)
-            resp = client.models.generate_content(model='gemini-2.5-flash', contents=prompt)
+            if final_data is None:
+                final_data = analyze_competitor_context(context)  # Gemini Analysis
         finally:
             socket.getaddrinfo = original_getaddrinfo
         
-        try:
-            clean = resp.text.replace("```json", "").replace("```", "")
-            final_data = json.loads(clean)
-        except:
-            final_data = {"error": "Parse error", "raw": resp.text[:1000]}
-        
         # Save to DB
         payment_header = request.headers.get('x-payment', 'x402-payment')
         
@@ -1005,6 +1174,12 @@ def run_competescan_x402(request):
             cost=0.0010
         )
         
+        # Snapshot = agli "what changed" run ka baseline
+        if 'error' not in final_data:
+            save_snapshot(url, site['pages'], final_data, SCHEMA_COMPACT)
+        
+        final_data['scrape_cache'] = scrape_meta  # fresh / cached / stale + age
+        final_data['analysis_mode'] = analysis_info
         return JsonResponse(final_data)
         
     except Exception as e:
@@ -1012,6 +1187,235 @@ def run_competescan_x402(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+# ────────────────────────────────────────────────────────────────────────────
+# COMPETESCAN BATCH (x402) - Ek request mein 10-20 competitors
+# ────────────────────────────────────────────────────────────────────────────
+
+BATCH_MAX_URLS = 20          # Ek batch mein max competitors
+BATCH_PAGE_BUDGET = 40       # Poore batch ke liye total sub-pages (global crawl budget)
+BATCH_SCRAPE_WORKERS = 6     # Ek saath kitni sites scrape hon
+BATCH_LLM_WORKERS = 4        # Ek saath kitne Gemini calls
+
+
+def build_comparison_matrix(results):
+    """
+    Per-competitor CompeteScan JSON (compact schema) → comparison matrix.
+    Rows request order mein rehte hain; failed competitors bhi row paate hain.
+    """
+    columns = ['url', 'status', 'type', 'icp', 'region', 'products', 'pricing_model',
+               'free_trial', 'plans', 'strengths', 'weaknesses', 'one_line']
+    rows = []
+    for item in results:
+        data = item.get('data') or {}
+        overview = data.get('business_overview') or {}
+        pricing = data.get('pricing') or {}
+        sw = data.get('strengths_weaknesses') or {}
+        summary = data.get('summary') or {}
+        rows.append({
+            'url': item['url'],
+            'status': item['status'],
+            'type': overview.get('type'),
+            'icp': overview.get('icp'),
+            'region': overview.get('region'),
+            'products': overview.get('products') or [],
+            'pricing_model': pricing.get('model'),
+            'free_trial': pricing.get('free_trial'),
+            'plans': [p.get('name', '') if isinstance(p, dict) else str(p) for p in (pricing.get('plans') or [])],
+            'strengths': sw.get('strengths') or [],
+            'weaknesses': sw.get('weaknesses') or [],
+            'one_line': summary.get('one_line'),
+        })
+    return {'columns': columns, 'rows': rows}
+
+
+@login_required
+@require_POST
+@x402_payment_required(required_amount=0.0080, asset="MON", description="CompeteScan Batch Agent")
+def run_competescan_batch_x402(request):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  x402 COMPETESCAN BATCH AGENT                                             ║
+    ║  Ek paid call mein 20 tak competitors - concurrent scrape + analysis      ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+    
+    PRICE: 0.0080 MON per batch (max 20 URLs)
+    
+    INPUT (JSON body):
+    - urls: ["https://a.com", "https://b.com", ...] (ya comma/newline separated string)
+    
+    OUTPUT (NDJSON stream - har line ek JSON object):
+    - {"event": "result", "index", "url", "status", "data", "scrape_cache"}  ← har competitor complete hote hi
+    - {"event": "matrix", "matrix": {columns, rows}, "completed", "failed"}   ← last line
+    
+    LIMITS:
+    - BATCH_PAGE_BUDGET sub-pages poore batch mein divide hote hain
+    - BATCH_SCRAPE_WORKERS sites parallel scrape, BATCH_LLM_WORKERS Gemini calls parallel
+    """
+    log_agent("COMPETESCAN-BATCH", f"User: {request.user.wallet_address}")
+    
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    
+    urls = data.get('urls') or []
+    if isinstance(urls, str):
+        urls = urls.replace(',', ' ').split()
+    
+    # Normalized URL pe dedupe (order preserve)
+    unique, seen = [], set()
+    for url in urls:
+        key = normalize_url(str(url))
+        if key not in seen:
+            seen.add(key)
+            unique.append(str(url).strip())
+    urls = unique
+    
+    if not urls:
+        return JsonResponse({'error': 'Missing urls parameter'}, status=400)
+    if len(urls) > BATCH_MAX_URLS:
+        return JsonResponse({'error': f'Too many URLs (max {BATCH_MAX_URLS})'}, status=400)
+    
+    per_site_pages = min(4, BATCH_PAGE_BUDGET // len(urls))
+    llm_slots = threading.BoundedSemaphore(BATCH_LLM_WORKERS)
+    payment_header = request.headers.get('x-payment', 'x402-payment')
+    user = request.user
+    log_info(f"Batch: {len(urls)} competitors | {per_site_pages} sub-pages each")
+    
+    def process(index, url):
+        try:
+            site, scrape_meta = scrape_site_cached(url, max_pages=per_site_pages, force_ipv4=True)
+            if not site['context'] or len(site['context']) < 100:
+                return {'index': index, 'url': url, 'status': 'error',
+                        'error': 'Failed to scrape website content.', 'scrape_cache': scrape_meta}
+            with llm_slots:
+                analysis = analyze_competitor_context(site['context'], force_ipv4=True)
+            return {'index': index, 'url': url, 'status': 'error' if 'error' in analysis else 'success',
+                    'data': analysis, 'scrape_cache': scrape_meta, 'pages': site['pages']}
+        except Exception as e:
+            return {'index': index, 'url': url, 'status': 'error', 'error': str(e)}
+    
+    # IPv4 har HTTP client pe alag se (force_ipv4) - minutes lambe stream mein
+    # process-global socket.getaddrinfo patch baaki sab requests ko bhi IPv4 kar deta
+    def stream():
+        results = [None] * len(urls)
+        try:
+            workers = min(BATCH_SCRAPE_WORKERS, len(urls))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(process, i, url) for i, url in enumerate(urls)]
+                for future in concurrent.futures.as_completed(futures):
+                    item = future.result()
+                    pages = item.pop('pages', None)
+                    if item['status'] == 'success' and pages:
+                        save_snapshot(item['url'], pages, item['data'], SCHEMA_COMPACT)
+                    results[item['index']] = item
+                    log_info(f"[{item['index'] + 1}/{len(urls)}] {item['url']} → {item['status']}")
+                    yield json.dumps(dict(item, event='result')) + '\n'
+            
+            matrix = build_comparison_matrix(results)
+            failed = sum(1 for item in results if item['status'] != 'success')
+            AnalysisTransaction.objects.create(
+                user=user,
+                category='COMPETESCAN',
+                agent_type='competitor_batch',
+                input_text='\n'.join(urls),
+                title=f"Batch: {len(urls)} competitors",
+                output_data=json.dumps({'results': results, 'matrix': matrix}),
+                tx_hash=payment_header[:66] if len(payment_header) > 66 else payment_header,
+                cost=0.0080
+            )
+            log_success(f"Batch complete: {len(urls) - failed} ok, {failed} failed")
+            yield json.dumps({'event': 'matrix', 'matrix': matrix,
+                              'completed': len(urls) - failed, 'failed': failed}) + '\n'
+        except Exception as e:
+            log_error(f"COMPETESCAN-BATCH Exception: {str(e)}")
+            yield json.dumps({'event': 'error', 'error': str(e)}) + '\n'
+    
+    response = StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+    response['X-Accel-Buffering'] = 'no'  # Proxies buffer na karein - results turant client tak
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def audio_x402_pipeline(txn, report, blob, filename, probe=None, force_ipv4=True):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  AUDIO PIPELINE - transcribe → Gemini analysis → save                     ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+    
+    run_audio_x402 ka kaam - sync request mein ya background job (agents/jobs.py)
+    mein chalta hai. report(stage, progress) har stage pe call hota hai.
+    force_ipv4: IPv4 patch (process-global socket.getaddrinfo) sirf request thread
+    mein - jobs parallel chalte hain, ek job ka restore doosre ke upload ke beech
+    patch hata deta. Background jobs normal resolver use karte hain.
+    
+    RETURNS: (final_data, error)
+    """
+    if force_ipv4:
+        socket.getaddrinfo = new_getaddrinfo
+    try:
+        report('transcribe', 10)
+        print(" > Calling ElevenLabs S2T API...")
+        # Streaming upload; lambi recording silence pe chunks mein parallel (per-chunk retries),
+        # utterances words se bante hain (start/end + consistent speaker labels)
+        transcript_json, err = transcribe_blob(blob, filename=filename, probe=probe)
+        
+        if err:
+            print(f" ! ElevenLabs Error: {err}")
+            return None, 'Transcription Failed'
+        
+        utterances = transcript_json.get('utterances', [])
+
+        full_text = " ".join([u['text'] for u in utterances]) if utterances else transcript_json.get('text', '')
+        
+        print(f" > Transcription Complete. {len(utterances)} segments")
+        
+        # Gemini Analysis
+        report('analyze', 70)
+        print(" > Analyzing with Gemini...")
+        prompt = f"""
+        Analyze this transcript. Return strict JSON.
+        Keys:
+        - "summary": HTML string (concise).
+        - "minutes": HTML string (bullet points).
+        - "todos": HTML string (actionable items).
+        - "deadlines": HTML string (dates/times mentioned).
+        - "chat_segments": List of objects {{"speaker": "Name/A", "text": "..."}}. Try to split by speaker changes.
+        
+        Transcript: {full_text[:40000]}
+        """
+        
+        client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        resp = client.models.generate_content(model='gemini-2.5-flash', contents=prompt)
+    finally:
+        if force_ipv4:
+            socket.getaddrinfo = original_getaddrinfo
+    
+    try:
+        clean = resp.text.replace("```json", "").replace("```", "")
+        final_data = json.loads(clean)
+    except:
+        final_data = {"summary": resp.text, "minutes": "", "todos": "", "deadlines": "", "chat_segments": []}
+    
+    # Fallback to Gemini diarization if ElevenLabs failed
+    if not utterances and final_data.get('chat_segments'):
+        utterances = final_data.get('chat_segments')
+        
+    final_data['transcript'] = full_text
+    final_data['utterances'] = utterances
+    
+    # Update DB (utterances compact side table mein, output JSON mein sirf count)
+    report('save', 95)
+    save_segments(txn, utterances, 'utterances')
+    stored = {k: v for k, v in final_data.items() if k != 'utterances'}
+    stored['segment_count'] = len(utterances)
+    stored['upload_stats'] = transcript_json.get('upload_stats')  # Compact transcode: bytes saved + latency
+    txn.output_data = json.dumps(stored)
+    txn.save()
+    
+    return final_data, None
+
+
 @login_required
 @require_POST
 @x402_payment_required(required_amount=0.0011, asset="MON", description="Voice Intelligence Agent")
@@ -1019,17 +1423,22 @@ def run_audio_x402(request):
     """
     x402-enabled Voice Intelligence / Audio Agent.
     Transcribes and analyzes audio files using ElevenLabs + Gemini.
+    
+    mode=async (form field ya ?mode=async) → upload store hote hi 202 + job id;
+    pipeline background worker mein, progress /api/jobs/<id>/ poll karke.
+    Lambi files proxy timeouts se nahi tootti (har poll chhota request).
     """
     print(f"[{timezone.now()}] x402 AUDIO - Payment Verified via x402 Protocol")
     
     try:
         # FormData input
         audio_file = request.FILES.get('audio_file')
+        async_mode = (request.POST.get('mode') or request.GET.get('mode')) == 'async'
         
         if not audio_file:
             return JsonResponse({'error': 'Missing audio file'}, status=400)
         
-        print(f" > Processing: {audio_file.name}")
+        print(f" > Processing: {audio_file.name}{' (async job)' if async_mode else ''}")
         
         # Check ElevenLabs API Key
         if "YOUR-ELEVENLABS" in settings.ELEVENLABS_API_KEY:
@@ -1038,97 +1447,33 @@ def run_audio_x402(request):
         # Save to DB with payment header
         payment_header = request.headers.get('x-payment', 'x402-payment')
         
+        blob, probe, reject = store_audio_upload(audio_file)  # sha256 dedup + pre-flight (rejected upload ka blob nahi banta)
+        if reject:
+            print(f" ! Pre-flight rejected: {reject}")
+            return JsonResponse({'error': reject}, status=400)
         txn = AnalysisTransaction.objects.create(
             user=request.user,
             category='AUDIO',
             agent_type='meeting_assistant',
-            input_file=audio_file,
+            input_file=blob.file.name,
+            audio_blob=blob,
             title=audio_file.name,
             tx_hash=payment_header[:66] if len(payment_header) > 66 else payment_header,
             cost=0.0011
         )
         
-        f_path = txn.input_file.path
-        
-        # Transcription
-        socket.getaddrinfo = new_getaddrinfo
-        try:
-            print(" > Calling ElevenLabs S2T API...")
-            el_url = "https://api.elevenlabs.io/v1/speech-to-text"
-            with open(f_path, 'rb') as f:
-                r = requests.post(
-                    el_url,
-                    headers={"xi-api-key": settings.ELEVENLABS_API_KEY},
-                    data={'model_id': 'scribe_v1', 'diarize': 'true'},
-                    files={'file': f}
-                )
-            
-            if r.status_code != 200:
-                print(f" ! ElevenLabs Error: {r.text}")
-                return JsonResponse({'error': 'Transcription Failed'}, status=500)
-            
-            transcript_json = r.json()
-            utterances = transcript_json.get('utterances', [])
-            
-            # Construct utterances from words if needed (Scribe v1 fallback)
-            if not utterances and 'words' in transcript_json:
-                words = transcript_json['words']
-                if words:
-                    current_speaker = words[0].get('speaker_id', 'unknown')
-                    current_text = []
-                    for w in words:
-                        s_id = w.get('speaker_id', 'unknown')
-                        if s_id != current_speaker:
-                            utterances.append({
-                                'speaker': current_speaker,
-                                'text': " ".join(current_text)
-                            })
-                            current_speaker = s_id
-                            current_text = [w['text']]
-                        else:
-                            current_text.append(w['text'])
-                    if current_text:
-                        utterances.append({'speaker': current_speaker, 'text': " ".join(current_text)})
-
-            full_text = " ".join([u['text'] for u in utterances]) if utterances else transcript_json.get('text', '')
-            
-            print(f" > Transcription Complete. {len(utterances)} segments")
-            
-            # Gemini Analysis
-            print(" > Analyzing with Gemini...")
-            prompt = f"""
-            Analyze this transcript. Return strict JSON.
-            Keys:
-            - "summary": HTML string (concise).
-            - "minutes": HTML string (bullet points).
-            - "todos": HTML string (actionable items).
-            - "deadlines": HTML string (dates/times mentioned).
-            - "chat_segments": List of objects {{"speaker": "Name/A", "text": "..."}}. Try to split by speaker changes.
-            
-            Transcript: {full_text[:40000]}
-            """
-            
-            client = genai.Client(api_key=settings.GEMINI_API_KEY)
-            resp = client.models.generate_content(model='gemini-2.5-flash', contents=prompt)
-        finally:
-            socket.getaddrinfo = original_getaddrinfo
-        
-        try:
-            clean = resp.text.replace("```json", "").replace("```", "")
-            final_data = json.loads(clean)
-        except:
-            final_data = {"summary": resp.text, "minutes": "", "todos": "", "deadlines": "", "chat_segments": []}
-        
-        # Fallback to Gemini diarization if ElevenLabs failed
-        if not utterances and final_data.get('chat_segments'):
-            utterances = final_data.get('chat_segments')
-            
-        final_data['transcript'] = full_text
-        final_data['utterances'] = utterances
+        if async_mode:
+            # Worker thread global getaddrinfo nahi badalta - request threads ke swap/restore se race hota
+            job_id = submit_job(txn, audio_x402_pipeline, blob, audio_file.name, probe, force_ipv4=False)
+            return JsonResponse({
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f"/api/jobs/{job_id}/",
+            }, status=202)
         
-        # Update DB
-        txn.output_data = json.dumps(final_data)
-        txn.save()
+        final_data, err = audio_x402_pipeline(txn, lambda stage, progress: None, blob, audio_file.name, probe)
+        if err:
+            return JsonResponse({'error': err}, status=500)
         
         return JsonResponse(final_data)
         
@@ -1137,6 +1482,19 @@ def run_audio_x402(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@login_required
+@require_GET
+def get_job_status(request, job_id):
+    """
+    Background job ka state (polling).
+    GET /api/jobs/<id>/ → { job_id, status, stage, progress, events, error, result? }
+    """
+    txn = AnalysisTransaction.objects.filter(id=job_id, user=request.user).first()
+    if txn is None:
+        return JsonResponse({'error': 'Not found'}, status=404)
+    return JsonResponse(job_snapshot(txn))
+
+
 # ════════════════════════════════════════════════════════════════════════════
 # 📺 YT DOCS AGENT - YouTube Video Documentation Generator
 # ════════════════════════════════════════════════════════════════════════════
@@ -1153,7 +1511,231 @@ FEATURES:
 PRICE: 0.00001 MON per request
 """
 
-from .youtube_helper import get_youtube_transcript, extract_video_id
+from .youtube_helper import get_youtube_transcript, extract_video_id, get_transcript, resolve_video_source
+from .youtube_helper import chunk_segments, format_timestamp
+
+
+YTDOCS_STYLES = ['tutorial', 'course_notes', 'cheat_sheet']
+YTDOCS_SECTION_WORKERS = 12    # Lambi video ke time windows parallel (chunk_segments max sections)
+YTDOCS_SECTION_KEYS = ('heading', 'summary', 'markdown', 'key_points', 'steps', 'mistakes', 'faq')
+
+# Doc style specific instructions
+YTDOCS_STYLE_INSTRUCTIONS = {
+    'tutorial': """
+        Create a beginner-friendly tutorial with:
+        - Clear step-by-step instructions
+        - Code examples where applicable
+        - Explanations for each step
+        - Common mistakes to avoid
+    """,
+    'course_notes': """
+        Create comprehensive study notes with:
+        - Main concepts and definitions
+        - Key points organized by topic
+        - Examples and explanations
+        - Review questions
+    """,
+    'cheat_sheet': """
+        Create a quick reference cheat sheet with:
+        - Concise bullet points
+        - Important commands/syntax
+        - Quick tips and shortcuts
+        - Minimal explanations, maximum content density
+    """
+}
+
+
+def generate_ytdocs(transcript_text, doc_style='tutorial', force_ipv4=False):
+    """
+    Transcript → structured documentation (Gemini). Single aur batch YT Docs dono use karte hain.
+    NOTE: IPv4 - single endpoint pe caller ka global patch; batch stream force_ipv4
+    deta hai (sirf is Gemini client ke connections IPv4).
+    
+    RETURNS: dict (title, one_line_summary, table_of_contents, documentation_markdown, ...)
+    """
+    prompt = f"""
+    You are a technical documentation expert. Based on this video transcript, create structured documentation.
+    
+    DOCUMENTATION STYLE: {doc_style}
+    {YTDOCS_STYLE_INSTRUCTIONS.get(doc_style, YTDOCS_STYLE_INSTRUCTIONS['tutorial'])}
+    
+    TRANSCRIPT:
+    {transcript_text[:40000]}
+    
+    Return ONLY valid JSON (no markdown code blocks, no extra text) with this exact schema:
+    {{
+        "title": "Clear descriptive title based on video content",
+        "one_line_summary": "One sentence summary of entire video",
+        "table_of_contents": ["Section 1", "Section 2", "Section 3"],
+        "documentation_markdown": "Full markdown documentation with proper headings (##), bullet points, code blocks where needed. Make it comprehensive and well-structured.",
+        "key_takeaways": ["Key point 1", "Key point 2", "Key point 3"],
+        "step_by_step": ["Step 1: Description", "Step 2: Description"],
+        "common_mistakes": ["Mistake 1 to avoid", "Mistake 2 to avoid"],
+        "faq": [
+            {{"q": "Question 1?", "a": "Answer 1"}},
+            {{"q": "Question 2?", "a": "Answer 2"}}
+        ]
+    }}
+    
+    IMPORTANT:
+    - documentation_markdown should be complete, detailed, and professional
+    - Use proper markdown formatting (headings, bullets, code blocks)
+    - If video is technical, include code examples
+    - Make content actionable and useful
+    - Return ONLY JSON, no other text
+    """
+    
+    client = gemini_client(force_ipv4)
+    resp = client.models.generate_content(model='gemini-2.5-flash', contents=prompt)
+    log_success("Gemini response received")
+    
+    try:
+        # Clean response (remove markdown code blocks if any)
+        clean_response = resp.text.strip()
+        if clean_response.startswith('```json'):
+            clean_response = clean_response[7:]
+        if clean_response.startswith('```'):
+            clean_response = clean_response[3:]
+        if clean_response.endswith('```'):
+            clean_response = clean_response[:-3]
+        clean_response = clean_response.strip()
+        
+        final_data = json.loads(clean_response)
+        log_success("Documentation generated successfully")
+        
+    except json.JSONDecodeError as e:
+        log_error(f"JSON parse error: {e}")
+        # Fallback: wrap raw response
+        final_data = {
+            "title": "Generated Documentation",
+            "one_line_summary": "Documentation generated from YouTube video",
+            "table_of_contents": [],
+            "documentation_markdown": resp.text,
+            "key_takeaways": [],
+            "step_by_step": [],
+            "common_mistakes": [],
+            "faq": []
+        }
+    
+    return final_data
+
+
+def _ytdocs_section(chunk, total_chunks, doc_style, video_id, llm_slots, force_ipv4=False):
+    """Ek time window ka section doc (Gemini). Fail ho to placeholder section + error."""
+    start, end = format_timestamp(chunk['start']), format_timestamp(chunk['end'])
+    section = {
+        'start': chunk['start'],
+        'end': chunk['end'],
+        'timestamp': start,
+        'url': f"https://www.youtube.com/watch?v={video_id}&t={int(chunk['start'])}s" if video_id else None,
+    }
+    prompt = f"""
+    You are a technical documentation expert. Below is PART {chunk['index'] + 1} of {total_chunks}
+    of a video transcript, covering {start} - {end}. Document ONLY this part.
+    
+    DOCUMENTATION STYLE: {doc_style}
+    {YTDOCS_STYLE_INSTRUCTIONS.get(doc_style, YTDOCS_STYLE_INSTRUCTIONS['tutorial'])}
+    
+    TRANSCRIPT PART:
+    {chunk['text']}
+    
+    Return ONLY valid JSON (no markdown code blocks, no extra text) with this exact schema:
+    {{
+        "heading": "Short heading for this part",
+        "summary": "One sentence summary of this part",
+        "markdown": "Markdown documentation for this part (use ### subheadings, no top-level heading)",
+        "key_points": ["Point 1", "Point 2"],
+        "steps": ["Step: Description"],
+        "mistakes": ["Mistake to avoid"],
+        "faq": [{{"q": "Question?", "a": "Answer"}}]
+    }}
+    """
+    try:
+        with llm_slots:
+            client = gemini_client(force_ipv4)
+            resp = client.models.generate_content(model='gemini-2.5-flash', contents=prompt)
+        try:
+            parsed = json.loads(resp.text.replace("```json", "").replace("```", "").strip())
+        except json.JSONDecodeError:
+            parsed = {'markdown': resp.text}
+        if not isinstance(parsed, dict):
+            parsed = {'markdown': resp.text}
+        # Sirf schema ki keys - start / url jaise fields Gemini overwrite na kare
+        section.update({k: v for k, v in parsed.items() if k in YTDOCS_SECTION_KEYS})
+    except Exception as e:
+        log_error(f"Section {chunk['index'] + 1} failed: {str(e)[:80]}")
+        section['error'] = str(e)
+    # Valid JSON mein bhi keys missing / null ho sakti hain - merge KeyError pe poora doc fail na ho
+    for key in ('heading', 'summary', 'markdown'):
+        if not isinstance(section.get(key), str):
+            section[key] = f"Part {chunk['index'] + 1}" if key == 'heading' else ''
+    for key in ('key_points', 'steps', 'mistakes', 'faq'):
+        if not isinstance(section.get(key), list):
+            section[key] = []
+    return section
+
+
+def generate_ytdocs_timed(segments, doc_style='tutorial', video_id=None, llm_slots=None, force_ipv4=False):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  TIMESTAMP-AWARE DOCS - time windows ke section docs parallel mein        ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+    
+    1. chunk_segments() → time windows (lambi video = badi windows, max ~12)
+    2. Har window ka section doc parallel (llm_slots se bounded)
+    3. Section headings/summaries se chhoti synthesis call → title, summary, takeaways
+    4. Existing doc schema mein merge + har section ka timestamp anchor
+    
+    Ek hi window ho (chhoti video) to seedha generate_ytdocs() - extra call nahi.
+    NOTE: IPv4 - caller ka global patch, ya force_ipv4 (batch stream) har Gemini client pe.
+    """
+    llm_slots = llm_slots or threading.BoundedSemaphore(YTDOCS_SECTION_WORKERS)
+    chunks = chunk_segments(segments)
+    if len(chunks) <= 1:
+        with llm_slots:
+            return generate_ytdocs(' '.join(seg['text'] for seg in segments), doc_style, force_ipv4)
+    
+    log_info(f"Long transcript: {len(chunks)} time windows → parallel section docs")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(YTDOCS_SECTION_WORKERS, len(chunks))) as pool:
+        sections = list(pool.map(lambda chunk: _ytdocs_section(chunk, len(chunks), doc_style, video_id, llm_slots, force_ipv4), chunks))
+    
+    if all(section.get('error') for section in sections):
+        raise RuntimeError(sections[0]['error'])
+    
+    # Synthesis: sirf headings + summaries (chhota prompt, fast)
+    outline = '\n'.join(f"[{s['timestamp']}] {s['heading']}: {s['summary']}" for s in sections)
+    overview = {}
+    try:
+        with llm_slots:
+            client = gemini_client(force_ipv4)
+            resp = client.models.generate_content(model='gemini-2.5-flash', contents=f"""
+            You are a technical documentation expert. These are the sections (in order) of one video's
+            {doc_style} documentation:
+            {outline}
+            
+            Return ONLY valid JSON: {{"title": "...", "one_line_summary": "...", "key_takeaways": ["...", "..."]}}
+            """)
+        overview = json.loads(resp.text.replace("```json", "").replace("```", "").strip())
+    except Exception as e:
+        log_error(f"Synthesis failed, using section data: {str(e)[:80]}")
+    if not isinstance(overview, dict):
+        overview = {}
+    
+    def anchor(section):
+        return f"[{section['timestamp']}]({section['url']})" if section['url'] else f"[{section['timestamp']}]"
+    
+    log_success(f"Merged {len(sections)} timestamped sections")
+    return {
+        "title": overview.get('title') or sections[0]['heading'],
+        "one_line_summary": overview.get('one_line_summary') or sections[0]['summary'],
+        "table_of_contents": [f"[{s['timestamp']}] {s['heading']}" for s in sections],
+        "documentation_markdown": '\n\n'.join(f"## {anchor(s)} {s['heading']}\n\n{s['markdown']}" for s in sections),
+        "key_takeaways": overview.get('key_takeaways') or [p for s in sections for p in s['key_points']][:10],
+        "step_by_step": [step for s in sections for step in s['steps']],
+        "common_mistakes": [m for s in sections for m in s['mistakes']],
+        "faq": [qa for s in sections for qa in s['faq']][:12],
+        "sections": [{k: s.get(k) for k in ('heading', 'summary', 'start', 'end', 'timestamp', 'url')} for s in sections],
+    }
 
 
 @login_required
@@ -1253,14 +1835,14 @@ def run_ytdocs_x402(request):
             }, status=400)
         
         # Validate doc_style
-        valid_styles = ['tutorial', 'course_notes', 'cheat_sheet']
-        if doc_style not in valid_styles:
+        if doc_style not in YTDOCS_STYLES:
             doc_style = 'tutorial'
         
         # ═══════════════════════════════════════════════════════════════════
         # STEP 2: Get transcript (from API or manual)
         # ═══════════════════════════════════════════════════════════════════
         transcript_text = manual_transcript
+        segments = []  # Timestamps (API transcript) - manual transcript mein nahi hote
         video_id = None
         
         if youtube_url and not manual_transcript:
@@ -1288,6 +1870,7 @@ def run_ytdocs_x402(request):
                 }, status=400)
             
             transcript_text = transcript_result['transcript']
+            segments = transcript_result['segments']
             log_success(f"Transcript fetched: {len(transcript_text)} characters")
         
         if not transcript_text or len(transcript_text) < 100:
@@ -1298,108 +1881,20 @@ def run_ytdocs_x402(request):
             }, status=400)
         
         # ═══════════════════════════════════════════════════════════════════
-        # STEP 3: Generate documentation using Gemini
+        # STEP 3: Generate documentation using Gemini (+ parse)
         # ═══════════════════════════════════════════════════════════════════
         log_info(f"Generating {doc_style} documentation with Gemini...")
         
-        # Doc style specific instructions
-        style_instructions = {
-            'tutorial': """
-                Create a beginner-friendly tutorial with:
-                - Clear step-by-step instructions
-                - Code examples where applicable
-                - Explanations for each step
-                - Common mistakes to avoid
-            """,
-            'course_notes': """
-                Create comprehensive study notes with:
-                - Main concepts and definitions
-                - Key points organized by topic
-                - Examples and explanations
-                - Review questions
-            """,
-            'cheat_sheet': """
-                Create a quick reference cheat sheet with:
-                - Concise bullet points
-                - Important commands/syntax
-                - Quick tips and shortcuts
-                - Minimal explanations, maximum content density
-            """
-        }
-        
-        prompt = f"""
-        You are a technical documentation expert. Based on this video transcript, create structured documentation.
-        
-        DOCUMENTATION STYLE: {doc_style}
-        {style_instructions.get(doc_style, style_instructions['tutorial'])}
-        
-        TRANSCRIPT:
-        {transcript_text[:40000]}
-        
-        Return ONLY valid JSON (no markdown code blocks, no extra text) with this exact schema:
-        {{
-            "title": "Clear descriptive title based on video content",
-            "one_line_summary": "One sentence summary of entire video",
-            "table_of_contents": ["Section 1", "Section 2", "Section 3"],
-            "documentation_markdown": "Full markdown documentation with proper headings (##), bullet points, code blocks where needed. Make it comprehensive and well-structured.",
-            "key_takeaways": ["Key point 1", "Key point 2", "Key point 3"],
-            "step_by_step": ["Step 1: Description", "Step 2: Description"],
-            "common_mistakes": ["Mistake 1 to avoid", "Mistake 2 to avoid"],
-            "faq": [
-                {{"q": "Question 1?", "a": "Answer 1"}},
-                {{"q": "Question 2?", "a": "Answer 2"}}
-            ]
-        }}
-        
-        IMPORTANT:
-        - documentation_markdown should be complete, detailed, and professional
-        - Use proper markdown formatting (headings, bullets, code blocks)
-        - If video is technical, include code examples
-        - Make content actionable and useful
-        - Return ONLY JSON, no other text
-        """
-        
         # Apply IPv4 patch and call Gemini
         socket.getaddrinfo = new_getaddrinfo
         try:
-            client = genai.Client(api_key=settings.GEMINI_API_KEY)
-            resp = client.models.generate_content(model='gemini-2.5-flash', contents=prompt)
+            if segments:
+                final_data = generate_ytdocs_timed(segments, doc_style, video_id)
+            else:
+                final_data = generate_ytdocs(transcript_text, doc_style)
         finally:
             socket.getaddrinfo = original_getaddrinfo
         
-        log_success("Gemini response received")
-        
-        # ═══════════════════════════════════════════════════════════════════
-        # STEP 4: Parse Gemini response
-        # ═══════════════════════════════════════════════════════════════════
-        try:
-            # Clean response (remove markdown code blocks if any)
-            clean_response = resp.text.strip()
-            if clean_response.startswith('```json'):
-                clean_response = clean_response[7:]
-            if clean_response.startswith('```'):
-                clean_response = clean_response[3:]
-            if clean_response.endswith('```'):
-                clean_response = clean_response[:-3]
-            clean_response = clean_response.strip()
-            
-            final_data = json.loads(clean_response)
-            log_success("Documentation generated successfully")
-            
-        except json.JSONDecodeError as e:
-            log_error(f"JSON parse error: {e}")
-            # Fallback: wrap raw response
-            final_data = {
-                "title": "Generated Documentation",
-                "one_line_summary": "Documentation generated from YouTube video",
-                "table_of_contents": [],
-                "documentation_markdown": resp.text,
-                "key_takeaways": [],
-                "step_by_step": [],
-                "common_mistakes": [],
-                "faq": []
-            }
-        
         # ═══════════════════════════════════════════════════════════════════
         # STEP 5: Save to database
         # ═══════════════════════════════════════════════════════════════════
@@ -1408,7 +1903,7 @@ def run_ytdocs_x402(request):
         # Get payment header for tx_hash
         payment_header = request.headers.get('x-payment', '')
         
-        AnalysisTransaction.objects.create(
+        txn = AnalysisTransaction.objects.create(
             user=request.user,
             category='YTDOCS',
             agent_type='youtube_docs',
@@ -1419,6 +1914,8 @@ def run_ytdocs_x402(request):
             cost=0.00001
         )
         
+        save_segments(txn, segments, 'segments')  # Timestamps - /api/tx/<id>/segments/ se slice
+        
         log_success("Documentation saved to database")
         
         # ═══════════════════════════════════════════════════════════════════
@@ -1430,6 +1927,7 @@ def run_ytdocs_x402(request):
         final_data['youtube_url'] = youtube_url
         final_data['doc_style'] = doc_style
         final_data['transcript_length'] = len(transcript_text)
+        final_data['segment_count'] = len(segments)
         
         return JsonResponse(final_data)
         
@@ -1438,6 +1936,160 @@ def run_ytdocs_x402(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+# ────────────────────────────────────────────────────────────────────────────
+# YT DOCS BATCH (x402) - Playlist / channel / video list → course docs
+# ────────────────────────────────────────────────────────────────────────────
+
+YTDOCS_BATCH_MAX_VIDEOS = 15     # YouTube feed bhi max 15 deta hai
+YTDOCS_TRANSCRIPT_WORKERS = 6    # Ek saath kitne transcripts fetch hon
+YTDOCS_LLM_WORKERS = 3           # Ek saath kitne Gemini calls
+
+
+def build_course_toc(title, results):
+    """Per-video docs (playlist order) → course-level table of contents + markdown"""
+    modules = []
+    for item in results:
+        if item['status'] != 'success':
+            continue
+        doc = item['data']
+        modules.append({
+            'module': len(modules) + 1,
+            'title': doc.get('title') or item.get('title') or item['video_id'],
+            'video_id': item['video_id'],
+            'url': item['url'],
+            'summary': doc.get('one_line_summary', ''),
+            'sections': doc.get('table_of_contents') or [],
+        })
+    
+    markdown = [f"# {title or 'Course'}", ""]
+    for module in modules:
+        markdown.append(f"## {module['module']}. [{module['title']}]({module['url']})")
+        if module['summary']:
+            markdown.append(f"_{module['summary']}_")
+        markdown.extend(f"- {section}" for section in module['sections'])
+        markdown.append("")
+    return {'title': title, 'modules': modules, 'markdown': '\n'.join(markdown)}
+
+
+@csrf_exempt
+@login_required
+@require_POST
+@x402_payment_required(required_amount=0.0001, asset="MON", description="YouTube Docs Batch Agent")
+def run_ytdocs_batch_x402(request):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  x402 YT DOCS BATCH AGENT                                                 ║
+    ║  Playlist / channel / video URLs → per-video docs + course TOC            ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+    
+    PRICE: 0.0001 MON per batch (max 15 videos)
+    
+    INPUT (JSON body):
+    - source: Playlist ya channel URL (youtube.com/playlist?list=..., /@handle, /channel/UC...)
+    - youtube_urls: [video URLs] (source ki jagah ya saath mein)
+    - doc_style: "tutorial" | "course_notes" | "cheat_sheet"
+    
+    OUTPUT (NDJSON stream - har line ek JSON object):
+    - {"event": "videos", "title", "kind", "videos": [...]}          ← resolved plan
+    - {"event": "video", "index", "video_id", "status", "data"}      ← har video complete hote hi
+    - {"event": "course", "course": {title, modules, markdown}, ...} ← last line
+    
+    Transcripts concurrently fetch hote hain (cache first), Gemini calls
+    YTDOCS_LLM_WORKERS tak limited.
+    """
+    log_agent("YT-DOCS-BATCH", f"User: {request.user.wallet_address}")
+    
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    
+    doc_style = data.get('doc_style', 'tutorial')
+    if doc_style not in YTDOCS_STYLES:
+        doc_style = 'tutorial'
+    
+    # ═══════════════════════════════════════════════════════════════════
+    # STEP 1: Source → videos list (playlist order, duplicates hata ke)
+    # ═══════════════════════════════════════════════════════════════════
+    title, kind, videos = None, 'videos', []
+    source = (data.get('source') or '').strip()
+    if source:
+        resolved = resolve_video_source(source)
+        if not resolved['success']:
+            return JsonResponse({'error': resolved['error']}, status=400)
+        title, kind, videos = resolved['title'], resolved['kind'], list(resolved['videos'])
+    for url in data.get('youtube_urls') or []:
+        video_id = extract_video_id(str(url))
+        if video_id:
+            videos.append({'video_id': video_id, 'title': None, 'url': f"https://www.youtube.com/watch?v={video_id}"})
+    
+    unique, seen = [], set()
+    for video in videos:
+        if video['video_id'] not in seen:
+            seen.add(video['video_id'])
+            unique.append(video)
+    videos = unique
+    if not videos:
+        return JsonResponse({'error': 'No valid YouTube videos found', 'detail': 'Provide a playlist/channel URL or youtube_urls'}, status=400)
+    videos = videos[:YTDOCS_BATCH_MAX_VIDEOS]
+    
+    llm_slots = threading.BoundedSemaphore(YTDOCS_LLM_WORKERS)
+    payment_header = request.headers.get('x-payment', '')
+    user = request.user
+    log_info(f"Batch: {len(videos)} videos | style: {doc_style}")
+    
+    def process(index, video):
+        item = {'index': index, 'video_id': video['video_id'], 'url': video['url'], 'title': video['title']}
+        try:
+            transcript = get_transcript(video['video_id'], force_ipv4=True)
+            item['transcript_cached'] = bool(transcript.get('cached'))
+            if not transcript['success'] or len(transcript['transcript'] or '') < 100:
+                return dict(item, status='error', error=transcript.get('error') or 'Transcript is too short or empty')
+            doc = generate_ytdocs_timed(transcript['segments'], doc_style, video['video_id'], llm_slots, force_ipv4=True)
+            doc['transcript_length'] = len(transcript['transcript'])
+            return dict(item, status='success', data=doc)
+        except Exception as e:
+            return dict(item, status='error', error=str(e))
+    
+    def stream():
+        results = [None] * len(videos)
+        yield json.dumps({'event': 'videos', 'title': title, 'kind': kind, 'videos': videos}) + '\n'
+        # IPv4 per client (force_ipv4) - poore stream ke liye global socket patch nahi
+        try:
+            workers = min(YTDOCS_TRANSCRIPT_WORKERS, len(videos))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(process, i, video) for i, video in enumerate(videos)]
+                for future in concurrent.futures.as_completed(futures):
+                    item = future.result()
+                    results[item['index']] = item
+                    log_info(f"[{item['index'] + 1}/{len(videos)}] {item['video_id']} → {item['status']}")
+                    yield json.dumps(dict(item, event='video')) + '\n'
+            
+            course = build_course_toc(title, results)
+            failed = sum(1 for item in results if item['status'] != 'success')
+            AnalysisTransaction.objects.create(
+                user=user,
+                category='YTDOCS',
+                agent_type='youtube_docs_batch',
+                input_text=source or '\n'.join(v['url'] for v in videos),
+                title=title or f"Batch: {len(videos)} videos",
+                output_data=json.dumps({'course': course, 'videos': results, 'doc_style': doc_style}),
+                tx_hash=payment_header[:66] if len(payment_header) > 66 else payment_header,
+                cost=0.0001
+            )
+            log_success(f"YT Docs batch complete: {len(videos) - failed} ok, {failed} failed")
+            yield json.dumps({'event': 'course', 'course': course,
+                              'completed': len(videos) - failed, 'failed': failed}) + '\n'
+        except Exception as e:
+            log_error(f"YT-DOCS-BATCH Exception: {str(e)}")
+            yield json.dumps({'event': 'error', 'error': str(e)}) + '\n'
+    
+    response = StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+    response['X-Accel-Buffering'] = 'no'
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
 @login_required
 @require_POST
 @x402_payment_required(required_amount=0.0015, asset="MON", description="Smart Portfolio Architect")
@@ -1445,25 +2097,58 @@ def run_finance_x402(request):
     """
     x402-enabled Finance Agent.
     Analyzes crypto portfolios using live CoinGecko data + Gemini AI.
+    
+    Input: JSON body (user_input text) ya multipart FormData with
+    portfolio_file (exchange / wallet CSV ya JSON export) + mode + risk_appetite.
+    Badi books: prompt mein top assets, analytics top ANALYSIS_MAX_ASSETS pe.
     """
     log_agent("FINANCE", f"User: {request.user.wallet_address}")
     log_success("x402 Payment Verified - Starting Portfolio Analysis...")
     
     try:
-        data = json.loads(request.body)
-        user_input = data.get('user_input', '')
+        portfolio_file = request.FILES.get('portfolio_file')
+        import_summary = None
+        if portfolio_file:
+            # 1a. Export file - ek pass mein per-symbol aggregate (bounded memory)
+            data = request.POST
+            log_info(f"Importing portfolio file: {portfolio_file.name} ({portfolio_file.size} bytes)")
+            imported, import_error = import_portfolio_file(portfolio_file)
+            if import_error:
+                return JsonResponse({'error': import_error}, status=400)
+            holdings = imported.pop('holdings')
+            import_summary = imported
+            user_input = f"{portfolio_file.name}: {imported['rows']} rows, {imported['symbols']} assets"
+            log_info(f"Imported {imported['rows']} rows → {imported['symbols']} assets ({imported['skipped']} skipped)")
+        else:
+            data = json.loads(request.body)
+            user_input = data.get('user_input', '')
+            if not user_input or len(user_input) < 3:
+                return JsonResponse({'error': 'Input too short'}, status=400)
+            holdings = extract_holdings(user_input)
         mode = data.get('mode', 'portfolio')
         risk_appetite = data.get('risk_appetite', 'balanced')
-        
-        if not user_input or len(user_input) < 3:
-            return JsonResponse({'error': 'Input too short'}, status=400)
             
-        # 1. Parse Holdings & Get Context
-        log_info("Parsing holdings & fetching live prices...")
-        holdings = extract_holdings(user_input)
-        context, total_value = get_market_context_for_gemini(holdings)
-        
-        # 2. Gemini Analysis
+        # 1. Live prices (symbols bulk resolve + batched price calls) & Context
+        log_info("Fetching live prices...")
+        rows = get_portfolio_snapshot(holdings)
+        context, total_value = get_market_context_for_gemini(holdings, rows=rows)
+        core_rows, other_rows = split_top_rows(rows, ANALYSIS_MAX_ASSETS)
+        
+        # 2. Local analytics (NumPy) - risk numbers deterministic, LLM sirf narrate karta hai
+        analytics, closes, history_ids = analyze_portfolio(core_rows)
+        log_info(f"Analytics: {analytics['assets']} assets, {analytics['history_days']}d history, {analytics['compute_ms']} ms")
+        
+        # 3. Local optimizer - target allocation + trades (sirf cash ho to default universe mein)
+        candidate_rows = core_rows
+        if not any(r['cg_id'] and r['value'] for r in core_rows):
+            held = {r['symbol'] for r in core_rows}
+            candidate_rows = core_rows + get_portfolio_snapshot(
+                [{'symbol': s, 'amount': 0.0} for s in RECOMMENDATION_UNIVERSE if s not in held])
+        plan = optimize_portfolio(candidate_rows, risk_appetite, history=(closes, history_ids))
+        if plan:
+            log_info(f"Optimizer: {plan['method']} ({plan['risk_appetite']}), {len(plan['trades'])} trades")
+        
+        # 4. Gemini Analysis
         log_info("Sending context to Gemini...")
         prompt = f"""
         You are an expert Crypto Financial Advisor (Web3 Specialist).
@@ -1474,30 +2159,23 @@ def run_finance_x402(request):
         - Current Portfolio/Investment:
         {context}
         
+        COMPUTED PORTFOLIO ANALYTICS (exact - do not recalculate, explain them):
+        {analytics_prompt_block(analytics)}
+        
+        OPTIMIZED TARGET ALLOCATION (exact - do not change it, explain the trades):
+        {optimizer_prompt_block(plan)}
+        
         YOUR TASK:
-        Analyze the portfolio/investment plan based on the user's risk appetite and current market conditions.
+        Interpret these numbers for the user's risk appetite and current market conditions.
+        The action plan must walk through the trades above; do not propose a different allocation.
         
         RETURN JSON ONLY (No Markdown):
         {{
-            "risk_score": (Integer 0-100, where 100 is extremely risky/degen),
-            "total_value_usd": "Str formatted value (e.g. $1,250.00)",
+            "risk_score": (Integer 0-100, only used if no computed risk score is given above),
             "market_sentiment": "Bullish/Bearish/Neutral",
             "summary": "2-3 sentences executive summary of the portfolio health.",
-            "allocations": [
-                {{"asset": "BTC", "percentage": 40}},
-                {{"asset": "ETH", "percentage": 30}},
-                ... (Suggested ideal allocation)
-            ],
             "action_plan": "Markdown string. Specific, actionable advice. Use bullet points.",
-            "assets_analysis": [
-                {{
-                    "symbol": "ETH",
-                    "price": 2500,
-                    "change_24h": -1.2,
-                    "recommendation": "Hold/Buy/Sell"
-                }}
-                ... (One for each asset in input)
-            ]
+            "recommendations": {{"ETH": "Hold/Buy/Sell", ...}} (One for each asset listed individually above)
         }}
         """
         
@@ -1508,12 +2186,37 @@ def run_finance_x402(request):
         finally:
             socket.getaddrinfo = original_getaddrinfo
             
-        # 3. Parse and Save
+        # 5. Parse, merge computed numbers and Save
         try:
             clean = resp.text.replace("```json", "").replace("```", "").strip()
             final_data = json.loads(clean)
         except:
             final_data = {"error": "AI Parse Error", "raw": resp.text}
+        
+        if analytics['risk_score'] is not None:
+            final_data['risk_score'] = analytics['risk_score']
+        final_data['total_value_usd'] = f"${total_value:,.2f}"
+        recommendations = final_data.pop('recommendations', None) or {}
+        final_data['assets_analysis'] = [
+            {
+                'symbol': r['symbol'],
+                'price': r['price'] or 0,  # Unpriced symbol → 0 (table toFixed() null pe toot jaata)
+                'change_24h': round(r['change_24h'] or 0, 2),
+                'recommendation': recommendations.get(r['symbol'], 'Hold') if isinstance(recommendations, dict) else 'Hold',
+            }
+            for r in core_rows
+        ]
+        final_data['analytics'] = analytics
+        if other_rows:
+            final_data['other_assets'] = {
+                'count': len(other_rows),
+                'value_usd': round(sum(r['value'] for r in other_rows if r['value'] is not None), 2),
+            }
+        if import_summary:
+            final_data['import'] = import_summary
+        if plan:
+            final_data['allocations'] = plan['allocations']
+            final_data['rebalance'] = {k: v for k, v in plan.items() if k != 'allocations'}
             
         # Save to DB
         payment_header = request.headers.get('x-payment', 'x402-payment')
@@ -1535,6 +2238,43 @@ def run_finance_x402(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@login_required
+@require_GET
+def live_prices(request):
+    """
+    Live prices (JSON, short polling) - finance dashboard ke liye, free.
+    GET /api/prices/?symbols=BTC,ETH,SOL
+    symbols na ho to user ke aakhri Finance analysis ke assets.
+    Shared price cache se serve - upstream call per interval ek (sab workers milake).
+    """
+    symbols = [s for s in request.GET.get('symbols', '').split(',') if s.strip()]
+    if not symbols:
+        last = AnalysisTransaction.objects.filter(user=request.user, category='FINANCE').order_by('-created_at').first()
+        try:
+            symbols = [a['symbol'] for a in json.loads(last.output_data).get('assets_analysis', [])] if last else []
+        except (TypeError, ValueError, KeyError):
+            symbols = []
+
+    symbol_map, unresolved = resolve_price_symbols(symbols)
+    if not symbol_map:
+        return JsonResponse({'error': 'No known symbols', 'unresolved': unresolved}, status=400)
+
+    socket.getaddrinfo = new_getaddrinfo
+    try:
+        prices = latest_prices(symbol_map)
+    finally:
+        socket.getaddrinfo = original_getaddrinfo
+
+    response = JsonResponse({
+        'symbols': symbol_map,
+        'unresolved': unresolved,
+        'interval': poll_interval(),
+        'prices': prices,
+    })
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
 @login_required
 def history_view(request):
     """Render Usage History & Stats"""
@@ -5,8 +5,17 @@
 YE MODULE YOUTUBE VIDEO SE TRANSCRIPT NIKALNE KE LIYE HAI
 
 MAIN FUNCTIONS:
-1. extract_video_id() - YouTube URL se video ID nikalta hai
-2. get_transcript()   - Video ka transcript fetch karta hai
+1. extract_video_id()     - YouTube URL se video ID nikalta hai
+2. get_transcript()       - Video ka transcript fetch karta hai (cache first)
+3. resolve_video_source() - Playlist / channel URL → videos list (batch docs)
+4. chunk_segments()       - Segments → time windows (parallel section docs)
+
+TRANSCRIPT CACHE:
+- (video_id, language preference) → segments + full text, compressed disk
+  files (settings.TRANSCRIPT_CACHE_DIR, LRU-bounded by TRANSCRIPT_CACHE_MAX_MB)
+- "Transcript not available / disabled / private" outcomes bhi cache hote hain
+  (TRANSCRIPT_NEGATIVE_TTL) - dead videos pe baar baar API call nahi
+- Network / temporary errors cache NAHI hote
 
 SUPPORTED URL FORMATS:
 - https://www.youtube.com/watch?v=VIDEO_ID
@@ -19,9 +28,21 @@ REQUIRES: youtube-transcript-api>=1.0.0 (pip install youtube-transcript-api)
 """
 
 import re
+import time
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse, parse_qs
+
+import requests
 
 # youtube-transcript-api v1.2.x uses instance-based API
-from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api import (
+    YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound,
+    VideoUnavailable, VideoUnplayable, InvalidVideoId, AgeRestricted,
+)
+from django.conf import settings
+
+from .disk_cache import DiskCache, is_expired
+from .ipv4 import ipv4_session
 
 
 # ============================================================================
@@ -105,11 +126,51 @@ def extract_video_id(youtube_url):
     return None
 
 
+# ============================================================================
+# TRANSCRIPT CACHE - Compressed disk store (positive + negative entries)
+# ============================================================================
+
+_transcript_cache = None
+
+# Yeh errors video ki permanent state hain (network issue nahi) - negative cache safe hai
+PERMANENT_TRANSCRIPT_ERRORS = (
+    TranscriptsDisabled, NoTranscriptFound, VideoUnavailable,
+    VideoUnplayable, InvalidVideoId, AgeRestricted,
+)
+
+
+def get_transcript_cache():
+    """Process-wide DiskCache instance (lazily banta hai, settings se config)"""
+    global _transcript_cache
+    if _transcript_cache is None:
+        cache_dir = getattr(settings, 'TRANSCRIPT_CACHE_DIR', None) or (settings.MEDIA_ROOT / 'cache' / 'transcripts')
+        max_mb = getattr(settings, 'TRANSCRIPT_CACHE_MAX_MB', 100)
+        _transcript_cache = DiskCache(cache_dir, max_bytes=max_mb * 1024 * 1024)
+    return _transcript_cache
+
+
+def _transcript_key(video_id, language_codes):
+    return f"transcript:{video_id}:{','.join(language_codes)}"
+
+
+def _cache_transcript(video_id, language_codes, result, negative=False):
+    entry = dict(result, cached_at=time.time())
+    if not result['success'] and not negative:
+        return result  # Temporary failure - cache nahi, agli baar retry
+    if negative:
+        entry['expires_at'] = time.time() + getattr(settings, 'TRANSCRIPT_NEGATIVE_TTL', 6 * 3600)
+    try:
+        get_transcript_cache().set(_transcript_key(video_id, language_codes), entry)
+    except OSError as e:
+        log_error(f"Transcript cache write failed: {str(e)[:50]}")
+    return result
+
+
 # ============================================================================
 # TRANSCRIPT FETCHING - YouTube Transcript API v1.2.x compatible
 # ============================================================================
 
-def get_transcript(video_id, language_codes=['en', 'hi', 'en-US', 'en-GB']):
+def get_transcript(video_id, language_codes=['en', 'hi', 'en-US', 'en-GB'], force_ipv4=False):
     """
     ╔══════════════════════════════════════════════════════════════════════════╗
     ║  YOUTUBE VIDEO KA TRANSCRIPT FETCH KARTA HAI                              ║
@@ -118,6 +179,7 @@ def get_transcript(video_id, language_codes=['en', 'hi', 'en-US', 'en-GB']):
     PARAMETERS:
     - video_id: YouTube video ID (11 characters)
     - language_codes: Preferred languages (English aur Hindi by default)
+    - force_ipv4: YouTube calls IPv4 session se (batch streams - global socket patch nahi)
     
     RETURNS:
     - Dictionary with:
@@ -125,6 +187,7 @@ def get_transcript(video_id, language_codes=['en', 'hi', 'en-US', 'en-GB']):
         - transcript: Full text (agar success)
         - segments: List of transcript segments with timestamps
         - error: Error message (agar fail)
+        - cached: True agar transcript cache se aaya
     
     NOTE: Updated for youtube-transcript-api v1.2.x (instance-based API)
     """
@@ -138,15 +201,27 @@ def get_transcript(video_id, language_codes=['en', 'hi', 'en-US', 'en-GB']):
             'segments': []
         }
     
+    # Cache pehle - same video dobara process ho to API call nahi
+    entry = get_transcript_cache().get(_transcript_key(video_id, language_codes))
+    if entry and not is_expired(entry):
+        entry.pop('expires_at', None)
+        entry.pop('cached_at', None)
+        if entry['success']:
+            log_success(f"Transcript from cache: {entry['segment_count']} segments")
+        else:
+            log_yt(f"Cached negative result: {entry['error']}")
+        return dict(entry, cached=True)
+    
     try:
         # Create API instance (v1.2.x uses instance-based approach)
-        ytt_api = YouTubeTranscriptApi()
+        ytt_api = YouTubeTranscriptApi(http_client=ipv4_session()) if force_ipv4 else YouTubeTranscriptApi()
         
         log_yt(f"Trying languages: {language_codes}")
         
         # Try to fetch transcript with preferred languages
         transcript_data = None
         used_language = None
+        permanent_miss = False  # True = video ka transcript sach mein nahi hai (negative cache)
         
         # First, try to list available transcripts
         try:
@@ -168,6 +243,9 @@ def get_transcript(video_id, language_codes=['en', 'hi', 'en-US', 'en-GB']):
                 except Exception:
                     continue
             
+            if not list(available_transcripts):
+                permanent_miss = True
+            
             # If no preferred language found, use first available
             if not transcript_data and available_transcripts:
                 try:
@@ -187,16 +265,17 @@ def get_transcript(video_id, language_codes=['en', 'hi', 'en-US', 'en-GB']):
                 log_success("Direct fetch successful")
             except Exception as fetch_error:
                 log_error(f"Direct fetch also failed: {fetch_error}")
+                permanent_miss = isinstance(e, PERMANENT_TRANSCRIPT_ERRORS) or isinstance(fetch_error, PERMANENT_TRANSCRIPT_ERRORS)
         
         if not transcript_data:
             log_error("No transcript available for this video")
-            return {
+            return _cache_transcript(video_id, language_codes, {
                 'success': False,
                 'error': 'Transcript not available for this video.',
                 'fallback': 'Paste transcript manually',
                 'transcript': None,
                 'segments': []
-            }
+            }, negative=permanent_miss)
         
         # Convert transcript data to segments list
         segments = []
@@ -212,43 +291,45 @@ def get_transcript(video_id, language_codes=['en', 'hi', 'en-US', 'en-GB']):
         
         log_success(f"Transcript fetched: {len(segments)} segments, {len(full_text)} characters")
         
-        return {
+        return _cache_transcript(video_id, language_codes, {
             'success': True,
             'transcript': full_text,
             'segments': segments,
             'language': used_language,
             'segment_count': len(segments),
             'character_count': len(full_text)
-        }
+        })
         
+    # Permanent outcomes (disabled / unavailable) negative cache mein - TTL ke baad retry.
+    # Sirf typed library exceptions: message match "Service Unavailable" jaise
+    # temporary errors ko bhi dead video maan leta tha.
+    except TranscriptsDisabled as e:
+        log_error(f"Transcript error: {e}")
+        return _cache_transcript(video_id, language_codes, {
+            'success': False,
+            'error': 'Transcripts are disabled for this video.',
+            'fallback': 'Paste transcript manually',
+            'transcript': None,
+            'segments': []
+        }, negative=True)
+    except VideoUnavailable as e:
+        log_error(f"Transcript error: {e}")
+        return _cache_transcript(video_id, language_codes, {
+            'success': False,
+            'error': 'Video is unavailable or private.',
+            'transcript': None,
+            'segments': []
+        }, negative=True)
     except Exception as e:
         error_msg = str(e)
         log_error(f"Transcript error: {error_msg}")
-        
-        # Handle specific error cases
-        if 'disabled' in error_msg.lower():
-            return {
-                'success': False,
-                'error': 'Transcripts are disabled for this video.',
-                'fallback': 'Paste transcript manually',
-                'transcript': None,
-                'segments': []
-            }
-        elif 'unavailable' in error_msg.lower() or 'private' in error_msg.lower():
-            return {
-                'success': False,
-                'error': 'Video is unavailable or private.',
-                'transcript': None,
-                'segments': []
-            }
-        else:
-            return {
-                'success': False,
-                'error': f'Failed to fetch transcript: {error_msg}',
-                'fallback': 'Paste transcript manually',
-                'transcript': None,
-                'segments': []
-            }
+        return {
+            'success': False,
+            'error': f'Failed to fetch transcript: {error_msg}',
+            'fallback': 'Paste transcript manually',
+            'transcript': None,
+            'segments': []
+        }
 
 
 # ============================================================================
@@ -286,3 +367,168 @@ def get_youtube_transcript(youtube_url, language_codes=['en', 'hi', 'en-US', 'en
     result['youtube_url'] = youtube_url
     
     return result
+
+
+# ============================================================================
+# TIME-WINDOW CHUNKING - Lambe videos ke parallel section docs ke liye
+# ============================================================================
+
+CHUNK_MIN_SECONDS = 8 * 60    # Har window kam se kam itni lambi
+CHUNK_MAX_SECTIONS = 12       # Isse zyada windows nahi - lambi video = badi windows
+CHUNK_MAX_CHARS = 40000       # Ek window ka text (single-call limit jitna)
+
+
+def format_timestamp(seconds):
+    """125.4 → '2:05', 3725 → '1:02:05'"""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def chunk_segments(segments, min_seconds=CHUNK_MIN_SECONDS, max_sections=CHUNK_MAX_SECTIONS, max_chars=CHUNK_MAX_CHARS):
+    """
+    Transcript segments ko time windows mein group karta hai (segment boundary pe hi split).
+    Window size = max(min_seconds, total_duration / max_sections) - isliye 3 ghante ka
+    lecture bhi ~max_sections windows banata hai (parallel calls, same wall-clock).
+    
+    RETURNS: [{'index', 'start', 'end', 'text'}, ...]
+    """
+    if not segments:
+        return []
+    last = segments[-1]
+    total = float(last['start']) + float(last.get('duration') or 0)
+    window = max(min_seconds, total / max_sections)
+    
+    chunks, texts = [], []
+    chunk_start = float(segments[0]['start'])
+    chars = 0
+    for seg in segments:
+        start = float(seg['start'])
+        text = (seg['text'] or '').strip()
+        if texts and (start - chunk_start >= window or chars + len(text) > max_chars):
+            chunks.append({'index': len(chunks), 'start': chunk_start, 'end': start, 'text': ' '.join(texts)})
+            texts, chars, chunk_start = [], 0, start
+        if text:
+            texts.append(text)
+            chars += len(text) + 1
+    if texts:
+        chunks.append({'index': len(chunks), 'start': chunk_start, 'end': total, 'text': ' '.join(texts)})
+    return chunks
+
+
+# ============================================================================
+# PLAYLIST / CHANNEL RESOLUTION - Batch docs ke liye video list
+# ============================================================================
+
+# YouTube ka public Atom feed - API key nahi chahiye, latest 15 videos deta hai
+FEED_URL = 'https://www.youtube.com/feeds/videos.xml'
+FEED_NS = {'atom': 'http://www.w3.org/2005/Atom', 'yt': 'http://www.youtube.com/xml/schemas/2015'}
+CHANNEL_ID_RE = re.compile(r'(UC[A-Za-z0-9_-]{22})')
+CHANNEL_PAGE_PATTERNS = [
+    re.compile(r'<link rel="canonical" href="https://www\.youtube\.com/channel/(UC[A-Za-z0-9_-]{22})"'),
+    re.compile(r'"externalId":"(UC[A-Za-z0-9_-]{22})"'),
+    re.compile(r'"channelId":"(UC[A-Za-z0-9_-]{22})"'),
+]
+YT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+def _resolve_channel_id(url):
+    """@handle / c/name page HTML se channel ID (UC...) nikalta hai"""
+    resp = requests.get(url, headers=YT_HEADERS, cookies={'CONSENT': 'YES+cb'}, timeout=10)
+    if resp.status_code != 200:
+        return None
+    for pattern in CHANNEL_PAGE_PATTERNS:
+        match = pattern.search(resp.text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _fetch_feed(params):
+    resp = requests.get(FEED_URL, params=params, headers=YT_HEADERS, timeout=10)
+    if resp.status_code != 200:
+        return None, []
+    root = ET.fromstring(resp.content)
+    videos = []
+    for entry in root.findall('atom:entry', FEED_NS):
+        video_id = entry.findtext('yt:videoId', namespaces=FEED_NS)
+        if video_id:
+            videos.append({
+                'video_id': video_id,
+                'title': entry.findtext('atom:title', namespaces=FEED_NS),
+                'url': f"https://www.youtube.com/watch?v={video_id}",
+            })
+    # Channel feed newest-first hota hai; course order ke liye purane pehle
+    if 'channel_id' in params or 'user' in params:
+        videos.reverse()
+    return root.findtext('atom:title', namespaces=FEED_NS), videos
+
+
+def resolve_video_source(source):
+    """
+    ╔══════════════════════════════════════════════════════════════════════════╗
+    ║  PLAYLIST / CHANNEL / VIDEO URL → VIDEOS LIST                             ║
+    ╚══════════════════════════════════════════════════════════════════════════╝
+    
+    SUPPORTED:
+    - https://www.youtube.com/playlist?list=PL...   (watch?v=...&list=... bhi)
+    - https://www.youtube.com/channel/UC...
+    - https://www.youtube.com/@handle, /c/name, /user/name
+    - Single video URL → ek video ki list
+    
+    NOTE: Public Atom feed use hota hai (API key nahi) - isliye max 15 videos
+    (playlist ke pehle 15, channel ke latest 15).
+    
+    RETURNS:
+    - { success, kind: playlist|channel|video, title, videos: [{video_id, title, url}], error }
+    """
+    log_yt(f"Resolving video source: {source}")
+    source = (source or '').strip()
+    if not source:
+        return {'success': False, 'error': 'Source URL is required', 'videos': []}
+    if not source.startswith('http'):
+        source = 'https://' + source
+    
+    try:
+        parts = urlparse(source)
+        playlist_id = parse_qs(parts.query).get('list', [None])[0]
+        path = parts.path.rstrip('/')
+        
+        if playlist_id:
+            kind, params = 'playlist', {'playlist_id': playlist_id}
+        elif path.startswith('/channel/') and CHANNEL_ID_RE.search(path):
+            kind, params = 'channel', {'channel_id': CHANNEL_ID_RE.search(path).group(1)}
+        elif path.startswith('/user/'):
+            kind, params = 'channel', {'user': path.split('/')[2]}
+        elif path.startswith('/@') or path.startswith('/c/'):
+            depth = 2 if path.startswith('/@') else 3  # /@handle vs /c/name (aage ka /videos hatao)
+            channel_page = f"https://www.youtube.com{'/'.join(path.split('/')[:depth])}"
+            channel_id = _resolve_channel_id(channel_page)
+            if not channel_id:
+                log_error(f"Could not resolve channel ID for: {channel_page}")
+                return {'success': False, 'error': 'Could not resolve YouTube channel.', 'videos': []}
+            kind, params = 'channel', {'channel_id': channel_id}
+        else:
+            video_id = extract_video_id(source)
+            if not video_id:
+                return {'success': False, 'error': 'Unsupported YouTube URL.', 'videos': []}
+            return {
+                'success': True, 'kind': 'video', 'title': None,
+                'videos': [{'video_id': video_id, 'title': None, 'url': f"https://www.youtube.com/watch?v={video_id}"}],
+            }
+        
+        title, videos = _fetch_feed(params)
+        if not videos:
+            log_error(f"No videos found for {kind}: {params}")
+            return {'success': False, 'error': f'No videos found for this {kind}.', 'videos': []}
+        
+        log_success(f"Resolved {kind} '{title}': {len(videos)} videos")
+        return {'success': True, 'kind': kind, 'title': title, 'videos': videos}
+    
+    except (requests.RequestException, ET.ParseError) as e:
+        log_error(f"Source resolution failed: {e}")
+        return {'success': False, 'error': f'Failed to load video list: {e}', 'videos': []}
@@ -15,4 +15,10 @@ python manage.py collectstatic --no-input
 echo "🗄️ Running database migrations..."
 python manage.py migrate
 
+echo "🪙 Warming CoinGecko coin index (optional - fail ho to runtime background download)..."
+python manage.py refresh_coin_index || echo "⚠️ Coin index download skipped"
+
+echo "📈 Warming OHLC price history (optional - runtime pe background update)..."
+python manage.py update_ohlc || echo "⚠️ OHLC warm-up skipped"
+
 echo "✅ Build complete! Server ready to start."
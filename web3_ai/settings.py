@@ -183,6 +183,76 @@ GROQ_API_KEY = config('GROQ_API_KEY', default='')
 # CoinGecko API Key - Live Market Data
 # Demo Key: 30 calls/minute
 COINGECKO_API_KEY = config('COINGECKO_API_KEY', default='')
+# Prices sab workers share karte hain (disk cache) - itne seconds fresh
+COINGECKO_PRICE_TTL = config('COINGECKO_PRICE_TTL', default=60, cast=int)
+PRICE_CACHE_DIR = config('PRICE_CACHE_DIR', default=str(MEDIA_ROOT / 'cache' / 'prices'))
+# Background thread common tokens (COINGECKO_WARM_IDS, default BTC/ETH/SOL/...) ko warm rakhe
+COINGECKO_REFRESHER = config('COINGECKO_REFRESHER', default=False, cast=bool)
+COINGECKO_WARM_IDS = config('COINGECKO_WARM_IDS', default='', cast=lambda v: [i.strip() for i in v.split(',') if i.strip()])
+# Poori coin list (symbol/name → id) ka local index - itne seconds baad background refresh
+COIN_INDEX_PATH = config('COIN_INDEX_PATH', default=str(MEDIA_ROOT / 'cache' / 'coin_index.json.gz'))
+COIN_INDEX_TTL = config('COIN_INDEX_TTL', default=86400, cast=int)
+# Daily / hourly OHLC history (memory-mapped files, sirf missing range fetch hoti hai)
+OHLC_STORE_DIR = config('OHLC_STORE_DIR', default=str(MEDIA_ROOT / 'cache' / 'ohlc'))
+# Finance agent CSV / JSON export upload ki max size (MB) - file stream hoti hai, memory = distinct symbols
+PORTFOLIO_IMPORT_MAX_MB = config('PORTFOLIO_IMPORT_MAX_MB', default=20, cast=int)
+# Finance dashboard live prices - browser itne seconds mein poll karta hai (shared cache, upstream call per interval ek)
+PRICE_STREAM_INTERVAL = config('PRICE_STREAM_INTERVAL', default=15, cast=int)
+
+# ===========================================
+# SCRAPER HTTP CACHE (ETag / Last-Modified revalidation)
+# ===========================================
+# Compressed pages + validators yahan store hote hain (sab workers share karte hain)
+SCRAPER_CACHE_DIR = config('SCRAPER_CACHE_DIR', default=str(MEDIA_ROOT / 'cache' / 'scraper'))
+# Disk limit - cross hone pe least recently used pages delete hote hain
+SCRAPER_CACHE_MAX_MB = config('SCRAPER_CACHE_MAX_MB', default=200, cast=int)
+# Jo domain direct fetch block karta hai, kitni der tak seedha Jina Reader use karein (seconds)
+SCRAPER_ROUTE_TTL = config('SCRAPER_ROUTE_TTL', default=86400, cast=int)
+# robots.txt + sitemap discovery result (har section ka best URL) kitni der reuse ho (seconds)
+SITEMAP_CACHE_TTL = config('SITEMAP_CACHE_TTL', default=86400, cast=int)
+# Page text extraction: 'main' (readability-style main content, fallback full) ya 'full' (sab visible text)
+SCRAPER_EXTRACTION_MODE = config('SCRAPER_EXTRACTION_MODE', default='main')
+# Assembled scrape result (homepage + key pages) kitni der fresh maana jaye (seconds)
+SCRAPE_RESULT_TTL = config('SCRAPE_RESULT_TTL', default=3600, cast=int)
+# TTL ke baad itni der tak stale result serve hota hai + background refresh (stale-while-revalidate)
+SCRAPE_RESULT_STALE_TTL = config('SCRAPE_RESULT_STALE_TTL', default=86400, cast=int)
+
+# ===========================================
+# YOUTUBE TRANSCRIPT CACHE (YouTube Docs agent)
+# ===========================================
+# (video_id, languages) → segments + full text, compressed files (sab workers share karte hain)
+TRANSCRIPT_CACHE_DIR = config('TRANSCRIPT_CACHE_DIR', default=str(MEDIA_ROOT / 'cache' / 'transcripts'))
+TRANSCRIPT_CACHE_MAX_MB = config('TRANSCRIPT_CACHE_MAX_MB', default=100, cast=int)
+# "Transcript available nahi" outcome kitni der yaad rakhein - dead videos pe retry nahi (seconds)
+TRANSCRIPT_NEGATIVE_TTL = config('TRANSCRIPT_NEGATIVE_TTL', default=6 * 3600, cast=int)
+
+# ===========================================
+# AUDIO PROCESSING (ffmpeg - optional)
+# ===========================================
+# Lambi recordings ka silence-aware split. Binary na mile to single ElevenLabs call hota hai
+FFMPEG_BINARY = config('FFMPEG_BINARY', default='ffmpeg')
+FFPROBE_BINARY = config('FFPROBE_BINARY', default='ffprobe')
+# Badi / stereo high-bitrate uploads ElevenLabs se pehle mono 16 kHz mein: 'opus' (chhota) ya 'flac' (lossless)
+AUDIO_TRANSCODE_CODEC = config('AUDIO_TRANSCODE_CODEC', default='opus')
+
+# ===========================================
+# GITHUB AGENT (repo tarball ingestion)
+# ===========================================
+# Optional token - private repos + API rate limit (na ho to public codeload URL)
+GITHUB_TOKEN = config('GITHUB_TOKEN', default='')
+# In-memory file table ka max text size (KB) - isse upar kam zaroori files evict
+GITHUB_INGEST_BUDGET_KB = config('GITHUB_INGEST_BUDGET_KB', default=1024, cast=int)
+# Archive download limit (MB) aur total time (seconds) - isse aage partial (truncated) table
+GITHUB_ARCHIVE_MAX_MB = config('GITHUB_ARCHIVE_MAX_MB', default=200, cast=int)
+GITHUB_INGEST_TIMEOUT = config('GITHUB_INGEST_TIMEOUT', default=60, cast=int)
+# Gemini prompt mein repo context (characters)
+GITHUB_CONTEXT_CHARS = config('GITHUB_CONTEXT_CHARS', default=200000, cast=int)
+
+# ===========================================
+# BACKGROUND JOBS (async audio mode)
+# ===========================================
+# Har process mein itne worker threads lambe pipelines chalate hain (baaki queue mein wait)
+AGENT_JOB_WORKERS = config('AGENT_JOB_WORKERS', default=2, cast=int)
 
 # ===========================================
 # DATABASE: Default SQLite use ho raha hai